@@ -0,0 +1,69 @@
+"""
+Normalization and sums of the amounts of many sources of mixed bases
+"""
+import random
+
+from duniterpy.documents.transaction import reduce_base
+from duniterpy.helpers import amounts
+
+from .harness import benchmark
+
+
+def _sources(count=10000, seed=42):
+    rng = random.Random(seed)
+    return [rng.randint(1, 100000) * 10 ** rng.randint(0, 2) for _ in range(count)], \
+           [rng.randint(0, 3) for _ in range(count)]
+
+
+def _reduce_base_float(amount, base):
+    """
+    The previous implementation of reduce_base, dividing floats
+    """
+    if amount == 0:
+        return 0, 0
+
+    next_amount = amount
+    next_base = base
+    while int(next_amount) == next_amount:
+        amount = next_amount
+        base = next_base
+        next_amount /= 10
+        next_base += 1
+    return int(amount), int(base)
+
+
+@benchmark("amounts.reduce_base[10k]")
+def reduce_base_sources():
+    values, bases = _sources()
+    return lambda: [reduce_base(v, b) for v, b in zip(values, bases)]
+
+
+@benchmark("amounts.reduce_base[10k, float]")
+def reduce_base_float_sources():
+    values, bases = _sources()
+    return lambda: [_reduce_base_float(v, b) for v, b in zip(values, bases)]
+
+
+@benchmark("amounts.reduce_bases[10k]")
+def reduce_bases_sources():
+    values, bases = _sources()
+    return lambda: amounts.reduce_bases(values, bases)
+
+
+@benchmark("amounts.total[10k]")
+def total_sources():
+    values, bases = _sources()
+    return lambda: amounts.total(values, bases)
+
+
+@benchmark("amounts.total[10k, python]")
+def total_sources_python():
+    values, bases = _sources()
+
+    def total():
+        numpy, amounts.numpy = amounts.numpy, None
+        try:
+            return amounts.total(values, bases)
+        finally:
+            amounts.numpy = numpy
+    return total
@@ -0,0 +1,76 @@
+"""
+Balance curves and monthly income of an account with years of universal dividends and transactions
+"""
+import random
+
+from duniterpy.helpers import amounts, analytics
+from duniterpy.helpers.analytics import Movements
+
+from .harness import benchmark
+
+PUBKEY = "8Fi1VSTbjkXguwThF4v2ZxC5whK7pwG2vcGTkPUPjPGU"
+OTHER = "HnFcSms8jzwngtVomTTnzudZx7SHUQY8sVE1y8yBmULk"
+DAY = 86400
+
+
+def _ud_history(days=3650):
+    return {"pubkey": PUBKEY, "history": {"history": [
+        {"block_number": day * 288, "consumed": False, "time": 1500000000 + day * DAY,
+         "amount": 1000 + day // 10, "base": 0} for day in range(days)]}}
+
+
+def _tx_history(count=5000, seed=42):
+    rng = random.Random(seed)
+    sent = []
+    received = []
+    for index in range(count):
+        time = 1500000000 + rng.randint(0, 3650) * DAY
+        if rng.random() < 0.5:
+            sent.append({"hash": "S{0}".format(index), "time": time, "block_number": index, "issuers": [PUBKEY],
+                         "inputs": ["{0}:0:D:{1}:{2}".format(rng.randint(1, 5000), PUBKEY, index)],
+                         "outputs": ["{0}:0:SIG({1})".format(rng.randint(1, 5000), OTHER)]})
+        else:
+            received.append({"hash": "R{0}".format(index), "time": time, "block_number": index, "issuers": [OTHER],
+                             "inputs": ["{0}:1:T:ABCD:0".format(rng.randint(1, 500))],
+                             "outputs": ["{0}:1:SIG({1})".format(rng.randint(1, 500), PUBKEY)]})
+    return {"pubkey": PUBKEY, "history": {"sent": sent, "received": received}}
+
+
+def _account():
+    return Movements.merge(Movements.from_ud_history(_ud_history()), Movements.from_tx_history(_tx_history()))
+
+
+def _monthly(movements):
+    movements.balance()
+    movements.income(30 * DAY)
+    movements.spending(30 * DAY)
+
+
+@benchmark("analytics.from_history[3650 uds, 5k txs]")
+def from_history():
+    uds = _ud_history()
+    txs = _tx_history()
+    return lambda: Movements.merge(Movements.from_ud_history(uds), Movements.from_tx_history(txs))
+
+
+@benchmark("analytics.monthly[3650 uds, 5k txs]")
+def monthly():
+    movements = _account()
+    return lambda: _monthly(movements)
+
+
+@benchmark("analytics.monthly[3650 uds, 5k txs, python]")
+def monthly_python():
+    numpy, amounts.numpy, analytics.numpy = analytics.numpy, None, None
+    try:
+        movements = _account()
+    finally:
+        amounts.numpy = analytics.numpy = numpy
+
+    def run():
+        analytics.numpy = None
+        try:
+            _monthly(movements)
+        finally:
+            analytics.numpy = numpy
+    return run
@@ -0,0 +1,34 @@
+"""
+Binary encoding of blocks, against their signed raw text.
+The memory retained by block.signed_raw and binary.dumps is the size of one encoded block.
+"""
+import itertools
+
+from duniterpy.documents import Block, binary
+
+from .bench_documents import _chain
+from .harness import benchmark
+
+
+@benchmark("block.signed_raw")
+def block_signed_raw():
+    blocks = itertools.cycle(_chain())
+    return lambda: next(blocks).signed_raw()
+
+
+@benchmark("binary.dumps[block]")
+def binary_dumps_block():
+    blocks = itertools.cycle(_chain())
+    return lambda: binary.dumps(next(blocks))
+
+
+@benchmark("binary.loads[block]")
+def binary_loads_block():
+    data = itertools.cycle([binary.dumps(b) for b in _chain()])
+    return lambda: binary.loads(next(data))
+
+
+@benchmark("binary.loads[block, lazy]")
+def binary_loads_block_lazy():
+    data = itertools.cycle([binary.dumps(b) for b in _chain()])
+    return lambda: binary.loads(next(data), lazy_conditions=True)
@@ -0,0 +1,141 @@
+"""
+Parsing, rendering, hashing and signing of documents
+"""
+import itertools
+
+from duniterpy.documents import Block, Transaction, OutputSource
+from duniterpy.key import SigningKey, VerifyingKey, ScryptParams
+
+from .fixtures import CURRENCY, chain
+from .harness import benchmark
+from .standin import bma_block, bma_transaction
+
+_cache = {}
+
+
+def _chain():
+    if "chain" not in _cache:
+        _cache["chain"] = chain(50)
+    return _cache["chain"]
+
+
+def _transactions_chain():
+    if "transactions chain" not in _cache:
+        # blocks of a busy chain : many transactions, few wot documents
+        _cache["transactions chain"] = chain(20, certifications=2, joiners=0, actives=1, transactions=100)
+    return _cache["transactions chain"]
+
+
+def _transactions():
+    return [tx for block in _chain() for tx in block.transactions]
+
+
+def _key():
+    if "key" not in _cache:
+        _cache["key"] = SigningKey("bench salt", "bench password", ScryptParams(1024, 8, 1))
+    return _cache["key"]
+
+
+@benchmark("block.from_signed_raw")
+def block_from_signed_raw():
+    raws = itertools.cycle([b.signed_raw() for b in _chain()])
+    return lambda: Block.from_signed_raw(next(raws))
+
+
+@benchmark("block.from_signed_raw[transactions]")
+def block_from_signed_raw_transactions():
+    raws = itertools.cycle([b.signed_raw() for b in _transactions_chain()])
+    return lambda: Block.from_signed_raw(next(raws))
+
+
+@benchmark("block.from_bma_json")
+def block_from_bma_json():
+    data = itertools.cycle([bma_block(b) for b in _chain()])
+    return lambda: Block.from_bma_json(next(data))
+
+
+@benchmark("block.from_bma_json[lazy]")
+def block_from_bma_json_lazy():
+    data = itertools.cycle([bma_block(b) for b in _chain()])
+    return lambda: Block.from_bma_json(next(data), lazy_conditions=True)
+
+
+@benchmark("block.raw")
+def block_raw():
+    blocks = itertools.cycle(_chain())
+    return lambda: next(blocks).raw()
+
+
+@benchmark("block.sha_hash")
+def block_sha_hash():
+    blocks = itertools.cycle(_chain())
+    return lambda: next(blocks).sha_hash
+
+
+@benchmark("transaction.from_compact")
+def transaction_from_compact():
+    compacts = itertools.cycle([tx.compact() for tx in _transactions()])
+    return lambda: Transaction.from_compact(CURRENCY, next(compacts))
+
+
+def _from_bma_history_signed_raw(currency, tx_data):
+    """
+    The previous implementation of Transaction.from_bma_history, through a signed raw document
+    """
+    lines = ["Version: {0}".format(tx_data["version"]), "Type: Transaction", "Currency: {0}".format(currency),
+             "Blockstamp: {0}".format(tx_data["blockstamp"]), "Locktime: {0}".format(tx_data["locktime"]),
+             "Issuers:"] + tx_data["issuers"] + ["Inputs:"] + tx_data["inputs"] + ["Unlocks:"] + tx_data["unlocks"] \
+        + ["Outputs:"] + tx_data["outputs"] + ["Comment: {0}".format(tx_data["comment"])] + tx_data["signatures"]
+    return Transaction.from_signed_raw("\n".join(lines) + "\n")
+
+
+@benchmark("transaction.from_bma_history")
+def transaction_from_bma_history():
+    history = itertools.cycle([bma_transaction(tx) for tx in _transactions()])
+    return lambda: Transaction.from_bma_history(CURRENCY, next(history))
+
+
+@benchmark("transaction.from_bma_history[lazy]")
+def transaction_from_bma_history_lazy():
+    history = itertools.cycle([bma_transaction(tx) for tx in _transactions()])
+    return lambda: Transaction.from_bma_history(CURRENCY, next(history), lazy_conditions=True)
+
+
+@benchmark("transaction.from_bma_history[signed raw]")
+def transaction_from_bma_history_signed_raw():
+    history = itertools.cycle([bma_transaction(tx) for tx in _transactions()])
+    return lambda: _from_bma_history_signed_raw(CURRENCY, next(history))
+
+
+@benchmark("transaction.compact")
+def transaction_compact():
+    transactions = itertools.cycle(_transactions())
+    return lambda: next(transactions).compact()
+
+
+@benchmark("output_source.from_inline")
+def output_source_from_inline():
+    inlines = itertools.cycle([o.inline() + "\n" for tx in _transactions() for o in tx.outputs])
+    return lambda: OutputSource.from_inline(next(inlines))
+
+
+@benchmark("transaction.sign")
+def transaction_sign():
+    # copies : the cached chain is parsed and verified by the other benchmarks
+    transactions = itertools.cycle([Transaction.from_compact(CURRENCY, tx.compact()) for tx in _transactions()])
+    keys = [_key()]
+    return lambda: next(transactions).sign(keys)
+
+
+@benchmark("verifying_key.verify_document")
+def verifying_key_verify_document():
+    key = _key()
+    transactions = []
+    for tx in _transactions():
+        tx = Transaction.from_compact(CURRENCY, tx.compact())
+        tx.issuers = [key.pubkey]
+        tx.sign([key])
+        transactions.append(tx)
+    transactions = itertools.cycle(transactions)
+    verifier = VerifyingKey(key.pubkey)
+    return lambda: verifier.verify_document(next(transactions))
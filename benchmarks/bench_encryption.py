@@ -0,0 +1,77 @@
+"""
+Encryption of 10k messages to 1k recipients, with and without the shared keys cache
+"""
+import concurrent.futures
+import hashlib
+
+import libnacl
+import libnacl.public
+
+from duniterpy.key import SecretKey
+from duniterpy.key.base58 import Base58Encoder
+from duniterpy.key.encryption_key import PublicKey
+from duniterpy.key.signing_key import _ensure_bytes
+
+from .harness import benchmark
+
+NOONCE = "00005D6FC6E22FB308D8815A"
+
+_secret_key = None
+
+
+def _sender():
+    global _secret_key
+    if _secret_key is None:
+        _secret_key = SecretKey("benchsalt", "benchpassword")
+    return _secret_key
+
+
+def _messages(count=10000, recipients=1000):
+    pubkeys = []
+    for index in range(recipients):
+        seed = hashlib.sha256(str(index).encode()).digest()
+        public, _ = libnacl.crypto_box_seed_keypair(seed)
+        pubkeys.append(Base58Encoder.encode(public))
+    return [(pubkeys[index % recipients], NOONCE, "Notice number {0}".format(index)) for index in range(count)]
+
+
+def _encrypt_uncached(secret_key, pubkey, noonce, text):
+    """
+    The previous implementation of SecretKey.encrypt, computing the shared key of each message
+    """
+    crypt_bytes = libnacl.public.Box(secret_key, PublicKey(pubkey)).encrypt(_ensure_bytes(text),
+                                                                           _ensure_bytes(noonce))
+    return Base58Encoder.encode(crypt_bytes[24:])
+
+
+@benchmark("secret_key.encrypt[10k to 1k, uncached]")
+def encrypt_uncached():
+    secret_key = _sender()
+    messages = _messages()
+    return lambda: [_encrypt_uncached(secret_key, *message) for message in messages]
+
+
+@benchmark("secret_key.encrypt_many[10k to 1k, cold]")
+def encrypt_many_cold():
+    secret_key = _sender()
+    messages = _messages()
+
+    def encrypt():
+        secret_key.clear_boxes()
+        return secret_key.encrypt_many(messages)
+    return encrypt
+
+
+@benchmark("secret_key.encrypt_many[10k to 1k]")
+def encrypt_many():
+    secret_key = _sender()
+    messages = _messages()
+    return lambda: secret_key.encrypt_many(messages)
+
+
+@benchmark("secret_key.encrypt_many[10k to 1k, 4 threads]")
+def encrypt_many_threads():
+    secret_key = _sender()
+    messages = _messages()
+    executor = concurrent.futures.ThreadPoolExecutor(4)
+    return lambda: secret_key.encrypt_many(messages, executor)
@@ -0,0 +1,22 @@
+"""
+Parsing of the endpoints of a large peer list
+"""
+import itertools
+
+from duniterpy.documents import peer
+
+from .fixtures import endpoints
+from .harness import benchmark
+
+
+@benchmark("endpoint.parse")
+def endpoint_parse():
+    inlines = itertools.cycle(endpoints())
+    parse = peer._endpoint_from_inline.__wrapped__
+    return lambda: parse(next(inlines))
+
+
+@benchmark("endpoint.cached")
+def endpoint_cached():
+    inlines = itertools.cycle(endpoints())
+    return lambda: peer.endpoint(next(inlines))
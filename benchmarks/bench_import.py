@@ -0,0 +1,36 @@
+"""
+Cold start of a python interpreter importing duniterpy.
+Each operation runs a new interpreter, "import.python" measures the interpreter alone.
+"""
+import os
+import subprocess
+import sys
+
+from .harness import benchmark
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _cold_import(statement):
+    command = [sys.executable, "-c", statement]
+    return lambda: subprocess.check_call(command, cwd=ROOT)
+
+
+@benchmark("import.python")
+def import_python():
+    return _cold_import("pass")
+
+
+@benchmark("import.duniterpy")
+def import_duniterpy():
+    return _cold_import("import duniterpy")
+
+
+@benchmark("import.duniterpy.documents")
+def import_documents():
+    return _cold_import("import duniterpy.documents")
+
+
+@benchmark("import.duniterpy.api")
+def import_api():
+    return _cold_import("import duniterpy.api.bma")
@@ -0,0 +1,56 @@
+"""
+Memory retained by a parsed chain segment, with and without strings interning.
+Compare the retained memory of the two benchmarks.
+
+    python -m benchmarks.bench_interning
+
+prints the number of distinct pubkey objects referenced by the output conditions of the chain.
+"""
+from duniterpy.documents import Block, interning
+
+from .fixtures import signed_raw_chain
+from .harness import benchmark
+
+
+def _parse_chain(enabled):
+    raws = signed_raw_chain(100)
+
+    def parse():
+        interning.enable(enabled)
+        try:
+            return [Block.from_signed_raw(raw) for raw in raws]
+        finally:
+            interning.enable(True)
+    return parse
+
+
+@benchmark("chain.parse[interning]")
+def chain_parse_interning():
+    return _parse_chain(True)
+
+
+@benchmark("chain.parse[no interning]")
+def chain_parse_no_interning():
+    return _parse_chain(False)
+
+
+def condition_pubkeys(blocks):
+    """
+    The pubkeys of the SIG output conditions of the transactions of the blocks
+    """
+    for block in blocks:
+        for tx in block.transactions:
+            for o in tx.outputs:
+                if hasattr(o.conditions, "left") and hasattr(o.conditions.left, "pubkey"):
+                    yield o.conditions.left.pubkey
+
+
+def main():
+    for enabled in (False, True):
+        references = list(condition_pubkeys(_parse_chain(enabled)()))
+        print("interning {0:<3} : {1} condition pubkey references, {2} distinct pubkey objects"
+              .format("on" if enabled else "off", len(references), len(set(id(r) for r in references))))
+
+
+if __name__ == '__main__':
+    main()
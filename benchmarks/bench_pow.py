@@ -0,0 +1,48 @@
+"""
+Proof of work attempts per second and per core : the nonce search against a naive loop.
+An operation tries 1000 nonces, so the hashes per second of a core are the operations per second times 1000.
+"""
+from duniterpy.helpers import pow
+from duniterpy.key import SigningKey
+
+from .fixtures import chain
+from .harness import benchmark
+
+ATTEMPTS = 1000
+# a difficulty no nonce meets
+UNREACHABLE = 16 * 64 - 1
+
+_key = None
+
+
+def _block():
+    global _key
+    if _key is None:
+        _key = SigningKey("benchsalt", "benchpassword")
+    block = chain(2)[1]
+    block.issuer = _key.pubkey
+    block.inner_hash = block.computed_inner_hash()
+    return _key, block
+
+
+def _naive(block, key):
+    """
+    A loop rendering, signing and hashing the block for each nonce
+    """
+    for nonce in range(ATTEMPTS):
+        block.noonce = nonce
+        block.sign([key])
+        if pow.meets_powmin(block.proof_of_work(), UNREACHABLE):
+            return nonce
+
+
+@benchmark("pow.attempts[1k, naive]")
+def attempts_naive():
+    key, block = _block()
+    return lambda: _naive(block, key)
+
+
+@benchmark("pow.attempts[1k]")
+def attempts():
+    key, block = _block()
+    return lambda: pow.search_range(key, block.inner_hash, UNREACHABLE, 0, ATTEMPTS)
@@ -0,0 +1,61 @@
+"""
+Signing of 10k certifications, one by one and in batches
+"""
+import concurrent.futures
+import os
+
+from duniterpy.documents import BlockUID, Certification, Identity, signing
+from duniterpy.key import SigningKey
+
+from . import fixtures
+from .harness import benchmark
+
+_key = None
+
+
+def _signing_key():
+    global _key
+    if _key is None:
+        _key = SigningKey("benchsalt", "benchpassword")
+    return _key
+
+
+def _certifications(count=10000):
+    key = _signing_key()
+    timestamp = BlockUID(12, fixtures.block_hash(12))
+    pairs = []
+    for n in range(count):
+        identity = Identity(10, fixtures.CURRENCY, fixtures.pubkey(n), "member{0}".format(n), timestamp,
+                            fixtures.signature("identity", n))
+        pairs.append((Certification(10, fixtures.CURRENCY, key.pubkey, identity.pubkey, timestamp, None), identity))
+    return key, pairs
+
+
+@benchmark("certification.sign[10k]")
+def certification_sign():
+    key, pairs = _certifications()
+
+    def sign():
+        for certification, identity in pairs:
+            certification.sign(identity, [key])
+    return sign
+
+
+@benchmark("signing.sign_documents[10k]")
+def sign_documents():
+    key, pairs = _certifications()
+    return lambda: signing.sign_documents(pairs, [key])
+
+
+@benchmark("signing.sign_documents[10k, threads]")
+def sign_documents_threads():
+    key, pairs = _certifications()
+    executor = concurrent.futures.ThreadPoolExecutor(os.cpu_count())
+    return lambda: signing.sign_documents(pairs, [key], executor)
+
+
+@benchmark("signing.sign_documents[10k, processes]")
+def sign_documents_processes():
+    key, pairs = _certifications()
+    executor = concurrent.futures.ProcessPoolExecutor(os.cpu_count())
+    return lambda: signing.sign_documents(pairs, [key], executor, chunk_size=1000)
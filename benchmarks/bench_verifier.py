@@ -0,0 +1,49 @@
+"""
+Verification of a segment of 100 blocks : inner hash, proof of work, signature and chaining
+"""
+import concurrent.futures
+import os
+
+from duniterpy.helpers import pow, verifier
+from duniterpy.key import VerifyingKey
+
+from .fixtures import chain
+from .harness import benchmark
+
+
+def _by_hand(blocks):
+    """
+    The checks of each block done with the methods of the documents and keys
+    """
+    failing = []
+    previous = None
+    for block in blocks:
+        checks = [block.computed_inner_hash() == block.inner_hash,
+                  pow.meets_powmin(block.proof_of_work(), block.powmin),
+                  VerifyingKey(block.issuer).verify_document(block)]
+        if previous is not None:
+            checks += [block.prev_hash == previous.blockUID.sha_hash, block.prev_issuer == previous.issuer]
+        valid = all(checks)
+        if not valid:
+            failing.append(block.number)
+        previous = block
+    return failing
+
+
+@benchmark("verifier.verify_blocks[100, by hand]")
+def verify_by_hand():
+    blocks = chain(100)
+    return lambda: _by_hand(blocks)
+
+
+@benchmark("verifier.verify_blocks[100]")
+def verify_blocks():
+    blocks = chain(100)
+    return lambda: verifier.verify_blocks(blocks)
+
+
+@benchmark("verifier.verify_blocks[100, processes]")
+def verify_blocks_processes():
+    blocks = chain(100)
+    executor = concurrent.futures.ProcessPoolExecutor(os.cpu_count())
+    return lambda: verifier.verify_blocks(blocks, executor=executor, chunk_size=25)
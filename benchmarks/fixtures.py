@@ -0,0 +1,145 @@
+"""
+Deterministic synthetic documents for the benchmarks.
+
+Every fixture is generated from a seeded random generator with the documents classes
+of duniterpy, so two runs (or two revisions) work on exactly the same data.
+"""
+import base64
+import hashlib
+import random
+
+import base58
+
+from duniterpy.documents import Block, BlockUID, Identity, Certification, Membership, Transaction, \
+    InputSource, OutputSource, Unlock, SIGParameter
+
+CURRENCY = "g1-bench"
+
+
+def _digest(*parts):
+    return hashlib.sha256(":".join(str(p) for p in parts).encode("ascii")).digest()
+
+
+def pubkey(n):
+    """
+    A valid-looking base58 pubkey
+    """
+    encoded = base58.b58encode(_digest("pubkey", n))
+    return encoded.decode("ascii") if isinstance(encoded, bytes) else encoded
+
+
+def signature(*parts):
+    """
+    A valid-looking base64 signature
+    """
+    return base64.b64encode(_digest("sig", *parts) + _digest("sig2", *parts)).decode("ascii")
+
+
+def block_hash(number):
+    return hashlib.sha256(str(number).encode("ascii")).hexdigest().upper()
+
+
+def transaction(rng, number, issuer, members, inputs=2, outputs=2):
+    """
+    A compact-able transaction of a block
+    """
+    blockstamp = BlockUID(max(number - 1, 0), block_hash(max(number - 1, 0)))
+    input_sources = []
+    for i in range(inputs):
+        if rng.random() < 0.5:
+            input_sources.append(InputSource(rng.randint(1, 100000), 0, "D", issuer, rng.randint(1, number + 1)))
+        else:
+            input_sources.append(InputSource(rng.randint(1, 100000), 0, "T", block_hash(rng.random()),
+                                             rng.randint(0, 3)))
+    unlocks = [Unlock(i, [SIGParameter(0)]) for i in range(inputs)]
+    output_sources = [OutputSource.from_inline("{0}:0:SIG({1})\n".format(rng.randint(1, 100000),
+                                                                         rng.choice(members)))
+                      for i in range(outputs)]
+    tx = Transaction(10, CURRENCY, blockstamp, 0, [issuer], input_sources, unlocks, output_sources,
+                     "bench tx {0}".format(number), [])
+    tx.signatures = [signature("tx", number, issuer)]
+    return tx
+
+
+def block(number, members, rng, certifications=20, joiners=2, actives=5, transactions=5):
+    """
+    A block of the synthetic chain, using the given pool of members pubkeys
+    """
+    prev = BlockUID(number - 1, block_hash(number - 1))
+    identities = []
+    joiners_list = []
+    for i in range(joiners):
+        newcomer = pubkey("newcomer-{0}-{1}".format(number, i))
+        uid = "newcomer{0}x{1}".format(number, i)
+        identities.append(Identity(10, CURRENCY, newcomer, uid, prev, signature("idty", number, i)))
+        joiners_list.append(Membership(10, CURRENCY, newcomer, prev, "IN", uid, prev,
+                                       signature("join", number, i)))
+    actives_list = []
+    for i in range(actives):
+        member = rng.choice(members)
+        actives_list.append(Membership(10, CURRENCY, member, prev, "IN", "member{0}".format(members.index(member)),
+                                       BlockUID(0, block_hash(0)), signature("active", number, i)))
+    certs = []
+    for i in range(certifications):
+        pubkey_from, pubkey_to = rng.sample(members, 2)
+        certs.append(Certification(10, CURRENCY, pubkey_from, pubkey_to, prev, signature("cert", number, i)))
+    issuer = members[number % 20]
+    txs = [transaction(rng, number, rng.choice(members), members) for i in range(transactions)]
+    return Block(10, CURRENCY, number, 80, 1500000000 + number * 300, 1500000000 + number * 300 - 1800,
+                 None, 0, issuer, 40, 0, 20, prev.sha_hash, members[(number - 1) % 20], None, len(members),
+                 identities, joiners_list, actives_list, [], [], [], certs, txs,
+                 block_hash("inner{0}".format(number)), number * 1000, signature("block", number))
+
+
+def chain(length=100, members_count=500, seed=42, **kwargs):
+    """
+    A deterministic segment of a chain
+
+    :param int length: number of blocks
+    :param int members_count: size of the members pool
+    :param int seed: seed of the random generator
+    :rtype: list[duniterpy.documents.Block]
+    """
+    rng = random.Random(seed)
+    members = [pubkey(i) for i in range(members_count)]
+    return [block(number, members, rng, **kwargs) for number in range(1, length + 1)]
+
+
+def signed_raw_chain(length=100, members_count=500, seed=42, **kwargs):
+    """
+    The signed raw documents of a deterministic segment of a chain
+
+    :rtype: list[str]
+    """
+    return [b.signed_raw() for b in chain(length, members_count, seed, **kwargs)]
+
+
+def endpoints(count=5000, seed=42):
+    """
+    Inline endpoints of a large peer list, mixing every managed API
+
+    :rtype: list[str]
+    """
+    rng = random.Random(seed)
+    result = []
+    for i in range(count):
+        ipv4 = "{0}.{1}.{2}.{3}".format(rng.randint(1, 223), rng.randint(0, 255), rng.randint(0, 255),
+                                        rng.randint(1, 254))
+        ipv6 = "2001:{0:x}:{1:x}::{2:x}".format(rng.randint(1, 0xffff), rng.randint(0, 0xffff),
+                                                 rng.randint(1, 0xffff))
+        host = "node{0}.duniter{1}.org".format(i, rng.randint(0, 99))
+        port = rng.randint(1024, 65535)
+        kind = i % 6
+        if kind == 0:
+            result.append("BASIC_MERKLED_API {0} {1} {2} {3}".format(host, ipv4, ipv6, port))
+        elif kind == 1:
+            result.append("BASIC_MERKLED_API {0} {1}".format(ipv6, port))
+        elif kind == 2:
+            result.append("BMAS {0} 443 /bma".format(host))
+        elif kind == 3:
+            result.append("WS2P {0:08x} {1} {2} /ws2p".format(rng.getrandbits(32), host, port))
+        elif kind == 4:
+            result.append("ES_USER_API {0} {1}".format(host, port))
+        else:
+            result.append("OTHER_PROTOCOL {0} {1}".format(ipv4, port))
+    return result
@@ -0,0 +1,80 @@
+"""
+Measures of the benchmarks : operations per second and memory allocations.
+
+A benchmark is a setup function registered with the benchmark decorator.
+It builds its fixtures and returns the callable to measure, which runs one operation.
+"""
+import gc
+import timeit
+import tracemalloc
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """
+    Register a benchmark setup function under a name
+
+    :param str name: the name of the benchmark, as "<object>.<operation>"
+    """
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+
+def ops_per_second(func, repeat=5, min_time=0.2):
+    """
+    Best rate of calls of a function, over several runs long enough to be timed
+
+    :param func: the function to call, without arguments
+    :param int repeat: number of timed runs
+    :param float min_time: minimum duration of a run in seconds
+    :rtype: float
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    elapsed = timer.timeit(number)
+    while elapsed < min_time:
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.2))
+        elapsed = timer.timeit(number)
+    best = min([elapsed] + timer.repeat(repeat - 1, number))
+    return number / best
+
+
+def allocations(func, repeat=3):
+    """
+    Memory allocated by one call of a function.
+    The smallest measure of several calls is kept, as a call may pay for the
+    growth of a shared table (the interned strings for example).
+
+    :param func: the function to call, without arguments
+    :param int repeat: number of measured calls
+    :return: the peak of memory allocated during the call
+        and the memory retained by its result, in bytes
+    :rtype: tuple[int, int]
+    """
+    measures = []
+    for _ in range(repeat):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            result = func()
+            measures.append(tracemalloc.get_traced_memory()[::-1])
+        finally:
+            tracemalloc.stop()
+        del result
+    return min(measures)
+
+
+def measure(func, repeat=5, min_time=0.2):
+    """
+    Measure the speed and the allocations of a function
+
+    :rtype: dict
+    """
+    ops = ops_per_second(func, repeat, min_time)
+    # measured after the timing, so the one-time allocations of the caches are not counted
+    peak, retained = allocations(func)
+    return {"ops": ops, "peak": peak, "retained": retained}
+
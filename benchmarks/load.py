@@ -0,0 +1,132 @@
+"""
+Load test of the client stack against a local stand-in BMA node : requests per second and latency percentiles
+of concurrent clients, with optional latency and error injection on the node side
+
+    python -m benchmarks.load
+    python -m benchmarks.load --clients 100 --duration 10 --latency 0.02 --error-rate 0.05 --retry
+"""
+import argparse
+import asyncio
+import collections
+import random
+import sys
+import time
+
+import aiohttp
+
+from duniterpy.api.bma import ConnectionHandler, blockchain, tx, ud, wot
+from duniterpy.api.retry import RetryPolicy
+
+from . import fixtures
+from .standin import StandinNode
+
+
+def percentile(values, q):
+    """
+    The percentile of sorted values, by nearest rank
+
+    :param list[float] values: the sorted values
+    :param float q: the percentile, between 0 and 1
+    :rtype: float
+    """
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, max(0, int(round(q * len(values) + 0.5)) - 1))]
+
+
+def requests_mix(node, rng):
+    """
+    The requests of the clients : their name and a function building the request coroutine from a connection
+    """
+    numbers = [block.number for block in node.blocks]
+    members = list(node.identities)
+    issuers = list(node.transactions)
+    return [
+        ("blockchain.current", lambda c: blockchain.current(c)),
+        ("blockchain.block", lambda c: blockchain.block(c, rng.choice(numbers))),
+        ("tx.history", lambda c: tx.history(c, rng.choice(issuers))),
+        ("wot.requirements", lambda c: wot.requirements(c, rng.choice(members))),
+        ("ud.history", lambda c: ud.history(c, rng.choice(members))),
+    ]
+
+
+async def load(node, clients, duration, retry_policy=None, seed=42):
+    """
+    Run concurrent clients sending the requests of the mix in turn during a duration
+
+    :return: the latencies of the successful requests and the number of failed ones, by request name,
+        and the elapsed time
+    :rtype: tuple
+    """
+    rng = random.Random(seed)
+    latencies = collections.defaultdict(list)
+    failures = collections.Counter()
+    mix = requests_mix(node, rng)
+    connector = aiohttp.TCPConnector(limit=clients)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        connection = ConnectionHandler("http", "ws", "127.0.0.1", node.port, session=session,
+                                       retry_policy=retry_policy)
+        deadline = time.perf_counter() + duration
+
+        async def client(index):
+            turn = index
+            while time.perf_counter() < deadline:
+                name, request = mix[turn % len(mix)]
+                turn += 1
+                start = time.perf_counter()
+                try:
+                    await request(connection)
+                except Exception:
+                    failures[name] += 1
+                else:
+                    latencies[name].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[client(i) for i in range(clients)])
+        return latencies, failures, time.perf_counter() - start
+
+
+def report(latencies, failures, elapsed):
+    lines = []
+    names = sorted(set(latencies) | set(failures))
+    total = sum(len(values) for values in latencies.values())
+    overall = sorted(value for values in latencies.values() for value in values)
+    for name, values in [(name, sorted(latencies[name])) for name in names] + [("all", overall)]:
+        count = total if name == "all" else len(values)
+        failed = sum(failures.values()) if name == "all" else failures[name]
+        lines.append("{0:<20} {1:>9.1f} req/s {2:>8.1f} ms p50 {3:>8.1f} ms p99 {4:>6} failed"
+                     .format(name, count / elapsed, 1000 * percentile(values, 0.5),
+                             1000 * percentile(values, 0.99), failed))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="duniterpy load test against a stand-in BMA node")
+    parser.add_argument("--clients", type=int, default=50, help="number of concurrent clients")
+    parser.add_argument("--duration", type=float, default=5, help="duration of the test in seconds")
+    parser.add_argument("--blocks", type=int, default=100, help="length of the synthetic chain")
+    parser.add_argument("--latency", type=float, default=0., help="latency of the node in seconds")
+    parser.add_argument("--jitter", type=float, default=0., help="random latency added, up to this value")
+    parser.add_argument("--error-rate", type=float, default=0., help="part of the requests failing")
+    parser.add_argument("--padding", type=int, default=0, help="bytes added to each answer")
+    parser.add_argument("--retry", action="store_true", help="retry the failed requests")
+    args = parser.parse_args(argv)
+
+    node = StandinNode(fixtures.chain(args.blocks), latency=args.latency, jitter=args.jitter,
+                       error_rate=args.error_rate, padding=args.padding)
+    retry_policy = RetryPolicy(backoff=0.01) if args.retry else None
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(node.start())
+        latencies, failures, elapsed = loop.run_until_complete(load(node, args.clients, args.duration,
+                                                                    retry_policy))
+        loop.run_until_complete(node.stop())
+    finally:
+        loop.close()
+    print("{0} clients, {1:.1f} s, node latency {2} s, error rate {3}".format(args.clients, elapsed, args.latency,
+                                                                         args.error_rate))
+    print(report(latencies, failures, elapsed))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,78 @@
+"""
+Run the benchmarks, save their results and compare them with the results of another revision
+
+    python -m benchmarks.run
+    python -m benchmarks.run --save before.json
+    python -m benchmarks.run --compare before.json block transaction
+"""
+import argparse
+import importlib
+import json
+import platform
+import subprocess
+import sys
+
+from .harness import BENCHMARKS, measure
+
+MODULES = ("bench_documents", "bench_amounts", "bench_analytics", "bench_binary", "bench_encryption", "bench_endpoints",
+           "bench_import", "bench_interning", "bench_pow", "bench_signing",
+           "bench_verifier")
+
+
+def revision():
+    """
+    The git revision of the working tree, if available
+
+    :rtype: str
+    """
+    try:
+        return subprocess.check_output(["git", "describe", "--always", "--dirty"],
+                                       stderr=subprocess.DEVNULL).decode("ascii").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_line(name, result, baseline=None):
+    line = "{0:<42} {1:>12.1f} ops/s {2:>10.1f} KiB peak {3:>10.1f} KiB retained" \
+        .format(name, result["ops"], result["peak"] / 1024, result["retained"] / 1024)
+    if baseline is not None:
+        line += "   {0:>+7.1f}% ops/s {1:>+7.1f}% peak".format(100 * (result["ops"] / baseline["ops"] - 1),
+                                                              100 * (result["peak"] / max(baseline["peak"], 1) - 1))
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="duniterpy benchmarks")
+    parser.add_argument("patterns", nargs="*", help="run the benchmarks whose name contains one of these patterns")
+    parser.add_argument("--save", help="save the results in this JSON file")
+    parser.add_argument("--compare", help="compare with the results saved in this JSON file")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs of each benchmark")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum duration of a timed run in seconds")
+    args = parser.parse_args(argv)
+
+    for module in MODULES:
+        importlib.import_module("{0}.{1}".format(__package__, module))
+    names = [n for n in sorted(BENCHMARKS) if not args.patterns or any(p in n for p in args.patterns)]
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            saved = json.load(f)
+        baseline = saved["results"]
+        print("compared with {0} (python {1})".format(saved.get("revision"), saved.get("python")))
+
+    results = {}
+    for name in names:
+        results[name] = measure(BENCHMARKS[name](), args.repeat, args.min_time)
+        print(format_line(name, results[name], baseline.get(name)))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"revision": revision(),
+                       "python": platform.python_version(),
+                       "platform": platform.platform(),
+                       "results": results}, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
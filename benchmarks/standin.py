@@ -0,0 +1,413 @@
+"""
+A local stand-in of a BMA node, serving a synthetic chain, to test and load test the client stack
+without real nodes, and the BMA json of the documents it serves.
+
+The answers can be slowed down (latency), fail at random (error injection) and be padded (payload size)::
+
+    node = StandinNode(fixtures.chain(100), latency=0.01, error_rate=0.05)
+    port = await node.start()
+    ...
+    await node.stop()
+"""
+import asyncio
+import collections
+import hashlib
+import json
+import random
+
+from aiohttp import web
+
+
+def bma_transaction(tx, block_number=1):
+    """
+    The json of a transaction in a tx.history answer of BMA
+
+    :param duniterpy.documents.Transaction tx: the transaction
+    :param int block_number: the number of the block of the transaction
+    :rtype: dict
+    """
+    return {
+        "version": tx.version,
+        "locktime": tx.locktime,
+        "blockstamp": str(tx.blockstamp),
+        "blockstampTime": 1500000000,
+        "issuers": list(tx.issuers),
+        "inputs": [i.inline(tx.version) for i in tx.inputs],
+        "unlocks": [u.inline() for u in tx.unlocks],
+        "outputs": [o.inline() for o in tx.outputs],
+        "comment": tx.comment,
+        "signatures": list(tx.signatures),
+        "hash": tx.sha_hash,
+        "block_number": block_number,
+        "time": 1500000000 + block_number * 300
+    }
+
+
+def bma_block(block):
+    """
+    The json of a block in a blockchain.block answer of BMA
+
+    :param duniterpy.documents.Block block: the block
+    :rtype: dict
+    """
+    transactions = []
+    for tx in block.transactions:
+        tx_data = bma_transaction(tx, block.number)
+        tx_data["currency"] = tx.currency
+        del tx_data["block_number"], tx_data["time"]
+        transactions.append(tx_data)
+    return {
+        "version": block.version,
+        "currency": block.currency,
+        "nonce": block.noonce,
+        "number": block.number,
+        "powMin": block.powmin,
+        "time": block.time,
+        "medianTime": block.mediantime,
+        "membersCount": block.members_count,
+        "monetaryMass": 0,
+        "unitbase": block.unit_base,
+        "issuersCount": block.different_issuers_count,
+        "issuersFrame": block.issuers_frame,
+        "issuersFrameVar": block.issuers_frame_var,
+        "issuer": block.issuer,
+        "signature": block.signatures[0],
+        "hash": block.blockUID.sha_hash,
+        "parameters": ":".join(str(p) for p in block.parameters) if block.parameters else "",
+        "previousHash": block.prev_hash,
+        "previousIssuer": block.prev_issuer,
+        "inner_hash": block.inner_hash,
+        "dividend": block.ud,
+        "identities": [i.inline() for i in block.identities],
+        "joiners": [m.inline() for m in block.joiners],
+        "actives": [m.inline() for m in block.actives],
+        "leavers": [m.inline() for m in block.leavers],
+        "revoked": [r.inline() for r in block.revoked],
+        "excluded": list(block.excluded),
+        "certifications": [c.inline() for c in block.certifications],
+        "transactions": transactions
+    }
+
+
+# an identity of the chain, from its Identity document or from a membership of its pubkey
+Member = collections.namedtuple("Member", "uid timestamp signature")
+
+
+class StandinNode:
+    """
+    An aiohttp application answering the BMA routes used by duniterpy from a list of blocks :
+    blockchain/*, tx/history*, wot/members, wot/lookup, wot/requirements, wot/certifiers-of, wot/certified-by,
+    network/peering*,
+    ud/history, node/summary and the ws/block websocket.
+    """
+    def __init__(self, blocks, latency=0., jitter=0., error_rate=0., error_statuses=(500, 503), padding=0,
+                 seed=0):
+        """
+        :param list[duniterpy.documents.Block] blocks: the chain, sorted by number
+        :param float latency: the delay before each answer, in seconds
+        :param float jitter: a random delay added to the latency, up to this value in seconds
+        :param float error_rate: the part of the requests answered by an error status, between 0 and 1
+        :param tuple[int] error_statuses: the error statuses, picked at random
+        :param int padding: the size in bytes of a dummy field added to each json answer
+        :param int seed: the seed of the random generator of the latencies and errors
+        """
+        self.blocks = list(blocks)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.padding = padding
+        self.random = random.Random(seed)
+        # requests received and errors injected, by route
+        self.requests = collections.Counter()
+        self.errors = collections.Counter()
+        self.port = None
+        self.websockets = set()
+        self._runner = None
+        self._index()
+
+    @property
+    def currency(self):
+        return self.blocks[-1].currency
+
+    def _index(self):
+        """
+        Index the chain : the blocks by number, the identities, certifications, transactions
+        and dividends of the accounts
+        """
+        self.by_number = {}
+        self.identities = collections.OrderedDict()
+        # identities excluded or revoked, not members any more
+        self.excluded = set()
+        self.certifications = collections.defaultdict(list)
+        self.transactions = collections.defaultdict(lambda: {"sent": [], "received": []})
+        self.dividends = collections.defaultdict(list)
+        for block in self.blocks:
+            self._index_block(block)
+
+    def _index_block(self, block):
+        """
+        Add a block, following the indexed ones, to the indexes
+        """
+        self.by_number[block.number] = block
+        for identity in block.identities:
+            self.identities[identity.pubkey] = Member(identity.uid, identity.timestamp, identity.signatures[0])
+        for membership in block.joiners + block.actives:
+            self.identities.setdefault(membership.issuer, Member(membership.uid, membership.identity_ts, ""))
+        for pubkey in list(block.excluded) + [revocation.pubkey for revocation in block.revoked]:
+            self.excluded.add(pubkey)
+        for membership in block.joiners:
+            self.excluded.discard(membership.issuer)
+        for certification in block.certifications:
+            self.certifications[certification.pubkey_to].append((certification, block))
+        for transaction in block.transactions:
+            data = bma_transaction(transaction, block.number)
+            data["time"] = block.mediantime
+            for issuer in transaction.issuers:
+                self.transactions[issuer]["sent"].append(data)
+            for output in transaction.outputs:
+                condition = str(output.conditions)
+                if condition.startswith("SIG(") and condition.endswith(")"):
+                    self.transactions[condition[4:-1]]["received"].append(data)
+        if block.ud:
+            for pubkey in self.identities:
+                self.dividends[pubkey].append({"block_number": block.number, "consumed": False,
+                                               "time": block.mediantime, "amount": block.ud,
+                                               "base": block.unit_base})
+
+    def peering(self):
+        current = self.blocks[-1]
+        return {
+            "version": 10,
+            "currency": self.currency,
+            "pubkey": current.issuer,
+            "block": "{0}-{1}".format(current.number, current.blockUID.sha_hash),
+            "endpoints": ["BASIC_MERKLED_API 127.0.0.1 {0}".format(self.port)],
+            "signature": current.signatures[0]
+        }
+
+    def application(self):
+        """
+        :rtype: aiohttp.web.Application
+        """
+        app = web.Application(middlewares=[self._middleware])
+        routes = [
+            ("/node/summary", self.summary),
+            ("/blockchain/current", self.current),
+            ("/blockchain/block/{number}", self.block),
+            ("/blockchain/blocks/{count}/{start}", self.chunk),
+            ("/tx/history/{pubkey}", self.tx_history),
+            ("/tx/history/{pubkey}/blocks/{start}/{end}", self.tx_history),
+            ("/tx/history/{pubkey}/times/{start}/{end}", self.tx_history),
+            ("/wot/members", self.members),
+            ("/wot/lookup/{search}", self.lookup),
+            ("/wot/requirements/{search}", self.requirements),
+            ("/wot/certifiers-of/{search}", self.certifiers_of),
+            ("/wot/certified-by/{search}", self.certified_by),
+            ("/network/peering", self.network_peering),
+            ("/network/peering/peers", self.peers),
+            ("/ud/history/{pubkey}", self.ud_history),
+            ("/ws/block", self.ws_block),
+        ]
+        for path, handler in routes:
+            app.router.add_route("GET", path, handler)
+        return app
+
+    async def start(self, host="127.0.0.1", port=0):
+        """
+        Start serving
+
+        :param str host: the listening address
+        :param int port: the listening port, 0 for a free port
+        :return: the listening port
+        :rtype: int
+        """
+        self._runner = web.AppRunner(self.application())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self.port
+
+    async def stop(self):
+        """
+        Close the websockets and stop serving
+        """
+        for ws in list(self.websockets):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def push_block(self, block):
+        """
+        Add a block to the chain and send it to the ws/block websockets
+
+        :param duniterpy.documents.Block block: the new current block
+        """
+        self.blocks.append(block)
+        self._index_block(block)
+        for ws in list(self.websockets):
+            await ws.send_str(json.dumps(bma_block(block)))
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        resource = request.match_info.route.resource
+        route = resource.canonical if resource is not None else "unknown"
+        self.requests[route] += 1
+        delay = self.latency + self.jitter * self.random.random()
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors[route] += 1
+            status = self.random.choice(self.error_statuses)
+            return web.json_response({"ucode": 1001, "message": "Injected error"}, status=status)
+        return await handler(request)
+
+    def _json(self, data):
+        if self.padding:
+            data["padding"] = "x" * self.padding
+        return web.json_response(data)
+
+    @staticmethod
+    def _not_found(message):
+        return web.json_response({"ucode": 2001, "message": message}, status=404)
+
+    async def summary(self, request):
+        return self._json({"duniter": {"software": "duniter", "version": "1.6.25", "forkWindowSize": 100}})
+
+    async def current(self, request):
+        return self._json(bma_block(self.blocks[-1]))
+
+    async def block(self, request):
+        block = self.by_number.get(int(request.match_info["number"]))
+        if block is None:
+            return self._not_found("Block not found")
+        return self._json(bma_block(block))
+
+    async def chunk(self, request):
+        start, count = int(request.match_info["start"]), int(request.match_info["count"])
+        return web.json_response([bma_block(self.by_number[n]) for n in range(start, start + count)
+                                  if n in self.by_number])
+
+    async def tx_history(self, request):
+        pubkey = request.match_info["pubkey"]
+        history = self.transactions.get(pubkey, {"sent": [], "received": []})
+        sent, received = history["sent"], history["received"]
+        if "start" in request.match_info:
+            start, end = int(request.match_info["start"]), int(request.match_info["end"])
+            field = "time" if "/times/" in request.path else "block_number"
+            sent = [t for t in sent if start <= t[field] <= end]
+            received = [t for t in received if start <= t[field] <= end]
+        return self._json({"currency": self.currency, "pubkey": pubkey,
+                           "history": {"sent": sent, "received": received, "sending": [], "receiving": []}})
+
+    async def members(self, request):
+        return self._json({"results": [{"pubkey": pubkey, "uid": identity.uid}
+                                       for pubkey, identity in self.identities.items()
+                                       if pubkey not in self.excluded]})
+
+    def _search(self, search):
+        return [(pubkey, identity) for pubkey, identity in self.identities.items()
+                if search in (pubkey, identity.uid)]
+
+    async def lookup(self, request):
+        results = []
+        for pubkey, identity in self._search(request.match_info["search"]):
+            others = [{"pubkey": certification.pubkey_from,
+                       "meta": {"block_number": block.number},
+                       "signature": certification.signatures[0]}
+                      for certification, block in self.certifications.get(pubkey, [])]
+            results.append({
+                "pubkey": pubkey,
+                "uids": [{"uid": identity.uid, "meta": {"timestamp": str(identity.timestamp)},
+                          "self": identity.signature, "revokation_sig": None, "revoked_on": None,
+                          "revoked": False, "others": others}],
+                "signed": []
+            })
+        if not results:
+            return self._not_found("No matching identity")
+        return self._json({"partial": False, "results": results})
+
+    async def requirements(self, request):
+        current = self.blocks[-1]
+        identities = []
+        for pubkey, identity in self._search(request.match_info["search"]):
+            certifications = [{"from": certification.pubkey_from, "to": pubkey,
+                               "expiresIn": max(0, 3600 * 24 * 365 - (current.mediantime - block.mediantime))}
+                              for certification, block in self.certifications.get(pubkey, [])]
+            identities.append({
+                "pubkey": pubkey, "uid": identity.uid, "meta": {"timestamp": str(identity.timestamp)},
+                "outdistanced": False, "certifications": certifications, "membershipPendingExpiresIn": 0,
+                "membershipExpiresIn": 3600 * 24 * 365, "wasMember": True, "isSentry": len(certifications) >= 5,
+                "revoked": False, "revoked_on": None, "revocation_sig": None
+            })
+        if not identities:
+            return self._not_found("No identity matching this pubkey or uid")
+        return self._json({"identities": identities})
+
+    def _links(self, search, subject, other):
+        """
+        The certifications of the identity matching a search, as answered by certifiers-of and certified-by
+
+        :param str search: the pubkey or uid
+        :param subject: the function giving the pubkey of the searched identity in a certification
+        :param other: the function giving the pubkey of the other end of a certification
+        """
+        found = self._search(search)
+        if not found:
+            return self._not_found("No member matching this pubkey or uid")
+        pubkey, identity = found[0]
+        links = []
+        for certifications in self.certifications.values():
+            for certification, block in certifications:
+                if subject(certification) != pubkey:
+                    continue
+                other_pubkey = other(certification)
+                other_identity = self.identities.get(other_pubkey)
+                links.append({"pubkey": other_pubkey, "uid": other_identity.uid if other_identity else "",
+                              "cert_time": {"block": block.number, "medianTime": block.mediantime},
+                              "sigDate": str(certification.timestamp),
+                              "written": {"number": block.number, "hash": block.blockUID.sha_hash},
+                              "isMember": other_identity is not None, "wasMember": other_identity is not None,
+                              "signature": certification.signatures[0]})
+        return self._json({"pubkey": pubkey, "uid": identity.uid, "isMember": True, "certifications": links})
+
+    async def certifiers_of(self, request):
+        return self._links(request.match_info["search"], lambda c: c.pubkey_to, lambda c: c.pubkey_from)
+
+    async def certified_by(self, request):
+        return self._links(request.match_info["search"], lambda c: c.pubkey_from, lambda c: c.pubkey_to)
+
+    async def network_peering(self, request):
+        return self._json(self.peering())
+
+    async def peers(self, request):
+        peering = self.peering()
+        leaf_hash = hashlib.sha256(json.dumps(peering, sort_keys=True).encode("ascii")).hexdigest().upper()
+        data = {"depth": 0, "nodesCount": 0, "leavesCount": 1, "root": leaf_hash}
+        if request.query.get("leaves") == "true":
+            data["leaves"] = [leaf_hash]
+        elif "leaf" in request.query:
+            if request.query["leaf"] != leaf_hash:
+                return self._not_found("Leaf not found")
+            data["leaves"] = []
+            data["leaf"] = {"hash": leaf_hash, "value": peering}
+        return self._json(data)
+
+    async def ud_history(self, request):
+        pubkey = request.match_info["pubkey"]
+        return self._json({"currency": self.currency, "pubkey": pubkey,
+                           "history": {"history": self.dividends.get(pubkey, [])}})
+
+    async def ws_block(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.websockets.add(ws)
+        try:
+            await ws.send_str(json.dumps(bma_block(self.blocks[-1])))
+            async for _ in ws:
+                pass
+        finally:
+            self.websockets.discard(ws)
+        return ws
@@ -21,4 +21,20 @@ __author__      = 'Caner Candan & inso & vit'
 __version__     = '0.42.2'
 __nonsense__    = 'duniter'
 
-from . import api, documents, key
\ No newline at end of file
+import importlib
+import sys
+
+# the subpackages are imported on first access : documents does not need aiohttp, key needs libnacl...
+_SUBPACKAGES = ("api", "documents", "key")
+
+if sys.version_info < (3, 7):
+    # module __getattr__ (PEP 562) is not available
+    from . import api, documents, key
+else:
+    def __getattr__(name):
+        if name in _SUBPACKAGES:
+            return importlib.import_module("." + name, __name__)
+        raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+
+    def __dir__():
+        return sorted(list(globals()) + list(_SUBPACKAGES))
@@ -18,10 +18,13 @@
 # Inso <insomniak.fr at gmail.com>
 
 
+import asyncio
 import aiohttp
 import json
 import logging
+import time
 import jsonschema
+from .. import instrumentation
 from ..errors import DuniterError
 
 logger = logging.getLogger("duniter")
@@ -39,17 +42,23 @@ ERROR_SCHEMA = {
     "required": ["ucode", "message"]
 }
 
+# compiled validators by schema id, with their schema to keep the id from being reused
+_validators = {}
+MAX_VALIDATORS = 256
+
 
 class ConnectionHandler(object):
     """Helper class used by other API classes to ease passing server connection information."""
 
-    def __init__(self, http_scheme, ws_scheme, server, port, path="", proxy=None, session=None):
+    def __init__(self, http_scheme, ws_scheme, server, port, path="", proxy=None, session=None, retry_policy=None):
         """
         Init instance of connection handler
 
         :param str server: Server IP or domaine name
         :param int port: Port
         :param aiohttp.ClientSession|None session: Session AIOHTTP
+        :param duniterpy.api.retry.RetryPolicy|None retry_policy: Retry policy of the GET requests,
+            None for a single attempt
         """
         self.http_scheme = http_scheme
         self.ws_scheme = ws_scheme
@@ -58,11 +67,31 @@ class ConnectionHandler(object):
         self.port = port
         self.session = session
         self.path = path
+        self.retry_policy = retry_policy
 
     def __str__(self):
         return 'connection info: %s:%d' % (self.server, self.port)
 
 
+def validator(schema):
+    """
+    The validator of a schema. The schema is checked and compiled once, the validators of the schemas
+    of the api modules being cached.
+
+    :param dict schema: the expected json structure
+    :rtype: jsonschema.protocols.Validator
+    """
+    entry = _validators.get(id(schema))
+    if entry is None or entry[0] is not schema:
+        cls = jsonschema.validators.validator_for(schema)
+        cls.check_schema(schema)
+        # schemas built on each call would fill the cache
+        if len(_validators) >= MAX_VALIDATORS:
+            _validators.clear()
+        entry = _validators[id(schema)] = (schema, cls(schema))
+    return entry[1]
+
+
 def parse_text(text, schema):
     """
     Validate and parse the BMA answer from websocket
@@ -72,7 +101,7 @@ def parse_text(text, schema):
     """
     try:
         data = json.loads(text)
-        jsonschema.validate(data, schema)
+        validator(schema).validate(data)
         return data
     except (TypeError, json.decoder.JSONDecodeError):
         raise jsonschema.ValidationError("Could not parse json")
@@ -87,7 +116,7 @@ def parse_error(text):
     """
     try:
         data = json.loads(text)
-        jsonschema.validate(data, ERROR_SCHEMA)
+        validator(ERROR_SCHEMA).validate(data)
         return data
     except (TypeError, json.decoder.JSONDecodeError) as e:
         raise jsonschema.ValidationError("Could not parse json : {0}".format(str(e)))
@@ -101,16 +130,44 @@ async def parse_response(response, schema):
     :param dict schema: The expected response structure
     :return: the json data
     """
+    request = instrumentation.request_of(response) if instrumentation.enabled() else None
     try:
+        if request:
+            # the body is read first, so that the decoding is timed without the transfer
+            body = await response.read()
+        start = time.perf_counter()
         data = await response.json()
+        if request:
+            instrumentation.emit(instrumentation.DECODE, *request, status=response.status,
+                                 duration=time.perf_counter() - start, size=len(body))
         response.close()
         if schema is not None:
-            jsonschema.validate(data, schema)
+            start = time.perf_counter()
+            validator(schema).validate(data)
+            if request:
+                instrumentation.emit(instrumentation.VALIDATE, *request, status=response.status,
+                                     duration=time.perf_counter() - start)
         return data
     except (TypeError, json.decoder.JSONDecodeError) as e:
         raise jsonschema.ValidationError("Could not parse json : {0}".format(str(e)))
 
 
+async def check_status(response):
+    """
+    Raise the error of an answer whose status is not 200
+
+    :param aiohttp.ClientResponse response: Response of aiohttp request
+    :raises DuniterError: for the errors of the BMA format
+    :raises ValueError: for the other errors
+    """
+    if response.status != 200:
+        try:
+            error_data = parse_error(await response.text())
+            raise DuniterError(error_data)
+        except (TypeError, jsonschema.ValidationError):
+            raise ValueError('status code != 200 => %d (%s)' % (response.status, (await response.text())))
+
+
 class API(object):
     """APIRequest is a class used as an interface. The intermediate derivated classes are the modules and the leaf classes are the API requests."""
 
@@ -158,18 +215,58 @@ class API(object):
         :param str path: the request path
         :rtype: aiohttp.ClientResponse
         """
-        logging.debug("Request : {0}".format(self.reverse_url(self.connection_handler.http_scheme, path)))
+        return await self._read("GET", path, params=kwargs)
+
+    async def _read(self, method, path, **request):
+        """
+        Send an idempotent request, retried by the retry policy of the connection handler
+
+        :param str method: the http method
+        :param str path: the request path
+        :rtype: aiohttp.ClientResponse
+        """
         url = self.reverse_url(self.connection_handler.http_scheme, path)
-        response = await self.connection_handler.session.get(url, params=kwargs, headers=self.headers,
-                                                             proxy=self.connection_handler.proxy,
-                                                             timeout=15)
-        if response.status != 200:
+        logging.debug("Request : %s %s", method, url)
+        route = instrumentation.route(self.module, path)
+        policy = self.connection_handler.retry_policy
+        call_start = time.perf_counter()
+        attempt = 1
+        while True:
+            start = time.perf_counter()
+            error = None
             try:
-                error_data = parse_error(await response.text())
-                raise DuniterError(error_data)
-            except (TypeError, jsonschema.ValidationError):
-                raise ValueError('status code != 200 => %d (%s)' % (response.status, (await response.text())))
-
+                response = await self.connection_handler.session.request(
+                    method, url, headers=self.headers, proxy=self.connection_handler.proxy,
+                    timeout=policy.timeout(call_start, 15) if policy else 15, **request)
+            except Exception as e:
+                instrumentation.emit(instrumentation.REQUEST, method, route, url,
+                                     duration=time.perf_counter() - start, error=e)
+                delay = policy.next_delay(attempt, call_start, error=e) if policy else None
+                if delay is None:
+                    raise
+                error, response = e, None
+            else:
+                instrumentation.emit(instrumentation.REQUEST, method, route, url, status=response.status,
+                                     duration=time.perf_counter() - start, size=response.content_length)
+                if response.status == 200 or not policy:
+                    break
+                delay = policy.next_delay(attempt, call_start, status=response.status)
+                if delay is None:
+                    break
+            logging.debug("Retry %d of %s in %.3fs", attempt, url, delay)
+            instrumentation.emit(instrumentation.RETRY, method, route, url, duration=delay)
+            await asyncio.sleep(delay)
+            # the sleep ran past the deadline : the last failure is the answer
+            if policy.expired(call_start):
+                if error is not None:
+                    raise error
+                break
+            if response is not None:
+                response.release()
+            attempt += 1
+        if instrumentation.enabled():
+            instrumentation.tag(response, method, route, url)
+        await check_status(response)
         return response
 
     async def requests_post(self, path, **kwargs):
@@ -182,15 +279,40 @@ class API(object):
         if 'self_' in kwargs:
             kwargs['self'] = kwargs.pop('self_')
 
-        logging.debug("POST : {0}".format(kwargs))
-        with aiohttp.Timeout(15):
+        logging.debug("POST : %s", kwargs)
+        return await self._post(path, data=kwargs)
+
+    async def requests_post_json(self, path, data, **params):
+        """
+        POST a json body, as the search requests of the Cesium+ pods.
+        These requests being reads, they are retried by the retry policy as the GET requests.
+
+        :param str path: the request path
+        :param data: the json body
+        :param params: the query parameters
+        :rtype: aiohttp.ClientResponse
+        """
+        return await self._read("POST", path, json=data, params=params)
+
+    async def _post(self, path, **request):
+        url = self.reverse_url(self.connection_handler.http_scheme, path)
+        route = instrumentation.route(self.module, path)
+        start = time.perf_counter()
+        try:
             response = await self.connection_handler.session.post(
-                self.reverse_url(self.connection_handler.http_scheme, path),
-                data=kwargs,
+                url,
                 headers=self.headers,
-                proxy=self.connection_handler.proxy
+                proxy=self.connection_handler.proxy,
+                timeout=15,
+                **request
             )
-            return response
+        except Exception as e:
+            instrumentation.emit(instrumentation.REQUEST, "POST", route, url,
+                                 duration=time.perf_counter() - start, error=e)
+            raise
+        instrumentation.emit(instrumentation.REQUEST, "POST", route, url, status=response.status,
+                             duration=time.perf_counter() - start, size=response.content_length)
+        return response
 
     def connect_ws(self, path):
         """
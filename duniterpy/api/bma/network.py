@@ -124,7 +124,8 @@ async def peers(connection, leaves=False, leaf=""):
     client = API(connection, URL_PATH)
     # GET Peers
     if leaves:
-        r = await client.requests_get('/peering/peers', leaves=leaves)
+        # boolean values are not accepted as query parameters
+        r = await client.requests_get('/peering/peers', leaves="true")
     else:
         r = await client.requests_get('/peering/peers', leaf=leaf)
 
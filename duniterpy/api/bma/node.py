@@ -22,6 +22,29 @@ logger = logging.getLogger("duniter/node")
 
 URL_PATH = 'node'
 
+SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "duniter": {
+            "type": "object",
+            "properties": {
+                "software": {
+                    "type": "string"
+                },
+                "version": {
+                    "type": "string",
+                },
+                "forkWindowSize": {
+                    "type": "number"
+                }
+            },
+            "required": ["software", "version"]
+        },
+    },
+    "required": ["duniter"]
+}
+
+
 async def summary(connection):
     """
     GET Certification data over a member
@@ -29,28 +52,7 @@ async def summary(connection):
     :param duniterpy.api.bma.ConnectionHandler connection: Connection handler instance
     :rtype: dict
     """
-    schema = {
-        "type": "object",
-        "properties": {
-            "duniter": {
-                "type": "object",
-                "properties": {
-                    "software": {
-                    "type": "string"
-                    },
-                    "version": {
-                        "type": "string",
-                    },
-                    "forkWindowSize": {
-                        "type": "number"
-                    }
-                },
-                "required": ["software", "version"]
-            },
-        },
-        "required": ["duniter"]
-    }
     client = API(connection, URL_PATH)
 
     r = await client.requests_get('/summary')
-    return await parse_response(r, schema)
+    return await parse_response(r, SUMMARY_SCHEMA)
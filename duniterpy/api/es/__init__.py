@@ -0,0 +1,4 @@
+"""
+Cesium+ pods : the Elasticsearch API of the user profiles and of the subscriptions
+"""
+from . import api, user, subscription
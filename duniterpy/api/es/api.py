@@ -0,0 +1,248 @@
+"""
+Requests of the Elasticsearch indices of the Cesium+ pods, reached with the connection handlers
+of ESUserEndpoint and ESSubscribtionEndpoint.
+
+The documents of an index are fetched by ids in one _mget request, and the searches are paginated
+with a scroll context or with search_after, streamed by SearchIterator::
+
+    docs = await api.mget(connection, "user/profile", pubkeys, fields=["title"])
+    async for hit in api.SearchIterator(connection, "user/profile", {"match": {"title": "alice"}},
+                                        sort=[{"time": "desc"}, "_id"]):
+        ...
+"""
+import collections
+import logging
+
+from ..bma import API, parse_response
+from ..pool import NodePool
+
+logger = logging.getLogger("duniter/es")
+
+# the default keep alive of the scroll contexts
+SCROLL_KEEP_ALIVE = "1m"
+
+DOC_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "_index": {
+            "type": "string"
+        },
+        "_type": {
+            "type": "string"
+        },
+        "_id": {
+            "type": "string"
+        },
+        "found": {
+            "type": "boolean"
+        },
+        "_source": {
+            "type": "object"
+        }
+    },
+    "required": ["_id"]
+}
+
+MGET_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "docs": {
+            "type": "array",
+            "items": DOC_SCHEMA
+        }
+    },
+    "required": ["docs"]
+}
+
+SEARCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "_scroll_id": {
+            "type": "string"
+        },
+        "took": {
+            "type": "number"
+        },
+        "hits": {
+            "type": "object",
+            "properties": {
+                "total": {
+                    "type": ["number", "object"]
+                },
+                "hits": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "_id": {
+                                "type": "string"
+                            },
+                            "_source": {
+                                "type": "object"
+                            },
+                            "sort": {
+                                "type": "array"
+                            }
+                        },
+                        "required": ["_id"]
+                    }
+                }
+            },
+            "required": ["hits"]
+        }
+    },
+    "required": ["hits"]
+}
+
+
+def _source(fields):
+    """
+    The _source parameter of the requests : the fields of the documents returned
+    """
+    return {} if fields is None else {"_source": ",".join(fields)}
+
+
+async def mget(connection, index, ids, fields=None):
+    """
+    POST the documents of many ids in one request
+
+    :param duniterpy.api.bma.ConnectionHandler connection: Connection handler instance
+    :param str index: the index and type, as "user/profile"
+    :param list[str] ids: the ids of the documents
+    :param list[str] fields: the fields of the documents returned, all when None
+    :return: the documents, in the order of the ids, "found" being false for the unknown ids
+    :rtype: list[dict]
+    """
+    client = API(connection, index)
+
+    r = await client.requests_post_json('/_mget', {"ids": list(ids)}, **_source(fields))
+    return (await parse_response(r, MGET_SCHEMA))["docs"]
+
+
+async def search(connection, index, query=None, size=10, sort=None, search_after=None, fields=None, scroll=None):
+    """
+    POST a search
+
+    :param duniterpy.api.bma.ConnectionHandler connection: Connection handler instance
+    :param str index: the index and type, as "user/profile"
+    :param dict query: the Elasticsearch query, all the documents when None
+    :param int size: the number of hits of the page
+    :param list sort: the Elasticsearch sort
+    :param list search_after: the sort values of the last hit of the previous page
+    :param list[str] fields: the fields of the documents returned, all when None
+    :param str scroll: the keep alive of a scroll context opened for the next pages, as "1m"
+    :rtype: dict
+    """
+    client = API(connection, index)
+    body = {"query": query or {"match_all": {}}, "size": size}
+    if sort is not None:
+        body["sort"] = sort
+    if search_after is not None:
+        body["search_after"] = search_after
+    if fields is not None:
+        body["_source"] = fields
+    params = {"scroll": scroll} if scroll else {}
+
+    r = await client.requests_post_json('/_search', body, **params)
+    return await parse_response(r, SEARCH_SCHEMA)
+
+
+async def scroll(connection, scroll_id, keep_alive=SCROLL_KEEP_ALIVE):
+    """
+    POST the next page of a scroll context
+
+    :param duniterpy.api.bma.ConnectionHandler connection: Connection handler instance, the one of the search
+    :param str scroll_id: the _scroll_id of the previous page
+    :param str keep_alive: the keep alive of the scroll context
+    :rtype: dict
+    """
+    client = API(connection, "_search")
+
+    r = await client.requests_post_json('/scroll', {"scroll": keep_alive, "scroll_id": scroll_id})
+    return await parse_response(r, SEARCH_SCHEMA)
+
+
+class SearchIterator:
+    """
+    The hits of a search, fetched page by page while iterated.
+
+    With a sort, the pages are fetched with search_after, which keeps no context on the pod : each page
+    can be asked to any node of a NodePool. Without a sort, a scroll context is opened on the pod,
+    so the connection must be a single connection handler. The scroll context is not cleared
+    at the end, it expires after its keep alive.
+    """
+    def __init__(self, connection, index, query=None, sort=None, page_size=500, fields=None, limit=None,
+                 keep_alive=SCROLL_KEEP_ALIVE):
+        """
+        :param connection: a connection handler, or a NodePool when sorted
+        :param str index: the index and type, as "user/profile"
+        :param dict query: the Elasticsearch query, all the documents when None
+        :param list sort: the Elasticsearch sort, ending with a unique field to page with search_after,
+            None to page with a scroll context
+        :param int page_size: the number of hits of a request
+        :param list[str] fields: the fields of the documents returned, all when None
+        :param int limit: the maximum number of hits, all when None
+        :param str keep_alive: the keep alive of the scroll context
+        """
+        if sort is None and isinstance(connection, NodePool):
+            raise ValueError("A scroll context is kept by one node : a sort is needed to search a NodePool")
+        self.connection = connection
+        self.index = index
+        self.query = query
+        self.sort = sort
+        self.page_size = page_size
+        self.fields = fields
+        self.limit = limit
+        self.keep_alive = keep_alive
+        self.total = None
+        self.count = 0
+        self._page = collections.deque()
+        self._scroll_id = None
+        self._search_after = None
+        self._done = False
+
+    async def _request(self, func, *args, **kwargs):
+        if isinstance(self.connection, NodePool):
+            return await self.connection.request(func, *args, **kwargs)
+        return await func(self.connection, *args, **kwargs)
+
+    async def _next_page(self):
+        size = self.page_size if self.limit is None else min(self.page_size, self.limit - self.count)
+        if self._scroll_id is not None:
+            data = await self._request(scroll, self._scroll_id, self.keep_alive)
+        else:
+            data = await self._request(search, self.index, self.query, size=size, sort=self.sort,
+                                       search_after=self._search_after, fields=self.fields,
+                                       scroll=None if self.sort is not None else self.keep_alive)
+        total = data["hits"].get("total")
+        # the newer pods answer {"value": n, "relation": "eq"}
+        self.total = total.get("value") if isinstance(total, dict) else total
+        hits = data["hits"]["hits"]
+        if self.sort is None:
+            self._scroll_id = data.get("_scroll_id")
+            if self._scroll_id is None:
+                self._done = True
+        elif hits:
+            if "sort" not in hits[-1]:
+                raise ValueError("The hits of a sorted search have no sort values")
+            self._search_after = hits[-1]["sort"]
+        if len(hits) < size:
+            self._done = True
+        return hits
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.limit is not None and self.count >= self.limit:
+            raise StopAsyncIteration
+        if not self._page:
+            if self._done:
+                raise StopAsyncIteration
+            hits = await self._next_page()
+            self._page.extend(hits[:None if self.limit is None else self.limit - self.count])
+            if not self._page:
+                self._done = True
+                raise StopAsyncIteration
+        self.count += 1
+        return self._page.popleft()
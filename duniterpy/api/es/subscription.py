@@ -0,0 +1,37 @@
+"""
+The subscription records of the Cesium+ pods, the ESSubscribtionEndpoint API
+"""
+from . import api
+
+RECORD = "subscription/record"
+
+
+async def search(connection, query=None, size=10, sort=None, search_after=None, fields=None):
+    """
+    Search the subscription records
+
+    :param duniterpy.api.bma.ConnectionHandler connection: Connection handler instance
+    :param dict query: the Elasticsearch query, as {"term": {"issuer": pubkey}}
+    :param int size: the number of hits of the page
+    :param list sort: the Elasticsearch sort
+    :param list search_after: the sort values of the last hit of the previous page
+    :param list[str] fields: the fields of the records returned, all when None
+    :rtype: dict
+    """
+    return await api.search(connection, RECORD, query, size, sort, search_after, fields)
+
+
+def iter_records(connection, query=None, sort=None, page_size=500, fields=None, limit=None):
+    """
+    The hits of a search of the subscription records, fetched page by page while iterated.
+    See duniterpy.api.es.api.SearchIterator.
+
+    :param connection: a connection handler, or a NodePool when sorted
+    :param dict query: the Elasticsearch query, all the records when None
+    :param list sort: the Elasticsearch sort, None to page with a scroll context
+    :param int page_size: the number of hits of a request
+    :param list[str] fields: the fields of the records returned, all when None
+    :param int limit: the maximum number of hits, all when None
+    :rtype: duniterpy.api.es.api.SearchIterator
+    """
+    return api.SearchIterator(connection, RECORD, query, sort, page_size, fields, limit)
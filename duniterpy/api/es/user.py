@@ -0,0 +1,118 @@
+"""
+The user profiles of the Cesium+ pods, the ESUserEndpoint API.
+
+The profiles of many pubkeys are fetched by chunks of _mget requests running at the same time,
+to resolve the display names of a page of pubkeys::
+
+    names = {pubkey: data["title"]
+             for pubkey, data in (await user.profiles(pool, pubkeys, fields=["title"])).items()}
+"""
+import asyncio
+import itertools
+import logging
+
+from ..pool import NodePool
+from . import api
+
+logger = logging.getLogger("duniter/es/user")
+
+PROFILE = "user/profile"
+
+
+async def profile(connection, pubkey, fields=None):
+    """
+    The profile of a pubkey
+
+    :param duniterpy.api.bma.ConnectionHandler connection: Connection handler instance
+    :param str pubkey: the pubkey
+    :param list[str] fields: the fields of the profile returned, as ["title", "city"], all when None
+    :return: the profile, None when the pubkey has no profile
+    :rtype: dict
+    """
+    doc = (await api.mget(connection, PROFILE, [pubkey], fields))[0]
+    return doc.get("_source", {}) if doc.get("found") else None
+
+
+async def search(connection, query=None, size=10, sort=None, search_after=None, fields=None):
+    """
+    Search the profiles
+
+    :param duniterpy.api.bma.ConnectionHandler connection: Connection handler instance
+    :param dict query: the Elasticsearch query, as {"match": {"title": "alice"}}
+    :param int size: the number of hits of the page
+    :param list sort: the Elasticsearch sort
+    :param list search_after: the sort values of the last hit of the previous page
+    :param list[str] fields: the fields of the profiles returned, all when None
+    :rtype: dict
+    """
+    return await api.search(connection, PROFILE, query, size, sort, search_after, fields)
+
+
+def iter_profiles(connection, query=None, sort=None, page_size=500, fields=None, limit=None):
+    """
+    The hits of a search of the profiles, fetched page by page while iterated.
+    See duniterpy.api.es.api.SearchIterator.
+
+    :param connection: a connection handler, or a NodePool when sorted
+    :param dict query: the Elasticsearch query, all the profiles when None
+    :param list sort: the Elasticsearch sort, None to page with a scroll context
+    :param int page_size: the number of hits of a request
+    :param list[str] fields: the fields of the profiles returned, all when None
+    :param int limit: the maximum number of hits, all when None
+    :rtype: duniterpy.api.es.api.SearchIterator
+    """
+    return api.SearchIterator(connection, PROFILE, query, sort, page_size, fields, limit)
+
+
+async def profiles(connections, pubkeys, fields=None, chunk_size=500, concurrency=4, cache=None):
+    """
+    The profiles of many pubkeys, fetched by chunks of _mget requests running at the same time.
+    The chunks are spread over the connections in turn. With a NodePool, the pool chooses the node of each chunk.
+
+    :param connections: a connection handler, a list of connection handlers or a NodePool
+    :param pubkeys: the pubkeys
+    :param list[str] fields: the fields of the profiles returned, all when None
+    :param int chunk_size: the number of pubkeys of a request
+    :param int concurrency: maximum number of requests sent at the same time
+    :param cache: a dict-like cache of the profiles by pubkey, read before the requests and filled with
+        their answers. The pubkeys without profile are stored as None.
+    :return: the profiles, by pubkey, of the pubkeys having a profile
+    :rtype: dict
+    """
+    if isinstance(connections, NodePool):
+        pool = connections
+        request, connections = lambda _, *args: pool.request(api.mget, *args), [pool]
+    else:
+        request = api.mget
+        if not isinstance(connections, (list, tuple)):
+            connections = [connections]
+        if not connections:
+            raise ValueError("At least one connection is needed")
+
+    found = {}
+    missing = []
+    for pubkey in dict.fromkeys(pubkeys):
+        if cache is not None and pubkey in cache:
+            if cache[pubkey] is not None:
+                found[pubkey] = cache[pubkey]
+        else:
+            missing.append(pubkey)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(connection, chunk):
+        async with semaphore:
+            return await request(connection, PROFILE, chunk, fields)
+
+    chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+    logger.debug("Profiles of {0} pubkeys, {1} cached, in {2} requests"
+                 .format(len(found) + len(missing), len(found), len(chunks)))
+    answers = await asyncio.gather(*[fetch(connection, chunk)
+                                     for connection, chunk in zip(itertools.cycle(connections), chunks)])
+    for doc in itertools.chain.from_iterable(answers):
+        data = doc.get("_source", {}) if doc.get("found") else None
+        if cache is not None:
+            cache[doc["_id"]] = data
+        if data is not None:
+            found[doc["_id"]] = data
+    return found
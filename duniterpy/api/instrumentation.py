@@ -0,0 +1,280 @@
+"""
+Instrumentation of the requests to the nodes : latency, payload sizes, json decoding and schema validation.
+
+The requests emit events to the hooks registered with add_hook.
+MetricsRegistry is a hook aggregating the events by route, for monitoring::
+
+    registry = MetricsRegistry()
+    add_hook(registry.record)
+    ...
+    print(registry.snapshot())
+"""
+import bisect
+import collections
+import logging
+import weakref
+
+# kinds of events
+REQUEST = "request"
+RETRY = "retry"
+DECODE = "decode"
+VALIDATE = "validate"
+
+Event = collections.namedtuple("Event", "kind method route url status duration size error")
+Event.__doc__ = """
+An instrumentation event
+
+:param str kind: REQUEST when a node answered or failed, RETRY before a new attempt,
+    DECODE after the json decoding of an answer, VALIDATE after its schema validation
+:param str method: the http method
+:param str route: the api module and the first segment of the path, as "blockchain/block"
+:param str url: the url of the request
+:param int status: the http status of the answer, None if the request failed
+:param float duration: the duration in seconds
+:param int size: the size of the answer in bytes, None if not known
+:param Exception error: the error of a failed request
+"""
+
+# latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_hooks = []
+# route of the responses, for the events of parse_response
+_routes = weakref.WeakKeyDictionary()
+
+
+def add_hook(hook):
+    """
+    Register a hook called with every event
+
+    :param hook: a callable taking an Event
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    """
+    Unregister a hook
+
+    :param hook: a registered callable
+    """
+    _hooks.remove(hook)
+
+
+def enabled():
+    """
+    True if hooks are registered
+
+    :rtype: bool
+    """
+    return bool(_hooks)
+
+
+def emit(kind, method, route, url, status=None, duration=0., size=None, error=None):
+    """
+    Send an event to the hooks. A failing hook is logged and does not fail the request.
+    """
+    if not _hooks:
+        return
+    event = Event(kind, method, route, url, status, duration, size, error)
+    for hook in list(_hooks):
+        try:
+            hook(event)
+        except Exception:
+            logging.exception("Instrumentation hook %r failed", hook)
+
+
+def route(module, path):
+    """
+    The route of a request : its api module and the first segment of its path,
+    so that "/block/12" and "/block/13" of blockchain are both "blockchain/block"
+
+    :param str module: the api module
+    :param str path: the request path
+    :rtype: str
+    """
+    segment = path.lstrip("/").split("/", 1)[0]
+    return "{0}/{1}".format(module, segment) if segment else module
+
+
+def tag(response, method, route_name, url):
+    """
+    Remember the request of a response, for the events sent when parsing it
+    """
+    _routes[response] = (method, route_name, url)
+
+
+def request_of(response):
+    """
+    The method, route and url of a tagged response, None if it is not tagged
+
+    :rtype: tuple|None
+    """
+    try:
+        return _routes.get(response)
+    except TypeError:
+        # not weak referenceable, so never tagged
+        return None
+
+
+class Histogram:
+    """
+    Counts of values in fixed buckets, with their sum, min and max
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        :param tuple[float] buckets: the upper bounds of the buckets, sorted
+        """
+        self.buckets = tuple(buckets)
+        # the last count is for the values above the last bound
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        """
+        Add a value
+
+        :param float value: the value
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """
+        Estimate a quantile, by linear interpolation in its bucket
+
+        :param float q: the quantile, between 0 and 1
+        :rtype: float|None
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                low = self.buckets[index - 1] if index > 0 else 0.
+                high = self.buckets[index] if index < len(self.buckets) else self.max
+                low = max(low, self.min)
+                high = min(high, self.max)
+                return low + (high - low) * (rank - seen) / count
+            seen += count
+        return self.max
+
+    def snapshot(self):
+        """
+        The state of the histogram as plain values
+
+        :rtype: dict
+        """
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "buckets": list(zip(self.buckets + (float("inf"),), self.counts)),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99)
+        }
+
+
+class RouteMetrics:
+    """
+    Metrics of the requests of a route
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.requests = 0
+        self.errors = 0
+        self.statuses = collections.Counter()
+        self.retries = 0
+        self.bytes = 0
+        self.latency = Histogram(buckets)
+        self.decode = Histogram(buckets)
+        self.validate = Histogram(buckets)
+
+    def snapshot(self):
+        """
+        The metrics as plain values
+
+        :rtype: dict
+        """
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "statuses": dict(self.statuses),
+            "retries": self.retries,
+            "bytes": self.bytes,
+            "latency": self.latency.snapshot(),
+            "decode": self.decode.snapshot(),
+            "validate": self.validate.snapshot()
+        }
+
+
+class MetricsRegistry:
+    """
+    In-process aggregation of the instrumentation events, by route
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        :param tuple[float] buckets: the upper bounds of the histograms buckets, in seconds
+        """
+        self.buckets = buckets
+        self.routes = {}
+
+    def metrics(self, route_name):
+        """
+        The metrics of a route, created on first use
+
+        :param str route_name: the route
+        :rtype: RouteMetrics
+        """
+        try:
+            return self.routes[route_name]
+        except KeyError:
+            metrics = self.routes[route_name] = RouteMetrics(self.buckets)
+            return metrics
+
+    def record(self, event):
+        """
+        Aggregate an event. This is the hook to register with add_hook.
+
+        :param Event event: the event
+        """
+        metrics = self.metrics(event.route)
+        if event.kind == REQUEST:
+            metrics.requests += 1
+            metrics.latency.observe(event.duration)
+            if event.status is not None:
+                metrics.statuses[event.status] += 1
+            if event.error is not None or event.status != 200:
+                metrics.errors += 1
+        elif event.kind == RETRY:
+            metrics.retries += 1
+        elif event.kind == DECODE:
+            metrics.decode.observe(event.duration)
+            if event.size is not None:
+                metrics.bytes += event.size
+        elif event.kind == VALIDATE:
+            metrics.validate.observe(event.duration)
+
+    def snapshot(self):
+        """
+        The metrics of all the routes as plain values, to export them to any monitoring system
+
+        :rtype: dict
+        """
+        return {route_name: metrics.snapshot() for route_name, metrics in self.routes.items()}
+
+    def reset(self):
+        """
+        Forget all the metrics
+        """
+        self.routes.clear()
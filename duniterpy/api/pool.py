@@ -0,0 +1,134 @@
+"""
+Pool of nodes serving the same reads, with hedged requests against slow nodes.
+"""
+import asyncio
+import collections
+import time
+
+import jsonschema
+
+from .instrumentation import Histogram
+from .retry import RETRY_ERRORS
+
+# failures of a node which another node may not have
+FAILOVER_ERRORS = RETRY_ERRORS + (ValueError, jsonschema.ValidationError)
+
+
+class NodePool:
+    """
+    Send idempotent reads to a pool of nodes.
+
+    The requests are spread over the nodes in turn, the nodes which failed last being tried last.
+    A request not answered within the p95 latency of its kind is sent again to another node (a hedged request),
+    and the first answer wins. A request failing on a node is sent to another one.
+
+    Only use the pool for reads : a request may run on several nodes.
+    """
+    def __init__(self, handlers, hedge=True, quantile=0.95, default_delay=1., min_delay=0.01, min_samples=20,
+                 max_attempts=2, errors=FAILOVER_ERRORS):
+        """
+        :param list[duniterpy.api.bma.ConnectionHandler] handlers: the connection handlers of the nodes
+        :param bool hedge: send slow requests to another node
+        :param float quantile: the quantile of the latencies after which a request is hedged
+        :param float default_delay: the hedge delay in seconds while too few latencies are known
+        :param float min_delay: the minimum hedge delay in seconds
+        :param int min_samples: the number of latencies needed to use their quantile
+        :param int max_attempts: the maximum number of nodes sent the same request
+        :param tuple[type] errors: the exceptions after which another node is tried
+        """
+        if not handlers:
+            raise ValueError("A pool needs at least one node")
+        self.handlers = list(handlers)
+        self.hedge = hedge
+        self.quantile = quantile
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.max_attempts = max_attempts
+        self.errors = tuple(errors)
+        # latencies of the successful requests, by kind of request
+        self.latencies = collections.defaultdict(Histogram)
+        # consecutive failures, by node index
+        self.failures = collections.Counter()
+        self.hedged = 0
+        self.failovers = 0
+        self._turn = 0
+
+    def hedge_delay(self, key):
+        """
+        The time to wait for an answer before hedging a request
+
+        :param str key: the kind of request
+        :rtype: float
+        """
+        latencies = self.latencies.get(key)
+        if latencies is None or latencies.count < self.min_samples:
+            return self.default_delay
+        return max(latencies.quantile(self.quantile), self.min_delay)
+
+    def order(self):
+        """
+        The indexes of the nodes in the order to try them for the next request
+
+        :rtype: list[int]
+        """
+        count = len(self.handlers)
+        turn = self._turn
+        self._turn = (turn + 1) % count
+        return sorted(range(count), key=lambda index: (self.failures[index], (index - turn) % count))
+
+    async def request(self, func, *args, **kwargs):
+        """
+        Run a request on the nodes of the pool
+
+        :param func: the coroutine function of the request, taking a connection handler as first argument,
+            as duniterpy.api.bma.blockchain.current
+        :return: the result of the first node answering
+        """
+        key = getattr(func, "__qualname__", None) or repr(func)
+        order = self.order()
+        attempts = min(self.max_attempts, len(order))
+        delay = self.hedge_delay(key) if self.hedge else None
+        # running requests, with their node index and start time
+        tasks = {}
+        launched = []
+        last_error = None
+
+        def launch():
+            index = order[len(launched)]
+            launched.append(index)
+            task = asyncio.ensure_future(func(self.handlers[index], *args, **kwargs))
+            tasks[task] = (index, time.perf_counter())
+
+        try:
+            launch()
+            while tasks:
+                can_launch = len(launched) < attempts
+                done, _ = await asyncio.wait(list(tasks), timeout=delay if can_launch else None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.hedged += 1
+                    launch()
+                    continue
+                for task in done:
+                    index, start = tasks.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        self.failures[index] = 0
+                        self.latencies[key].observe(time.perf_counter() - start)
+                        return task.result()
+                    if not isinstance(error, self.errors):
+                        raise error
+                    self.failures[index] += 1
+                    last_error = error
+                if not tasks and len(launched) < attempts:
+                    self.failovers += 1
+                    launch()
+            raise last_error
+        finally:
+            for task in tasks:
+                if task.done():
+                    # retrieve the exception of a losing node, so that it is not reported as lost
+                    task.cancelled() or task.exception()
+                else:
+                    task.cancel()
@@ -0,0 +1,118 @@
+"""
+Retry policy of the idempotent requests : exponential backoff with jitter, bounded by a deadline.
+"""
+import asyncio
+import random
+import time
+
+import aiohttp
+
+# answers of an overloaded or failing node, worth another attempt
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# failures of the transport, worth another attempt
+RETRY_ERRORS = (asyncio.TimeoutError, aiohttp.ClientError, OSError)
+
+# the smallest timeout of an attempt, in seconds : aiohttp reads a timeout of 0 as no timeout
+MIN_TIMEOUT = 0.001
+
+
+class RetryPolicy:
+    """
+    How many times and how long to retry an idempotent request : the GET requests, and the POST reads
+    of the Cesium+ pods.
+
+    The delay before attempt n+1 is ``backoff * multiplier ** (n - 1)``, capped to max_backoff,
+    minus a random part of it (jitter), so that clients failing together do not retry together.
+    No attempt starts after the deadline, and the timeout of an attempt is cut to the time left.
+    """
+    def __init__(self, attempts=3, backoff=0.2, multiplier=2., max_backoff=5., jitter=0.5, deadline=None,
+                 statuses=RETRY_STATUSES, errors=RETRY_ERRORS):
+        """
+        :param int attempts: maximum number of attempts, including the first one
+        :param float backoff: delay before the second attempt, in seconds
+        :param float multiplier: growth of the delay after each attempt
+        :param float max_backoff: maximum delay between two attempts, in seconds
+        :param float jitter: part of the delay drawn at random, between 0 and 1
+        :param float deadline: budget of the whole call in seconds, None for no budget
+        :param tuple[int] statuses: the http statuses to retry
+        :param tuple[type] errors: the exceptions to retry
+        """
+        if attempts < 1:
+            raise ValueError("At least one attempt is needed")
+        if not 0 <= jitter <= 1:
+            raise ValueError("The jitter is a part of the delay, between 0 and 1")
+        self.attempts = attempts
+        self.backoff = backoff
+        self.multiplier = multiplier
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.deadline = deadline
+        self.statuses = frozenset(statuses)
+        self.errors = tuple(errors)
+        self.random = random.Random()
+
+    def delay(self, attempt):
+        """
+        The delay to wait after a failed attempt
+
+        :param int attempt: the number of the failed attempt, from 1
+        :rtype: float
+        """
+        delay = min(self.backoff * self.multiplier ** (attempt - 1), self.max_backoff)
+        return delay - delay * self.jitter * self.random.random()
+
+    def remaining(self, start):
+        """
+        The time left of the deadline budget of a call
+
+        :param float start: the time.perf_counter() at the start of the call
+        :rtype: float|None
+        """
+        if self.deadline is None:
+            return None
+        return self.deadline - (time.perf_counter() - start)
+
+    def expired(self, start):
+        """
+        True if the deadline budget of a call is used up
+
+        :param float start: the time.perf_counter() at the start of the call
+        :rtype: bool
+        """
+        remaining = self.remaining(start)
+        return remaining is not None and remaining <= 0
+
+    def timeout(self, start, timeout):
+        """
+        The timeout of an attempt, cut to the time left, and never below MIN_TIMEOUT
+
+        :param float start: the time.perf_counter() at the start of the call
+        :param float timeout: the timeout of a request
+        :rtype: float
+        """
+        remaining = self.remaining(start)
+        return timeout if remaining is None else max(min(timeout, remaining), MIN_TIMEOUT)
+
+    def next_delay(self, attempt, start, status=None, error=None):
+        """
+        The delay before retrying a failed attempt, None if it must not be retried
+
+        :param int attempt: the number of the failed attempt, from 1
+        :param float start: the time.perf_counter() at the start of the call
+        :param int status: the http status of the answer
+        :param Exception error: the exception of the attempt
+        :rtype: float|None
+        """
+        if attempt >= self.attempts:
+            return None
+        if error is not None:
+            if not isinstance(error, self.errors):
+                return None
+        elif status not in self.statuses:
+            return None
+        delay = self.delay(attempt)
+        remaining = self.remaining(start)
+        if remaining is not None and delay >= remaining:
+            return None
+        return delay
@@ -0,0 +1,6 @@
+"""
+WS2P v1 : the websocket protocol between the nodes, with authenticated connections, multiplexed requests
+and pushed documents
+"""
+from . import auth
+from .client import WS2PConnection, WS2PError, parse_document
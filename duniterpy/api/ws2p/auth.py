@@ -0,0 +1,105 @@
+"""
+Authentication of the WS2P v1 connections.
+
+Each side sends a CONNECT message with a random challenge, acknowledges the challenge of the other side with ACK,
+and answers the ACK of its own challenge with OK. The messages are signed over
+"WS2P:<TYPE>:<currency>:<pubkey of the signer>:<challenge>".
+"""
+import base64
+import binascii
+import os
+
+import libnacl
+
+from ...key.base58 import Base58Encoder
+
+CONNECT = "CONNECT"
+ACK = "ACK"
+OK = "OK"
+
+
+def new_challenge():
+    """
+    A random challenge of 64 hexadecimal characters
+
+    :rtype: str
+    """
+    return binascii.hexlify(os.urandom(32)).decode("ascii")
+
+
+def signed_part(kind, currency, pubkey, challenge):
+    """
+    The string signed by an authentication message
+
+    :param str kind: CONNECT, ACK or OK
+    :param str currency: the currency of the nodes
+    :param str pubkey: the pubkey of the signer
+    :param str challenge: the challenge, the one of the CONNECT message for ACK and OK
+    :rtype: str
+    """
+    return "WS2P:{0}:{1}:{2}:{3}".format(kind, currency, pubkey, challenge)
+
+
+def sign(key, kind, currency, challenge):
+    """
+    The signature of an authentication message
+
+    :param duniterpy.key.SigningKey key: the key of the signer
+    :param str kind: CONNECT, ACK or OK
+    :param str currency: the currency of the nodes
+    :param str challenge: the challenge
+    :rtype: str
+    """
+    signed = signed_part(kind, currency, key.pubkey, challenge).encode("ascii")
+    return base64.b64encode(key.signature(signed)).decode("ascii")
+
+
+def verify(kind, currency, pubkey, challenge, signature):
+    """
+    True if the signature of an authentication message is valid
+
+    :param str kind: CONNECT, ACK or OK
+    :param str currency: the currency of the nodes
+    :param str pubkey: the pubkey of the signer
+    :param str challenge: the challenge
+    :param str signature: the base64 signature
+    :rtype: bool
+    """
+    try:
+        libnacl.crypto_sign_verify_detached(base64.b64decode(signature),
+                                            signed_part(kind, currency, pubkey, challenge).encode("ascii"),
+                                            Base58Encoder.decode(pubkey))
+        return True
+    except (ValueError, TypeError, binascii.Error):
+        return False
+
+
+def connect_message(key, currency, challenge):
+    """
+    :param duniterpy.key.SigningKey key: the key of the node
+    :param str currency: the currency of the nodes
+    :param str challenge: the challenge of the node
+    :rtype: dict
+    """
+    return {"auth": CONNECT, "pub": key.pubkey, "challenge": challenge,
+            "sig": sign(key, CONNECT, currency, challenge)}
+
+
+def ack_message(key, currency, remote_challenge):
+    """
+    :param duniterpy.key.SigningKey key: the key of the node
+    :param str currency: the currency of the nodes
+    :param str remote_challenge: the challenge of the CONNECT message of the other node
+    :rtype: dict
+    """
+    return {"auth": ACK, "pub": key.pubkey, "sig": sign(key, ACK, currency, remote_challenge)}
+
+
+def ok_message(key, currency, challenge):
+    """
+    :param duniterpy.key.SigningKey key: the key of the node
+    :param str currency: the currency of the nodes
+    :param str challenge: the challenge of the node
+    :rtype: dict
+    """
+    return {"auth": OK, "sig": sign(key, OK, currency, challenge)}
@@ -0,0 +1,362 @@
+"""
+WS2P v1 client : one authenticated websocket to a node, multiplexing requests and receiving the documents
+pushed by the node::
+
+    async with WS2PConnection(connection_handler, signing_key, "g1") as ws2p:
+        current = await ws2p.current()
+        blocks = await ws2p.blocks_range(current.number - 1000, current.number)
+        async for name, document in ws2p:
+            ...
+
+The requests carry a reqId, answered by a message with the same resId, so many requests run at the same time
+over the socket. The pushed documents are parsed into document objects.
+"""
+import asyncio
+import binascii
+import json
+import logging
+import os
+
+import aiohttp
+
+from ...documents import Block, BlockUID, Certification, Identity, Membership, Peer, Transaction
+from . import auth
+
+logger = logging.getLogger("duniter/ws2p")
+
+# requests
+CURRENT = "CURRENT"
+BLOCK_BY_NUMBER = "BLOCK_BY_NUMBER"
+BLOCKS_CHUNK = "BLOCKS_CHUNK"
+KNOWN_PEERS = "KNOWN_PEERS"
+WOT_REQUIREMENTS_OF_PENDING = "WOT_REQUIREMENTS_OF_PENDING"
+
+# pushed documents
+BLOCK = "BLOCK"
+IDENTITY = "IDENTITY"
+CERTIFICATION = "CERTIFICATION"
+MEMBERSHIP = "MEMBERSHIP"
+TRANSACTION = "TRANSACTION"
+PEER = "PEER"
+HEAD = "HEAD"
+
+# the field of the body holding the pushed document
+PUSH_FIELDS = {
+    BLOCK: "block",
+    IDENTITY: "identity",
+    CERTIFICATION: "certification",
+    MEMBERSHIP: "membership",
+    TRANSACTION: "transaction",
+    PEER: "peer",
+    HEAD: "heads",
+}
+
+
+class WS2PError(Exception):
+    """
+    A failed authentication, or an error answered to a request
+    """
+
+
+def _field(data, *names):
+    """
+    The first field of a json document found among names, the nodes using several names for some fields
+    """
+    for name in names:
+        if name in data:
+            return data[name]
+    raise KeyError(names[0])
+
+
+def parse_document(name, currency, data):
+    """
+    The document object of a pushed document
+
+    :param str name: the kind of push, BLOCK, IDENTITY, CERTIFICATION, MEMBERSHIP, TRANSACTION, PEER or HEAD
+    :param str currency: the currency of the nodes
+    :param dict data: the json document
+    :return: a Block, Identity, Certification, Membership, Transaction or Peer, the json data of the heads
+    """
+    if name == BLOCK:
+        return Block.from_bma_json(data)
+    if name == TRANSACTION:
+        return Transaction.from_bma_history(data.get("currency", currency), data)
+    if name == PEER:
+        return Peer.from_bma(data)
+    version = data.get("version", 10)
+    currency = data.get("currency", currency)
+    if name == IDENTITY:
+        return Identity(version, currency, _field(data, "pubkey", "issuer"), data["uid"],
+                        BlockUID.from_str(_field(data, "buid", "blockstamp")), _field(data, "sig", "signature"))
+    if name == CERTIFICATION:
+        return Certification(version, currency, _field(data, "from", "issuer", "pubkey"),
+                             _field(data, "to", "idty_issuer", "target"),
+                             BlockUID.from_str(_field(data, "buid", "blockstamp")), _field(data, "sig", "signature"))
+    if name == MEMBERSHIP:
+        return Membership(version, currency, data["issuer"], BlockUID.from_str(_field(data, "block", "blockstamp")),
+                          _field(data, "membership", "type"), _field(data, "userid", "uid"),
+                          BlockUID.from_str(_field(data, "certts", "identity_ts")),
+                          _field(data, "signature", "sig"))
+    return data
+
+
+class WS2PConnection:
+    """
+    An authenticated WS2P connection to a node
+    """
+    def __init__(self, connection_handler, key, currency, remote_pubkey=None, timeout=15., max_pushes=1000):
+        """
+        :param duniterpy.api.bma.ConnectionHandler connection_handler: the connection handler of the node,
+            as given by WS2PEndpoint.conn_handler
+        :param duniterpy.key.SigningKey key: the key authenticating this side of the connection
+        :param str currency: the currency of the nodes
+        :param str remote_pubkey: the pubkey expected from the node, None to accept any node
+        :param float timeout: the timeout of the authentication and of the requests, in seconds
+        :param int max_pushes: the number of pushed documents kept until received, the oldest are dropped beyond
+        """
+        self.connection_handler = connection_handler
+        self.key = key
+        self.currency = currency
+        self.remote_pubkey = remote_pubkey
+        self.timeout = timeout
+        self.max_pushes = max_pushes
+        self.dropped_pushes = 0
+        self.challenge = None
+        self._remote_challenge = None
+        self._ws = None
+        self._reader = None
+        self._pushes = None
+        self._acked = None
+        self._accepted = None
+        # futures of the requests waiting for their answer, by reqId
+        self._pending = {}
+        self._closed = False
+
+    @property
+    def url(self):
+        handler = self.connection_handler
+        url = "{0}://{1}:{2}".format(handler.ws_scheme, handler.server, handler.port)
+        return url + "/" + handler.path.lstrip("/") if handler.path else url
+
+    async def connect(self):
+        """
+        Open the websocket and authenticate both sides
+
+        :raises WS2PError: when the node is not authenticated or does not authenticate this side
+        """
+        loop = asyncio.get_event_loop()
+        self._pushes = asyncio.Queue()
+        self._acked = loop.create_future()
+        self._accepted = loop.create_future()
+        self.challenge = auth.new_challenge()
+        self._ws = await self.connection_handler.session.ws_connect(self.url, proxy=self.connection_handler.proxy)
+        self._reader = asyncio.ensure_future(self._read())
+        try:
+            await self._send(auth.connect_message(self.key, self.currency, self.challenge))
+            await asyncio.wait_for(asyncio.gather(self._acked, self._accepted), self.timeout)
+        except BaseException:
+            await self.close()
+            raise
+        logger.debug("WS2P connection to {0} authenticated ({1})".format(self.url, self.remote_pubkey))
+
+    async def close(self):
+        """
+        Close the websocket. The requests waiting for an answer fail with ConnectionError.
+        """
+        self._closed = True
+        if self._reader is not None:
+            self._reader.cancel()
+        if self._ws is not None:
+            await self._ws.close()
+        self._fail(ConnectionError("WS2P connection closed"))
+        # the error of an authentication step nobody waits for any more
+        for future in (self._acked, self._accepted):
+            if future is not None and not future.cancelled():
+                future.exception()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _send(self, message):
+        await self._ws.send_str(json.dumps(message))
+
+    def _fail(self, error):
+        for future in (self._acked, self._accepted):
+            if future is not None and not future.done():
+                future.set_exception(error)
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        if self._pushes is not None:
+            self._pushes.put_nowait(None)
+
+    async def _read(self):
+        try:
+            async for message in self._ws:
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                try:
+                    data = json.loads(message.data)
+                except ValueError:
+                    logger.debug("WS2P : invalid message from {0}".format(self.url))
+                    continue
+                if "auth" in data:
+                    await self._authenticate(data)
+                elif "resId" in data:
+                    self._answer(data)
+                elif "reqId" in data:
+                    # this side does not serve requests
+                    await self._send({"resId": data["reqId"], "err": "Not served by this client"})
+                elif "body" in data:
+                    self._push(data["body"])
+        except WS2PError as e:
+            # the socket is closed by connect or close
+            logger.debug("WS2P connection to {0} refused : {1}".format(self.url, e))
+            self._fail(e)
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._fail(e)
+            return
+        self._fail(ConnectionError("WS2P connection closed by the node"))
+
+    async def _authenticate(self, data):
+        kind = data["auth"]
+        if kind == auth.CONNECT:
+            pubkey = data.get("pub")
+            if self.remote_pubkey is not None and pubkey != self.remote_pubkey:
+                raise WS2PError("Expected the node {0}, connected to {1}".format(self.remote_pubkey, pubkey))
+            if not auth.verify(kind, self.currency, pubkey, data.get("challenge"), data.get("sig")):
+                raise WS2PError("Invalid CONNECT signature")
+            self.remote_pubkey = pubkey
+            self._remote_challenge = data["challenge"]
+            await self._send(auth.ack_message(self.key, self.currency, self._remote_challenge))
+        elif kind == auth.ACK:
+            if self.remote_pubkey is None or data.get("pub") != self.remote_pubkey \
+                    or not auth.verify(kind, self.currency, self.remote_pubkey, self.challenge, data.get("sig")):
+                raise WS2PError("Invalid ACK")
+            await self._send(auth.ok_message(self.key, self.currency, self.challenge))
+            if not self._acked.done():
+                self._acked.set_result(True)
+        elif kind == auth.OK:
+            if self._remote_challenge is None or not auth.verify(kind, self.currency, self.remote_pubkey,
+                                                                 self._remote_challenge, data.get("sig")):
+                raise WS2PError("Invalid OK")
+            if not self._accepted.done():
+                self._accepted.set_result(True)
+
+    def _answer(self, data):
+        future = self._pending.get(data["resId"])
+        if future is None or future.done():
+            return
+        if "err" in data:
+            future.set_exception(WS2PError(data["err"]))
+        else:
+            future.set_result(data.get("body"))
+
+    def _push(self, body):
+        name = body.get("name")
+        field = PUSH_FIELDS.get(name)
+        if field is None or field not in body:
+            logger.debug("WS2P : unknown push {0}".format(name))
+            return
+        try:
+            document = parse_document(name, self.currency, body[field])
+        except Exception as e:
+            logger.debug("WS2P : invalid {0} pushed : {1}".format(name, e))
+            return
+        if self._pushes.qsize() >= self.max_pushes:
+            self._pushes.get_nowait()
+            self.dropped_pushes += 1
+        self._pushes.put_nowait((name, document))
+
+    async def receive(self):
+        """
+        The next pushed document
+
+        :return: the kind of push and the document, as parsed by parse_document
+        :rtype: tuple
+        :raises ConnectionError: when the connection is closed
+        """
+        item = await self._pushes.get()
+        if item is None:
+            # for the next calls
+            self._pushes.put_nowait(None)
+            raise ConnectionError("WS2P connection closed")
+        return item
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self.receive()
+        except ConnectionError:
+            raise StopAsyncIteration
+
+    async def request(self, name, params=None):
+        """
+        Send a request and wait for its answer. Many requests can wait at the same time.
+
+        :param str name: the request, as CURRENT or BLOCKS_CHUNK
+        :param dict params: the parameters of the request
+        :return: the body of the answer
+        :raises WS2PError: when the node answers an error
+        """
+        if self._closed or self._ws is None:
+            raise ConnectionError("WS2P connection closed")
+        req_id = binascii.hexlify(os.urandom(4)).decode("ascii")
+        while req_id in self._pending:
+            req_id = binascii.hexlify(os.urandom(4)).decode("ascii")
+        future = self._pending[req_id] = asyncio.get_event_loop().create_future()
+        try:
+            await self._send({"reqId": req_id, "body": {"name": name, "params": params or {}}})
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            del self._pending[req_id]
+
+    async def current(self):
+        """
+        :rtype: duniterpy.documents.Block
+        """
+        return Block.from_bma_json(await self.request(CURRENT))
+
+    async def block(self, number):
+        """
+        :param int number: the block number
+        :rtype: duniterpy.documents.Block
+        """
+        return Block.from_bma_json(await self.request(BLOCK_BY_NUMBER, {"number": number}))
+
+    async def blocks(self, count, from_number):
+        """
+        :param int count: the number of blocks
+        :param int from_number: the number of the first block
+        :rtype: list[duniterpy.documents.Block]
+        """
+        return [Block.from_bma_json(data)
+                for data in await self.request(BLOCKS_CHUNK, {"count": count, "fromNumber": from_number})]
+
+    async def blocks_range(self, start, end, chunk_size=250, concurrency=4):
+        """
+        The blocks of a range, requested by chunks running at the same time over the socket
+
+        :param int start: the number of the first block
+        :param int end: the number of the last block, included
+        :param int chunk_size: the number of blocks of a request
+        :param int concurrency: the maximum number of requests waiting for their answer
+        :rtype: list[duniterpy.documents.Block]
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def chunk(first):
+            async with semaphore:
+                return await self.blocks(min(chunk_size, end - first + 1), first)
+
+        chunks = await asyncio.gather(*[chunk(first) for first in range(start, end + 1, chunk_size)])
+        return [block for blocks in chunks for block in blocks]
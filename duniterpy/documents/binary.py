@@ -0,0 +1,587 @@
+"""
+Compact binary encoding of the documents, for caches and transfers between processes.
+
+An encoded document starts with a magic, the version of the format and the type of the document.
+Pubkeys, signatures and hashes are stored as raw bytes and integers as varints.
+A value which would not be rendered back to the same text from its raw bytes
+is stored as text, so a decoded document always renders the text of the encoded one.
+"""
+import base64
+import binascii
+import functools
+
+import base58
+
+from .block import Block, BlockUID
+from .certification import Identity, Certification, Revocation
+from .document import MalformedDocumentError
+from .membership import Membership
+from .peer import Peer, endpoint
+from .transaction import Transaction, InputSource, OutputSource, Unlock
+from ..key.base58 import Base58Encoder
+
+MAGIC = b"DPB"
+FORMAT_VERSION = 1
+
+BLOCK = 1
+TRANSACTION = 2
+IDENTITY = 3
+CERTIFICATION = 4
+MEMBERSHIP = 5
+REVOCATION = 6
+PEER = 7
+
+# tags of the values stored as raw bytes when possible
+_RAW = 0
+_TEXT = 1
+_NONE = 2
+_REF = 3
+
+# tags of the numbers
+_POSITIVE = 0
+_NEGATIVE = 1
+_NUMBER_TEXT = 2
+_NUMBER_NONE = 3
+
+
+class _Writer(bytearray):
+    def __init__(self, data):
+        super().__init__(data)
+        # index of the raw pubkeys and hashes already written in the document
+        self.refs = {}
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = data
+        self.length = len(data)
+        self.pos = 0
+        self.refs = []
+
+    def byte(self):
+        pos = self.pos
+        if pos >= self.length:
+            raise MalformedDocumentError("Truncated binary document")
+        self.pos = pos + 1
+        return self.data[pos]
+
+    def bytes(self, length):
+        end = self.pos + length
+        if end > self.length:
+            raise MalformedDocumentError("Truncated binary document")
+        value = self.data[self.pos:end]
+        self.pos = end
+        return value
+
+
+def _write_varint(out, value):
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(reader):
+    byte = reader.byte()
+    if byte < 0x80:
+        return byte
+    value = byte & 0x7f
+    shift = 7
+    while True:
+        byte = reader.byte()
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value
+        shift += 7
+
+
+def _write_text(out, value):
+    encoded = value.encode("utf-8")
+    _write_varint(out, len(encoded))
+    out += encoded
+
+
+def _read_text(reader):
+    return bytes(reader.bytes(_read_varint(reader))).decode("utf-8")
+
+
+def _write_number(out, value):
+    """
+    Write an integer, which may be None or kept as a str by the documents parsers
+    """
+    if value is None:
+        out.append(_NUMBER_NONE)
+    elif type(value) is int:
+        if value >= 0:
+            out.append(_POSITIVE)
+            _write_varint(out, value)
+        else:
+            out.append(_NEGATIVE)
+            _write_varint(out, -value)
+    elif value.isdigit() and str(int(value)) == value:
+        out.append(_POSITIVE)
+        _write_varint(out, int(value))
+    else:
+        out.append(_NUMBER_TEXT)
+        _write_text(out, value)
+
+
+def _read_number(reader):
+    tag = reader.byte()
+    if tag == _POSITIVE:
+        return _read_varint(reader)
+    elif tag == _NEGATIVE:
+        return -_read_varint(reader)
+    elif tag == _NUMBER_TEXT:
+        return _read_text(reader)
+    elif tag == _NUMBER_NONE:
+        return None
+    raise MalformedDocumentError("Binary number tag {0}".format(tag))
+
+
+@functools.lru_cache(maxsize=65536)
+def _pubkey_bytes(pubkey):
+    """
+    The raw bytes of a pubkey, or None if they would not be encoded back to the same text
+    """
+    try:
+        raw = base58.b58decode(pubkey)
+    except ValueError:
+        return None
+    if len(raw) == 32 and Base58Encoder.encode(raw) == pubkey:
+        return raw
+    return None
+
+
+@functools.lru_cache(maxsize=65536)
+def _pubkey_text(raw):
+    return Base58Encoder.encode(raw)
+
+
+def _write_raw(out, raw):
+    """
+    Write raw bytes of 32 bytes, or a reference to the same bytes written before in the document
+    """
+    index = out.refs.get(raw)
+    if index is None:
+        out.refs[raw] = len(out.refs)
+        out.append(_RAW)
+        out += raw
+    else:
+        out.append(_REF)
+        _write_varint(out, index)
+
+
+def _read_raw(reader, tag):
+    if tag == _RAW:
+        raw = bytes(reader.bytes(32))
+        reader.refs.append(raw)
+        return raw
+    try:
+        return reader.refs[_read_varint(reader)]
+    except IndexError:
+        raise MalformedDocumentError("Binary reference")
+
+
+def _write_pubkey(out, pubkey):
+    if pubkey is None:
+        out.append(_NONE)
+        return
+    raw = _pubkey_bytes(pubkey)
+    if raw is None:
+        out.append(_TEXT)
+        _write_text(out, pubkey)
+    else:
+        _write_raw(out, raw)
+
+
+def _read_pubkey(reader):
+    tag = reader.byte()
+    if tag == _RAW or tag == _REF:
+        return _pubkey_text(_read_raw(reader, tag))
+    elif tag == _TEXT:
+        return _read_text(reader)
+    elif tag == _NONE:
+        return None
+    raise MalformedDocumentError("Binary pubkey tag {0}".format(tag))
+
+
+def _write_signature(out, signature):
+    if signature is None:
+        out.append(_NONE)
+        return
+    try:
+        raw = base64.b64decode(signature, validate=True)
+    except (binascii.Error, ValueError):
+        raw = None
+    if raw is not None and len(raw) == 64 and base64.b64encode(raw).decode("ascii") == signature:
+        out.append(_RAW)
+        out += raw
+    else:
+        out.append(_TEXT)
+        _write_text(out, signature)
+
+
+def _read_signature(reader):
+    tag = reader.byte()
+    if tag == _RAW:
+        return base64.b64encode(reader.bytes(64)).decode("ascii")
+    elif tag == _TEXT:
+        return _read_text(reader)
+    elif tag == _NONE:
+        return None
+    raise MalformedDocumentError("Binary signature tag {0}".format(tag))
+
+
+def _write_hash(out, sha_hash):
+    if sha_hash is None:
+        out.append(_NONE)
+        return
+    raw = None
+    if len(sha_hash) == 64:
+        try:
+            raw = bytes.fromhex(sha_hash)
+        except ValueError:
+            pass
+    if raw is not None and binascii.hexlify(raw).decode("ascii").upper() == sha_hash:
+        _write_raw(out, raw)
+    else:
+        out.append(_TEXT)
+        _write_text(out, sha_hash)
+
+
+def _read_hash(reader):
+    tag = reader.byte()
+    if tag == _RAW or tag == _REF:
+        return _read_raw(reader, tag).hex().upper()
+    elif tag == _TEXT:
+        return _read_text(reader)
+    elif tag == _NONE:
+        return None
+    raise MalformedDocumentError("Binary hash tag {0}".format(tag))
+
+
+def _write_block_uid(out, block_uid):
+    if block_uid is None:
+        out.append(_NONE)
+    else:
+        out.append(_RAW)
+        _write_varint(out, block_uid.number)
+        _write_hash(out, block_uid.sha_hash)
+
+
+def _read_block_uid(reader):
+    tag = reader.byte()
+    if tag == _NONE:
+        return None
+    return BlockUID(_read_varint(reader), _read_hash(reader))
+
+
+def _write_list(out, values, write):
+    _write_varint(out, len(values))
+    for value in values:
+        write(out, value)
+
+
+def _read_list(reader, read):
+    return [read(reader) for _ in range(_read_varint(reader))]
+
+
+def _signature(document):
+    """
+    The signature of a document signed once, None while it is not signed
+    """
+    return document.signatures[0] if document.signatures else None
+
+
+def _write_identity(out, identity):
+    _write_pubkey(out, identity.pubkey)
+    _write_text(out, identity.uid)
+    _write_block_uid(out, identity.timestamp)
+    _write_signature(out, _signature(identity))
+
+
+def _read_identity(reader, version, currency):
+    pubkey = _read_pubkey(reader)
+    uid = _read_text(reader)
+    timestamp = _read_block_uid(reader)
+    return Identity(version, currency, pubkey, uid, timestamp, _read_signature(reader))
+
+
+def _write_certification(out, certification):
+    _write_pubkey(out, certification.pubkey_from)
+    _write_pubkey(out, certification.pubkey_to)
+    _write_block_uid(out, certification.timestamp)
+    _write_signature(out, _signature(certification))
+
+
+def _read_certification(reader, version, currency):
+    pubkey_from = _read_pubkey(reader)
+    pubkey_to = _read_pubkey(reader)
+    timestamp = _read_block_uid(reader)
+    return Certification(version, currency, pubkey_from, pubkey_to, timestamp, _read_signature(reader))
+
+
+def _write_membership(out, membership):
+    _write_pubkey(out, membership.issuer)
+    _write_block_uid(out, membership.membership_ts)
+    _write_text(out, membership.membership_type)
+    _write_text(out, membership.uid)
+    _write_block_uid(out, membership.identity_ts)
+    _write_signature(out, _signature(membership))
+
+
+def _read_membership(reader, version, currency):
+    issuer = _read_pubkey(reader)
+    membership_ts = _read_block_uid(reader)
+    membership_type = _read_text(reader)
+    uid = _read_text(reader)
+    identity_ts = _read_block_uid(reader)
+    return Membership(version, currency, issuer, membership_ts, membership_type, uid, identity_ts,
+                      _read_signature(reader))
+
+
+def _write_revocation(out, revocation):
+    _write_pubkey(out, revocation.pubkey)
+    _write_signature(out, _signature(revocation))
+
+
+def _read_revocation(reader, version, currency):
+    pubkey = _read_pubkey(reader)
+    return Revocation(version, currency, pubkey, _read_signature(reader))
+
+
+def _write_input(out, input_source):
+    _write_number(out, input_source.amount)
+    _write_number(out, input_source.base)
+    _write_text(out, input_source.source)
+    if input_source.source == "D":
+        _write_pubkey(out, input_source.origin_id)
+    else:
+        _write_hash(out, input_source.origin_id)
+    _write_varint(out, input_source.index)
+
+
+def _read_input(reader):
+    amount = _read_number(reader)
+    base = _read_number(reader)
+    source = _read_text(reader)
+    if source == "D":
+        origin_id = _read_pubkey(reader)
+    else:
+        origin_id = _read_hash(reader)
+    return InputSource(amount, base, source, origin_id, _read_varint(reader))
+
+
+def _write_output(out, output_source):
+    conditions = output_source.inline().split(":", 2)[2]
+    _write_number(out, output_source.amount)
+    _write_number(out, output_source.base)
+    # most outputs are a single SIG condition, stored as a raw pubkey
+    if conditions.startswith("SIG(") and conditions.endswith(")") \
+            and _pubkey_bytes(conditions[4:-1]) is not None:
+        _write_raw(out, _pubkey_bytes(conditions[4:-1]))
+    else:
+        out.append(_TEXT)
+        _write_text(out, conditions)
+
+
+def _read_output(reader, lazy_conditions):
+    amount = _read_number(reader)
+    base = _read_number(reader)
+    tag = reader.byte()
+    if tag == _RAW or tag == _REF:
+        conditions = "SIG({0})".format(_pubkey_text(_read_raw(reader, tag)))
+    elif tag == _TEXT:
+        conditions = _read_text(reader)
+    else:
+        raise MalformedDocumentError("Binary output tag {0}".format(tag))
+    return OutputSource.from_inline("{0}:{1}:{2}\n".format(amount, base, conditions), lazy_conditions)
+
+
+def _write_transaction(out, transaction):
+    _write_varint(out, transaction.version)
+    _write_block_uid(out, transaction.blockstamp)
+    _write_number(out, transaction.locktime)
+    _write_list(out, transaction.issuers, _write_pubkey)
+    _write_list(out, transaction.inputs, _write_input)
+    _write_list(out, [u.inline() for u in transaction.unlocks], _write_text)
+    _write_list(out, transaction.outputs, _write_output)
+    _write_text(out, transaction.comment)
+    _write_list(out, transaction.signatures, _write_signature)
+
+
+def _read_transaction(reader, currency, lazy_conditions):
+    version = _read_varint(reader)
+    blockstamp = _read_block_uid(reader)
+    locktime = _read_number(reader)
+    issuers = _read_list(reader, _read_pubkey)
+    inputs = _read_list(reader, _read_input)
+    unlocks = [Unlock.from_inline(u + "\n") for u in _read_list(reader, _read_text)]
+    outputs = [_read_output(reader, lazy_conditions) for _ in range(_read_varint(reader))]
+    comment = _read_text(reader)
+    signatures = _read_list(reader, _read_signature)
+    return Transaction(version, currency, blockstamp, locktime, issuers, inputs, unlocks, outputs, comment,
+                       signatures)
+
+
+def _write_block(out, block):
+    _write_number(out, block.number)
+    _write_number(out, block.powmin)
+    _write_number(out, block.time)
+    _write_number(out, block.mediantime)
+    _write_number(out, block.ud)
+    _write_number(out, block.unit_base)
+    _write_pubkey(out, block.issuer)
+    _write_number(out, block.issuers_frame)
+    _write_number(out, block.issuers_frame_var)
+    _write_number(out, block.different_issuers_count)
+    _write_hash(out, block.prev_hash)
+    _write_pubkey(out, block.prev_issuer)
+    if block.parameters is None:
+        out.append(_NONE)
+    else:
+        out.append(_TEXT)
+        _write_list(out, [str(p) for p in block.parameters], _write_text)
+    _write_number(out, block.members_count)
+    _write_list(out, block.identities, _write_identity)
+    _write_list(out, block.joiners, _write_membership)
+    _write_list(out, block.actives, _write_membership)
+    _write_list(out, block.leavers, _write_membership)
+    _write_list(out, block.revoked, _write_revocation)
+    _write_list(out, block.excluded, _write_pubkey)
+    _write_list(out, block.certifications, _write_certification)
+    _write_list(out, block.transactions, _write_transaction)
+    _write_hash(out, block.inner_hash)
+    _write_number(out, block.noonce)
+    _write_signature(out, _signature(block))
+
+
+def _read_block(reader, version, currency, lazy_conditions):
+    number = _read_number(reader)
+    powmin = _read_number(reader)
+    time = _read_number(reader)
+    mediantime = _read_number(reader)
+    ud = _read_number(reader)
+    unit_base = _read_number(reader)
+    issuer = _read_pubkey(reader)
+    issuers_frame = _read_number(reader)
+    issuers_frame_var = _read_number(reader)
+    different_issuers_count = _read_number(reader)
+    prev_hash = _read_hash(reader)
+    prev_issuer = _read_pubkey(reader)
+    parameters = None
+    if reader.byte() != _NONE:
+        parameters = tuple(_read_list(reader, _read_text))
+    members_count = _read_number(reader)
+    identities = [_read_identity(reader, version, currency) for _ in range(_read_varint(reader))]
+    joiners = [_read_membership(reader, version, currency) for _ in range(_read_varint(reader))]
+    actives = [_read_membership(reader, version, currency) for _ in range(_read_varint(reader))]
+    leavers = [_read_membership(reader, version, currency) for _ in range(_read_varint(reader))]
+    revoked = [_read_revocation(reader, version, currency) for _ in range(_read_varint(reader))]
+    excluded = _read_list(reader, _read_pubkey)
+    certifications = [_read_certification(reader, version, currency) for _ in range(_read_varint(reader))]
+    transactions = [_read_transaction(reader, currency, lazy_conditions) for _ in range(_read_varint(reader))]
+    inner_hash = _read_hash(reader)
+    noonce = _read_number(reader)
+    signature = _read_signature(reader)
+    return Block(version, currency, number, powmin, time, mediantime, ud, unit_base, issuer, issuers_frame,
+                 issuers_frame_var, different_issuers_count, prev_hash, prev_issuer, parameters, members_count,
+                 identities, joiners, actives, leavers, revoked, excluded, certifications, transactions,
+                 inner_hash, noonce, signature)
+
+
+def _write_peer(out, peer):
+    _write_pubkey(out, peer.pubkey)
+    _write_block_uid(out, peer.blockUID)
+    _write_list(out, [e.inline() for e in peer.endpoints], _write_text)
+    _write_list(out, peer.signatures, _write_signature)
+
+
+def _read_peer(reader, version, currency):
+    pubkey = _read_pubkey(reader)
+    block_uid = _read_block_uid(reader)
+    endpoints = [endpoint(e) for e in _read_list(reader, _read_text)]
+    signatures = _read_list(reader, _read_signature)
+    return Peer(version, currency, pubkey, block_uid, endpoints, signatures[0] if signatures else None)
+
+
+_WRITERS = {
+    Block: (BLOCK, _write_block),
+    Identity: (IDENTITY, _write_identity),
+    Certification: (CERTIFICATION, _write_certification),
+    Membership: (MEMBERSHIP, _write_membership),
+    Revocation: (REVOCATION, _write_revocation),
+    Peer: (PEER, _write_peer),
+}
+
+_READERS = {
+    IDENTITY: _read_identity,
+    CERTIFICATION: _read_certification,
+    MEMBERSHIP: _read_membership,
+    REVOCATION: _read_revocation,
+    PEER: _read_peer,
+}
+
+
+def dumps(document):
+    """
+    Encode a document
+
+    :param duniterpy.documents.Document document: a Block, Transaction, Identity, Certification,
+        Membership, Revocation or Peer document
+    :rtype: bytes
+    """
+    out = _Writer(MAGIC)
+    out.append(FORMAT_VERSION)
+    if isinstance(document, Transaction):
+        # the version of a transaction is part of its compact format
+        out.append(TRANSACTION)
+        _write_text(out, document.currency)
+        _write_transaction(out, document)
+        return bytes(out)
+    try:
+        document_type, write = _WRITERS[type(document)]
+    except KeyError:
+        raise TypeError("Cannot encode {0}".format(type(document)))
+    out.append(document_type)
+    _write_varint(out, document.version)
+    _write_text(out, document.currency)
+    write(out, document)
+    return bytes(out)
+
+
+def loads(data, lazy_conditions=False):
+    """
+    Decode a document
+
+    :param bytes data: the encoded document
+    :param bool lazy_conditions: parse the conditions of the transactions outputs on first access
+    :rtype: duniterpy.documents.Document
+    """
+    reader = _Reader(memoryview(data))
+    try:
+        if bytes(reader.bytes(len(MAGIC))) != MAGIC:
+            raise MalformedDocumentError("Binary document magic")
+        format_version = reader.byte()
+        if format_version != FORMAT_VERSION:
+            raise MalformedDocumentError("Binary document format version {0}".format(format_version))
+        document_type = reader.byte()
+        if document_type == TRANSACTION:
+            currency = _read_text(reader)
+            document = _read_transaction(reader, currency, lazy_conditions)
+        else:
+            version = _read_varint(reader)
+            currency = _read_text(reader)
+            if document_type == BLOCK:
+                document = _read_block(reader, version, currency, lazy_conditions)
+            elif document_type in _READERS:
+                document = _READERS[document_type](reader, version, currency)
+            else:
+                raise MalformedDocumentError("Binary document type {0}".format(document_type))
+        if reader.pos != len(data):
+            raise MalformedDocumentError("Trailing data after the binary document")
+    except (UnicodeDecodeError, AssertionError, ValueError, IndexError, TypeError) as e:
+        # the values of a corrupted document, which the readers do not check one by one
+        raise MalformedDocumentError("Binary document ({0})".format(e))
+    return document
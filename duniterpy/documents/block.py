@@ -1,10 +1,10 @@
-from .document import Document, MalformedDocumentError
+from .document import Document, MalformedDocumentError, LazyPattern
 from .certification import Identity, Certification, Revocation
 from .membership import Membership
 from .transaction import Transaction
 from .constants import pubkey_regex, block_id_regex, block_hash_regex
+from .interning import intern_str
 
-import re
 import hashlib
 import base64
 
@@ -24,9 +24,9 @@ class BlockUID:
     """
     A simple block id
     """
-    re_block_uid = re.compile("({block_id_regex})-({block_hash_regex})".format(block_id_regex=block_id_regex,
+    re_block_uid = LazyPattern("({block_id_regex})-({block_hash_regex})".format(block_id_regex=block_id_regex,
                                                                              block_hash_regex=block_hash_regex))
-    re_hash = re.compile("({block_hash_regex})".format(block_hash_regex=block_hash_regex))
+    re_hash = LazyPattern("({block_hash_regex})".format(block_hash_regex=block_hash_regex))
 
     @classmethod
     def empty(cls):
@@ -36,7 +36,7 @@ class BlockUID:
         assert(type(number) is int)
         assert(BlockUID.re_hash.match(sha_hash) is not None)
         self.number = number
-        self.sha_hash = sha_hash
+        self.sha_hash = intern_str(sha_hash)
 
     @classmethod
     def from_str(cls, blockid):
@@ -126,36 +126,36 @@ The class Block handles Block documents.
 
     """
 
-    re_type = re.compile("Type: (Block)\n")
-    re_number = re.compile("Number: ([0-9]+)\n")
-    re_powmin = re.compile("PoWMin: ([0-9]+)\n")
-    re_time = re.compile("Time: ([0-9]+)\n")
-    re_mediantime = re.compile("MedianTime: ([0-9]+)\n")
-    re_universaldividend = re.compile("UniversalDividend: ([0-9]+)\n")
-    re_unitbase = re.compile("UnitBase: ([0-9]+)\n")
-    re_issuer = re.compile("Issuer: ({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
-    re_issuers_frame = re.compile("IssuersFrame: ([0-9]+)\n")
-    re_issuers_frame_var = re.compile("IssuersFrameVar: (0|-?[1-9]\d{0,18})\n")
-    re_different_issuers_count = re.compile("DifferentIssuersCount: ([0-9]+)\n")
-    re_previoushash = re.compile("PreviousHash: ({block_hash_regex})\n".format(block_hash_regex=block_hash_regex))
-    re_previousissuer = re.compile("PreviousIssuer: ({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
-    re_parameters = re.compile("Parameters: ([0-9]+\.[0-9]+):([0-9]+):([0-9]+):([0-9]+):([0-9]+):([0-9]+):\
+    re_type = LazyPattern("Type: (Block)\n")
+    re_number = LazyPattern("Number: ([0-9]+)\n")
+    re_powmin = LazyPattern("PoWMin: ([0-9]+)\n")
+    re_time = LazyPattern("Time: ([0-9]+)\n")
+    re_mediantime = LazyPattern("MedianTime: ([0-9]+)\n")
+    re_universaldividend = LazyPattern("UniversalDividend: ([0-9]+)\n")
+    re_unitbase = LazyPattern("UnitBase: ([0-9]+)\n")
+    re_issuer = LazyPattern("Issuer: ({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
+    re_issuers_frame = LazyPattern("IssuersFrame: ([0-9]+)\n")
+    re_issuers_frame_var = LazyPattern("IssuersFrameVar: (0|-?[1-9]\d{0,18})\n")
+    re_different_issuers_count = LazyPattern("DifferentIssuersCount: ([0-9]+)\n")
+    re_previoushash = LazyPattern("PreviousHash: ({block_hash_regex})\n".format(block_hash_regex=block_hash_regex))
+    re_previousissuer = LazyPattern("PreviousIssuer: ({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
+    re_parameters = LazyPattern("Parameters: ([0-9]+\.[0-9]+):([0-9]+):([0-9]+):([0-9]+):([0-9]+):([0-9]+):\
 ([0-9]+):([0-9]+):([0-9]+\.[0-9]+):([0-9]+):([0-9]+):([0-9]+):([0-9]+):([0-9]+):([0-9]+):([0-9]+\.[0-9]+)\n")
-    re_parameters_v10 = re.compile("Parameters: ([0-9]+\.[0-9]+):([0-9]+):([0-9]+):([0-9]+):([0-9]+):([0-9]+):\
+    re_parameters_v10 = LazyPattern("Parameters: ([0-9]+\.[0-9]+):([0-9]+):([0-9]+):([0-9]+):([0-9]+):([0-9]+):\
 ([0-9]+):([0-9]+):([0-9]+):([0-9]+):([0-9]+\.[0-9]+):([0-9]+):([0-9]+):([0-9]+):([0-9]+):([0-9]+):([0-9]+\.[0-9]+):\
 ([0-9]+):([0-9]+):([0-9]+)\n")
-    re_memberscount = re.compile("MembersCount: ([0-9]+)\n")
-    re_identities = re.compile("Identities:\n")
-    re_joiners = re.compile("Joiners:\n")
-    re_actives = re.compile("Actives:\n")
-    re_leavers = re.compile("Leavers:\n")
-    re_revoked = re.compile("Revoked:\n")
-    re_excluded = re.compile("Excluded:\n")
-    re_exclusion = re.compile("({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
-    re_certifications = re.compile("Certifications:\n")
-    re_transactions = re.compile("Transactions:\n")
-    re_hash = re.compile("InnerHash: ({block_hash_regex})\n".format(block_hash_regex=block_hash_regex))
-    re_noonce = re.compile("Nonce: ([0-9]+)\n")
+    re_memberscount = LazyPattern("MembersCount: ([0-9]+)\n")
+    re_identities = LazyPattern("Identities:\n")
+    re_joiners = LazyPattern("Joiners:\n")
+    re_actives = LazyPattern("Actives:\n")
+    re_leavers = LazyPattern("Leavers:\n")
+    re_revoked = LazyPattern("Revoked:\n")
+    re_excluded = LazyPattern("Excluded:\n")
+    re_exclusion = LazyPattern("({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
+    re_certifications = LazyPattern("Certifications:\n")
+    re_transactions = LazyPattern("Transactions:\n")
+    re_hash = LazyPattern("InnerHash: ({block_hash_regex})\n".format(block_hash_regex=block_hash_regex))
+    re_noonce = LazyPattern("Nonce: ([0-9]+)\n")
 
     fields_parsers = {**Document.fields_parsers, **{
                 'Type': re_type,
@@ -239,12 +239,12 @@ The class Block handles Block documents.
         self.mediantime = mediantime
         self.ud = ud
         self.unit_base = unit_base
-        self.issuer = issuer
+        self.issuer = intern_str(issuer)
         self.issuers_frame = issuers_frame
         self.issuers_frame_var = issuers_frame_var
         self.different_issuers_count = different_issuers_count
-        self.prev_hash = prev_hash
-        self.prev_issuer = prev_issuer
+        self.prev_hash = intern_str(prev_hash)
+        self.prev_issuer = intern_str(prev_issuer)
         self.parameters = parameters
         self.members_count = members_count
         self.identities = identities
@@ -252,7 +252,7 @@ The class Block handles Block documents.
         self.actives = actives
         self.leavers = leavers
         self.revoked = revokations
-        self.excluded = excluded
+        self.excluded = [intern_str(e) for e in excluded]
         self.certifications = certifications
         self.transactions = transactions
         self.inner_hash = inner_hash
@@ -398,27 +398,9 @@ The class Block handles Block documents.
         if Block.re_transactions.match(lines[n]):
             n += 1
             while not Block.re_hash.match(lines[n]):
-                tx_lines = ""
-                header_data = Transaction.re_header.match(lines[n])
-                if header_data is None:
-                    raise MalformedDocumentError("Compact transaction ({0})".format(lines[n]))
-                tx_version = int(header_data.group(1))
-                issuers_num = int(header_data.group(2))
-                inputs_num = int(header_data.group(3))
-                unlocks_num = int(header_data.group(4))
-                outputs_num = int(header_data.group(5))
-                has_comment = int(header_data.group(6))
-                if version > 2:
-                    if tx_version <= 2:
-                        raise MalformedDocumentError("TX document is using wrong version")
-                    sup_lines = 2
-                else:
-                    sup_lines = 1
-                tx_max = n + sup_lines + issuers_num * 2 + inputs_num + unlocks_num + outputs_num + has_comment
-                for i in range(n, tx_max):
-                    tx_lines += lines[n]
-                    n += 1
-                transaction = Transaction.from_compact(currency, tx_lines)
+                transaction, n = Transaction.from_compact_lines(currency, lines, n)
+                if version > 2 and transaction.version <= 2:
+                    raise MalformedDocumentError("TX document is using wrong version")
                 transactions.append(transaction)
 
         inner_hash = Block.parse_field("InnerHash", lines[n])
@@ -436,6 +418,87 @@ The class Block handles Block documents.
                    actives, leavers, revoked, excluded, certifications,
                    transactions, inner_hash, noonce, signature)
 
+    @classmethod
+    def from_bma_json(cls, data, lazy_conditions=False):
+        """
+        Get the block from the json of blockchain.block.
+        The documents of the block are built directly from their inline json values,
+        which are kept as-is, so the rendered raw document is the one of the node.
+
+        :param dict data: json data of the block, as validated by BLOCK_SCHEMA
+        :param bool lazy_conditions: parse the conditions of the transactions outputs on first access
+        :rtype: Block
+        """
+        try:
+            version = data["version"]
+            currency = data["currency"]
+            number = data["number"]
+            ud = data["dividend"]
+            unit_base = data["unitbase"] if version >= 3 or ud else None
+            if version >= 3:
+                issuers_frame = data["issuersFrame"]
+                issuers_frame_var = data["issuersFrameVar"]
+                different_issuers_count = data["issuersCount"]
+            else:
+                issuers_frame = None
+                issuers_frame_var = None
+                different_issuers_count = None
+
+            if "hash" in data:
+                _hash(data["hash"], "Block hash")
+            if number > 0:
+                prev_hash = _hash(data["previousHash"], "Previous hash")
+                prev_issuer = data["previousIssuer"]
+                parameters = None
+            else:
+                prev_hash = None
+                prev_issuer = None
+                parameters = tuple(data["parameters"].split(":"))
+
+            identities = []
+            for inline in data["identities"]:
+                pubkey, signature, ts, uid = _inline_fields(inline, 4, "Inline self certification")
+                identities.append(Identity(version, currency, pubkey, uid, _block_uid(ts), signature))
+
+            joiners = _memberships(version, currency, "IN", data["joiners"])
+            actives = _memberships(version, currency, "IN", data.get("actives", []))
+            leavers = _memberships(version, currency, "OUT", data["leavers"])
+
+            revoked = []
+            for inline in data.get("revoked", []):
+                pubkey, signature = _inline_fields(inline, 2, "Revokation")
+                revoked.append(Revocation(version, currency, pubkey, signature))
+
+            certifications = []
+            for inline in data["certifications"]:
+                pubkey_from, pubkey_to, blockid, signature = _inline_fields(inline, 4, "Certification")
+                blockid = int(blockid)
+                timestamp = BlockUID.empty() if blockid == 0 else BlockUID(blockid, prev_hash)
+                certifications.append(Certification(version, currency, pubkey_from, pubkey_to, timestamp, signature))
+
+            transactions = [Transaction.from_bma_history(currency, tx_data, lazy_conditions)
+                            for tx_data in data["transactions"]]
+
+            return cls(version, currency, number, data["powMin"], data["time"],
+                       data["medianTime"], ud, unit_base, data["issuer"], issuers_frame, issuers_frame_var,
+                       different_issuers_count, prev_hash, prev_issuer,
+                       parameters, data["membersCount"], identities, joiners,
+                       actives, leavers, revoked, data["excluded"], certifications,
+                       transactions, data["inner_hash"], data["nonce"], data["signature"])
+        except (KeyError, ValueError) as e:
+            raise MalformedDocumentError("Block json ({0})".format(e))
+
+    @classmethod
+    def from_bma_blocks(cls, data, lazy_conditions=False):
+        """
+        Get the blocks of a page of blockchain.blocks
+
+        :param list[dict] data: json data of the blocks, as validated by BLOCKS_SCHEMA
+        :param bool lazy_conditions: parse the conditions of the transactions outputs on first access
+        :rtype: list[Block]
+        """
+        return [cls.from_bma_json(block_data, lazy_conditions) for block_data in data]
+
     def raw(self):
         doc = """Version: {version}
 Type: Block
@@ -511,26 +574,35 @@ PreviousIssuer: {1}\n".format(self.prev_hash, self.prev_issuer)
 
         return doc
 
+    def signed_part(self):
+        """
+        The part of the block signed by its issuer : its inner hash and its nonce
+
+        :rtype: str
+        """
+        return "InnerHash: {0}\nNonce: {1}\n".format(self.inner_hash, self.noonce)
+
     def proof_of_work(self):
-        doc_str = """InnerHash: {inner_hash}
-Nonce: {nonce}
-{signature}
-""".format(inner_hash=self.inner_hash, nonce=self.noonce, signature=self.signatures[0])
+        doc_str = "{0}{1}\n".format(self.signed_part(), self.signatures[0])
         return hashlib.sha256(doc_str.encode('ascii')).hexdigest().upper()
 
     def computed_inner_hash(self):
-        doc = self.signed_raw()
-        inner_doc = '\n'.join(doc.split('\n')[:-2]) + '\n'
+        """
+        The hash of the content of the block, up to its InnerHash field
+
+        :rtype: str
+        """
+        doc = self.raw()
+        inner_doc = doc[:doc.rindex("InnerHash: ")]
         return hashlib.sha256(inner_doc.encode("ascii")).hexdigest().upper()
 
     def sign(self, keys):
         """
-        Sign the current document.
+        Sign the current document, over its inner hash and nonce.
         Warning : current signatures will be replaced with the new ones.
         """
         key = keys[0]
-        signed = self.raw()[-2:]
-        signing = base64.b64encode(key.signature(bytes(signed, 'ascii')))
+        signing = base64.b64encode(key.signature(bytes(self.signed_part(), 'ascii')))
         self.signatures = [signing.decode("ascii")]
 
     def __eq__(self, other):
@@ -547,3 +619,45 @@ Nonce: {nonce}
 
     def __ge__(self, other):
         return self.blockUID >= other.blockUID
+
+
+def _inline_fields(inline, count, name):
+    """
+    Split an inline document of a block json in its fields
+
+    :param str inline: the inline document
+    :param int count: the expected number of fields
+    :param str name: the name of the document, for the error
+    :rtype: list[str]
+    """
+    fields = inline.split(":")
+    if len(fields) != count:
+        raise MalformedDocumentError("{0} ({1})".format(name, inline))
+    return fields
+
+
+def _hash(value, name):
+    """
+    Check a hash of a block json, BlockUID only asserting its hashes
+
+    :param str value: the hash
+    :param str name: the name of the field, for the error
+    :rtype: str
+    """
+    if not isinstance(value, str) or BlockUID.re_hash.fullmatch(value) is None:
+        raise MalformedDocumentError("{0} ({1})".format(name, value))
+    return value
+
+
+def _block_uid(value):
+    number, _, sha_hash = value.partition("-")
+    return BlockUID(int(number), _hash(sha_hash, "BlockUID"))
+
+
+def _memberships(version, currency, membership_type, inlines):
+    memberships = []
+    for inline in inlines:
+        issuer, signature, membership_ts, identity_ts, uid = _inline_fields(inline, 5, "Inline membership")
+        memberships.append(Membership(version, currency, issuer, _block_uid(membership_ts), membership_type, uid,
+                                      _block_uid(identity_ts), signature))
+    return memberships
@@ -1,9 +1,9 @@
-import re
 import base64
 import logging
 
-from .document import Document, MalformedDocumentError
+from .document import Document, MalformedDocumentError, LazyPattern
 from .constants import pubkey_regex, signature_regex, block_id_regex, block_uid_regex, uid_regex
+from .interning import intern_str
 
 
 class Identity(Document):
@@ -11,16 +11,16 @@ class Identity(Document):
     A document describing a self certification.
     """
 
-    re_inline = re.compile("({pubkey_regex}):({signature_regex}):({block_uid_regex}):([^\n]+)\n"
+    re_inline = LazyPattern("({pubkey_regex}):({signature_regex}):({block_uid_regex}):([^\n]+)\n"
                            .format(pubkey_regex=pubkey_regex,
                                    signature_regex=signature_regex,
                                    block_uid_regex=block_uid_regex))
-    re_type = re.compile("Type: (Identity)")
-    re_issuer = re.compile("Issuer: ({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
-    re_unique_id = re.compile("UniqueID: ({uid_regex})\n".format(uid_regex=uid_regex))
-    re_uid = re.compile("UID:([^\n]+)\n")
-    re_meta_ts = re.compile("META:TS:({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
-    re_timestamp = re.compile("Timestamp: ({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
+    re_type = LazyPattern("Type: (Identity)")
+    re_issuer = LazyPattern("Issuer: ({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
+    re_unique_id = LazyPattern("UniqueID: ({uid_regex})\n".format(uid_regex=uid_regex))
+    re_uid = LazyPattern("UID:([^\n]+)\n")
+    re_meta_ts = LazyPattern("META:TS:({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
+    re_timestamp = LazyPattern("Timestamp: ({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
 
     fields_parsers = {**Document.fields_parsers, **{
         "Type": re_type,
@@ -44,9 +44,9 @@ class Identity(Document):
             super().__init__(version, currency, [signature])
         else:
             super().__init__(version, currency, [])
-        self.pubkey = pubkey
+        self.pubkey = intern_str(pubkey)
         self.timestamp = ts
-        self.uid = uid
+        self.uid = intern_str(uid)
 
     @classmethod
     def from_inline(cls, version, currency, inline):
@@ -117,20 +117,20 @@ class Certification(Document):
     A document describing a certification.
     """
 
-    re_inline = re.compile("({certifier_regex}):({certified_regex}):({block_id_regex}):({signature_regex})\n".format(
+    re_inline = LazyPattern("({certifier_regex}):({certified_regex}):({block_id_regex}):({signature_regex})\n".format(
                                 certifier_regex=pubkey_regex,
                                 certified_regex=pubkey_regex,
                                 block_id_regex=block_id_regex,
                                 signature_regex=signature_regex
                     ))
-    re_timestamp = re.compile("META:TS:({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
-    re_type = re.compile("Type: (Certification)")
-    re_issuer = re.compile("Issuer: ({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
-    re_idty_issuer = re.compile("IdtyIssuer: ({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
-    re_idty_unique_id = re.compile("IdtyUniqueID: ({uid_regex})\n".format(uid_regex=uid_regex))
-    re_idty_timestamp = re.compile("IdtyTimestamp: ({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
-    re_idty_signature = re.compile("IdtySignature: ({signature_regex})\n".format(signature_regex=signature_regex))
-    re_cert_timestamp = re.compile("CertTimestamp: ({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
+    re_timestamp = LazyPattern("META:TS:({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
+    re_type = LazyPattern("Type: (Certification)")
+    re_issuer = LazyPattern("Issuer: ({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
+    re_idty_issuer = LazyPattern("IdtyIssuer: ({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
+    re_idty_unique_id = LazyPattern("IdtyUniqueID: ({uid_regex})\n".format(uid_regex=uid_regex))
+    re_idty_timestamp = LazyPattern("IdtyTimestamp: ({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
+    re_idty_signature = LazyPattern("IdtySignature: ({signature_regex})\n".format(signature_regex=signature_regex))
+    re_cert_timestamp = LazyPattern("CertTimestamp: ({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
 
     fields_parsers = {**Document.fields_parsers, **{
         "Type": re_type,
@@ -155,8 +155,8 @@ class Certification(Document):
         :param str signature: the signature of the document
         """
         super().__init__(version, currency, [signature])
-        self.pubkey_from = pubkey_from
-        self.pubkey_to = pubkey_to
+        self.pubkey_from = intern_str(pubkey_from)
+        self.pubkey_to = intern_str(pubkey_to)
         self.timestamp = timestamp
 
     @classmethod
@@ -252,9 +252,10 @@ CertTimestamp: {timestamp}
         Warning : current signatures will be replaced with the new ones.
         """
         self.signatures = []
+        raw = bytes(self.raw(selfcert), 'ascii')
         for key in keys:
-            signing = base64.b64encode(key.signature(bytes(self.raw(selfcert), 'ascii')))
-            logging.debug("Signature : \n{0}".format(signing.decode("ascii")))
+            signing = base64.b64encode(key.signature(raw))
+            logging.debug("Signature : \n%s", signing.decode("ascii"))
             self.signatures.append(signing.decode("ascii"))
 
     def signed_raw(self, selfcert):
@@ -272,16 +273,16 @@ class Revocation(Document):
     """
     A document describing a self-revocation.
     """
-    re_inline = re.compile("({pubkey_regex}):({signature_regex})\n".format(
+    re_inline = LazyPattern("({pubkey_regex}):({signature_regex})\n".format(
                                 pubkey_regex=pubkey_regex,
                                 signature_regex=signature_regex
                     ))
 
-    re_type = re.compile("Type: (Revocation)")
-    re_issuer = re.compile("Issuer: ({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
-    re_uniqueid = re.compile("IdtyUniqueID: ([^\n]+)\n")
-    re_timestamp = re.compile("IdtyTimestamp: ({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
-    re_idtysignature = re.compile("IdtySignature: ({signature_regex})\n".format(signature_regex=signature_regex))
+    re_type = LazyPattern("Type: (Revocation)")
+    re_issuer = LazyPattern("Issuer: ({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
+    re_uniqueid = LazyPattern("IdtyUniqueID: ([^\n]+)\n")
+    re_timestamp = LazyPattern("IdtyTimestamp: ({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
+    re_idtysignature = LazyPattern("IdtySignature: ({signature_regex})\n".format(signature_regex=signature_regex))
 
     fields_parsers = {**Document.fields_parsers, **{
         "Type": re_type,
@@ -296,7 +297,7 @@ class Revocation(Document):
         Constructor
         """
         super().__init__(version, currency, [signature])
-        self.pubkey = pubkey
+        self.pubkey = intern_str(pubkey)
 
     @classmethod
     def from_inline(cls, version, currency, inline):
@@ -399,8 +400,9 @@ IdtySignature: {signature}
         Warning : current signatures will be replaced with the new ones.
         """
         self.signatures = []
+        raw = bytes(self.raw(selfcert), 'ascii')
         for key in keys:
-            signing = base64.b64encode(key.signature(bytes(self.raw(selfcert), 'ascii')))
+            signing = base64.b64encode(key.signature(raw))
             self.signatures.append(signing.decode("ascii"))
 
     def signed_raw(self, selfcert):
@@ -1,14 +1,15 @@
 import base58
-import re
 import hashlib
 from .constants import pubkey_regex
+from .document import LazyPattern
+from ..key.base58 import Base58Encoder
 
 
 class CRCPubkey:
     """
     Class to implement a crc on a pubkey
     """
-    re_crc_pubkey = re.compile("({pubkey_regex}):([A-Za-z0-9]{{3}})".format(pubkey_regex=pubkey_regex))
+    re_crc_pubkey = LazyPattern("({pubkey_regex}):([A-Za-z0-9]{{3}})".format(pubkey_regex=pubkey_regex))
 
     def __init__(self, pubkey, crc):
         """
@@ -31,7 +32,7 @@ class CRCPubkey:
         hash_root.update(base58.b58decode(pubkey))
         hash_squared = hashlib.sha256()
         hash_squared.update(hash_root.digest())
-        b58_checksum = base58.b58encode(hash_squared.digest())
+        b58_checksum = Base58Encoder.encode(hash_squared.digest())
 
         crc = b58_checksum[:3]
         return cls(pubkey, crc)
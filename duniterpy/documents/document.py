@@ -3,6 +3,45 @@ import re
 import logging
 import hashlib
 from .constants import signature_regex
+from .interning import intern_str
+
+
+class LazyPattern:
+    """
+    A regular expression compiled on its first use.
+
+    Used as a class attribute, it replaces itself with the compiled pattern on first access.
+    Used as a value (in a dict of fields parsers for example), it exposes the methods of the compiled pattern.
+    """
+    def __init__(self, pattern, flags=0):
+        self.pattern = pattern
+        self.flags = flags
+
+    def compiled(self):
+        """
+        The compiled pattern
+
+        :rtype: _sre.SRE_Pattern
+        """
+        compiled = re.compile(self.pattern, self.flags)
+        # later lookups of the methods find them in the instance dict, without calling __getattr__
+        self.__dict__.update(match=compiled.match, fullmatch=compiled.fullmatch, search=compiled.search,
+                             findall=compiled.findall, finditer=compiled.finditer, split=compiled.split,
+                             sub=compiled.sub, groups=compiled.groups)
+        return compiled
+
+    def __getattr__(self, name):
+        if name.startswith("__") or name in ("pattern", "flags"):
+            raise AttributeError(name)
+        return getattr(self.compiled(), name)
+
+    def __get__(self, instance, owner):
+        compiled = self.compiled()
+        for cls in owner.__mro__:
+            for name, value in list(vars(cls).items()):
+                if value is self:
+                    setattr(cls, name, compiled)
+        return compiled
 
 
 class MalformedDocumentError(Exception):
@@ -14,9 +53,9 @@ class MalformedDocumentError(Exception):
 
 
 class Document:
-    re_version = re.compile("Version: ([0-9]+)\n")
-    re_currency = re.compile("Currency: ([^\n]+)\n")
-    re_signature = re.compile("({signature_regex})\n".format(signature_regex=signature_regex))
+    re_version = LazyPattern("Version: ([0-9]+)\n")
+    re_currency = LazyPattern("Currency: ([^\n]+)\n")
+    re_signature = LazyPattern("({signature_regex})\n".format(signature_regex=signature_regex))
 
     fields_parsers = {
         "Version": re_version,
@@ -42,7 +81,7 @@ class Document:
         if version < 2:
             raise MalformedDocumentError("Version 1 documents are not handled by duniterpy>0.2")
         self.version = version
-        self.currency = currency
+        self.currency = intern_str(currency)
         if signatures:
             self.signatures = [s for s in signatures if s is not None]
         else:
@@ -54,9 +93,10 @@ class Document:
         Warning : current signatures will be replaced with the new ones.
         """
         self.signatures = []
+        raw = bytes(self.raw(), 'ascii')
         for key in keys:
-            signing = base64.b64encode(key.signature(bytes(self.raw(), 'ascii')))
-            logging.debug("Signature : \n{0}".format(signing.decode("ascii")))
+            signing = base64.b64encode(key.signature(raw))
+            logging.debug("Signature : \n%s", signing.decode("ascii"))
             self.signatures.append(signing.decode("ascii"))
 
     def raw(self):
@@ -0,0 +1,96 @@
+"""
+Interning of the strings shared by many documents : pubkeys, currency names, block hashes...
+
+Documents parsed from a chain reference the same few thousand pubkeys and hashes
+millions of times. Interning them keeps a single copy of each string in memory.
+"""
+import sys
+
+_intern = sys.intern
+
+# the shared instances of the str subclasses, as the Pubkey tokens of the output conditions, by class and value
+_tokens = {}
+
+
+def intern_str(value):
+    """
+    Return the interned copy of a string.
+    Values which are not exactly of type str are returned unchanged.
+
+    :param str value: the string to intern
+    :rtype: str
+    """
+    if type(value) is str:
+        return _intern(value)
+    return value
+
+
+def intern_token(cls, value):
+    """
+    Return the shared instance of a str subclass for a value, as the Pubkey tokens
+    of the output conditions, which a plain interned str would not keep the type of.
+    A new instance is returned when the interning is disabled.
+
+    :param type cls: the str subclass
+    :param str value: the string
+    :rtype: str
+    """
+    if _intern is str:
+        return cls(value)
+    key = (cls, value)
+    token = _tokens.get(key)
+    if token is None:
+        token = _tokens[key] = cls(_intern(str(value)))
+    return token
+
+
+def enable(enabled=True):
+    """
+    Enable or disable the interning of documents strings
+
+    :param bool enabled: True to intern the strings
+    """
+    global _intern
+    _intern = sys.intern if enabled else str
+    if not enabled:
+        _tokens.clear()
+
+
+class StringTable:
+    """
+    Mapping of interned strings to integer ids, to store documents fields as integers
+    """
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def id_of(self, value):
+        """
+        Get the id of a string, registering it if it is unknown
+
+        :param str value: the string
+        :rtype: int
+        """
+        try:
+            return self.ids[value]
+        except KeyError:
+            value = intern_str(value)
+            value_id = len(self.values)
+            self.ids[value] = value_id
+            self.values.append(value)
+            return value_id
+
+    def value_of(self, value_id):
+        """
+        Get the string registered with an id
+
+        :param int value_id: the id
+        :rtype: str
+        """
+        return self.values[value_id]
+
+    def __contains__(self, value):
+        return value in self.ids
+
+    def __len__(self):
+        return len(self.values)
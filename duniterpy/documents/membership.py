@@ -3,10 +3,10 @@ Created on 2 déc. 2014
 
 @author: inso
 """
-from .document import Document, MalformedDocumentError
+from .document import Document, MalformedDocumentError, LazyPattern
 from .constants import block_uid_regex, signature_regex, pubkey_regex
+from .interning import intern_str
 
-import re
 
 
 class Membership(Document):
@@ -25,16 +25,16 @@ class Membership(Document):
     """
 
     # PUBLIC_KEY:SIGNATURE:NUMBER:HASH:TIMESTAMP:USER_ID
-    re_inline = re.compile("({pubkey_regex}):({signature_regex}):({ms_block_uid_regex}):({identity_block_uid_regex}):([^\n]+)\n"
+    re_inline = LazyPattern("({pubkey_regex}):({signature_regex}):({ms_block_uid_regex}):({identity_block_uid_regex}):([^\n]+)\n"
                                 .format(pubkey_regex=pubkey_regex, signature_regex=signature_regex,
                                         ms_block_uid_regex=block_uid_regex,
                                         identity_block_uid_regex=block_uid_regex))
-    re_type = re.compile("Type: (Membership)")
-    re_issuer = re.compile("Issuer: ({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
-    re_block = re.compile("Block: ({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
-    re_membership_type = re.compile("Membership: (IN|OUT)")
-    re_userid = re.compile("UserID: ([^\n]+)\n")
-    re_certts = re.compile("CertTS: ({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
+    re_type = LazyPattern("Type: (Membership)")
+    re_issuer = LazyPattern("Issuer: ({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
+    re_block = LazyPattern("Block: ({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
+    re_membership_type = LazyPattern("Membership: (IN|OUT)")
+    re_userid = LazyPattern("UserID: ([^\n]+)\n")
+    re_certts = LazyPattern("CertTS: ({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
 
     fields_parsers = {**Document.fields_parsers, **{
         "Type": re_type,
@@ -60,10 +60,10 @@ class Membership(Document):
         :param str|None signature: Signature of the document
         """
         super().__init__(version, currency, [signature])
-        self.issuer = issuer
+        self.issuer = intern_str(issuer)
         self.membership_ts = membership_ts
         self.membership_type = membership_type
-        self.uid = uid
+        self.uid = intern_str(uid)
         self.identity_ts = identity_ts
 
     @classmethod
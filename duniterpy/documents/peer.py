@@ -1,10 +1,13 @@
-import re
+import functools
+import socket
 
-from ..api.bma import ConnectionHandler
-from .document import Document, MalformedDocumentError
-from . import BlockUID
+from .document import Document, MalformedDocumentError, LazyPattern
+from .block import BlockUID
+from .interning import intern_str
 from .constants import block_hash_regex, pubkey_regex, ipv4_regex, ipv6_regex, ws2pid_regex, host_regex, path_regex
 
+# the conn_handler methods import duniterpy.api themselves, so that parsing peers does not load aiohttp
+
 
 class Peer(Document):
     """
@@ -23,10 +26,10 @@ class Peer(Document):
 
     """
 
-    re_type = re.compile("Type: (Peer)")
-    re_pubkey = re.compile("PublicKey: ({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
-    re_block = re.compile("Block: ([0-9]+-{block_hash_regex})\n".format(block_hash_regex=block_hash_regex))
-    re_endpoints = re.compile("(Endpoints:)\n")
+    re_type = LazyPattern("Type: (Peer)")
+    re_pubkey = LazyPattern("PublicKey: ({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
+    re_block = LazyPattern("Block: ([0-9]+-{block_hash_regex})\n".format(block_hash_regex=block_hash_regex))
+    re_endpoints = LazyPattern("(Endpoints:)\n")
 
     fields_parsers = {**Document.fields_parsers, **{
         "Type": re_type,
@@ -39,7 +42,7 @@ class Peer(Document):
                  endpoints, signature):
         super().__init__(version, currency, [signature])
 
-        self.pubkey = pubkey
+        self.pubkey = intern_str(pubkey)
         self.blockUID = blockUID
         self.endpoints = endpoints
 
@@ -75,6 +78,28 @@ class Peer(Document):
 
         return cls(version, currency, pubkey, blockUID, endpoints, signature)
 
+    @classmethod
+    def from_bma(cls, data):
+        """
+        Get the peer from the json of a BMA peering entry
+        :param dict data: json data of the peer (network/peering or a leaf value of network/peering/peers)
+        :rtype: Peer
+        """
+        signed_raw = """Version: {version}
+Type: Peer
+Currency: {currency}
+PublicKey: {pubkey}
+Block: {block}
+Endpoints:
+{endpoints}{signature}
+""".format(version=data["version"],
+           currency=data["currency"],
+           pubkey=data["pubkey"],
+           block=data.get("block", BlockUID.empty()),
+           endpoints="".join("{0}\n".format(e) for e in data["endpoints"]),
+           signature=data["signature"])
+        return cls.from_signed_raw(signed_raw)
+
     def raw(self):
         doc = """Version: {0}
 Type: Peer
@@ -94,18 +119,110 @@ def endpoint(value):
     if issubclass(type(value), Endpoint):
         return value
     elif isinstance(value, str):
-        for api, cls in MANAGED_API.items():
-            if value.startswith(api + " "):
-                return cls.from_inline(value)
-        return UnknownEndpoint.from_inline(value)
+        cls, fields = _endpoint_from_inline(value)
+        return cls(*fields)
     else:
         raise TypeError("Cannot convert {0} to endpoint".format(value))
 
 
+@functools.lru_cache(maxsize=16384)
+def _endpoint_from_inline(inline):
+    """
+    Parse an inline endpoint, dispatching on its first word.
+    Peer lists repeat the same endpoints a lot, so the parsed fields are cached
+    and a new endpoint instance is built from them on each call.
+
+    :param str inline: the inline endpoint
+    :return: the endpoint class and its constructor arguments
+    :rtype: tuple
+    """
+    api, separator, _ = inline.partition(" ")
+    cls = MANAGED_API.get(api, UnknownEndpoint) if separator else UnknownEndpoint
+    return cls, cls.parse_inline(inline)
+
+
+re_host = LazyPattern(host_regex)
+re_ipv4 = LazyPattern(ipv4_regex)
+re_path = LazyPattern(path_regex)
+re_port = LazyPattern("[0-9]+")
+re_ws2pid = LazyPattern(ws2pid_regex)
+
+
+def _fields(inline):
+    """
+    Split an inline endpoint in its fields, after the api word
+
+    :param str inline: the inline endpoint
+    :rtype: list[str]
+    """
+    if inline.endswith("\n"):
+        inline = inline[:-1]
+    return inline.split(" ")[1:]
+
+
+def _is_host(field):
+    return field != "" and re_host.fullmatch(field) is not None
+
+
+def _is_ipv4(field):
+    return re_ipv4.fullmatch(field) is not None
+
+
+def _is_ipv6(field):
+    address, percent, zone = field.partition("%")
+    if percent and not zone:
+        return False
+    try:
+        socket.inet_pton(socket.AF_INET6, address)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def _is_port(field):
+    return re_port.fullmatch(field) is not None
+
+
+def _is_path(field):
+    return re_path.fullmatch(field) is not None
+
+
+def _address(fields):
+    """
+    Assign the address fields to the optional server, ipv4 and ipv6 slots, in this order
+
+    :param list[str] fields: the address fields
+    :return: the server, ipv4 and ipv6 values, or None if a field fits in no remaining slot
+    :rtype: tuple
+    """
+    slots = [None, None, None]
+    checks = (_is_host, _is_ipv4, _is_ipv6)
+    index = 0
+    for field in fields:
+        while index < 3 and not checks[index](field):
+            index += 1
+        if index == 3:
+            return None
+        slots[index] = field
+        index += 1
+    return tuple(slots)
+
+
 class Endpoint():
     @classmethod
     def from_inline(cls, inline):
-        raise NotImplementedError("from_inline(..) is not implemented")
+        return cls(*cls.parse_inline(inline))
+
+    @classmethod
+    def parse_inline(cls, inline):
+        """
+        Parse the fields of an inline endpoint
+
+        :param str inline: the inline endpoint
+        :return: the arguments of the endpoint constructor
+        :rtype: tuple
+        """
+        raise NotImplementedError("parse_inline(..) is not implemented")
 
     def inline(self):
         raise NotImplementedError("inline() is not implemented")
@@ -122,16 +239,14 @@ class UnknownEndpoint(Endpoint):
 
     def __init__(self, api, properties):
         self.api = api
-        self.properties = properties
+        self.properties = list(properties)
 
     @classmethod
-    def from_inline(cls, inline):
-        try:
-            api = inline.split()[0]
-            properties = inline.split()[1:]
-            return cls(api, properties)
-        except IndexError:
+    def parse_inline(cls, inline):
+        fields = inline.split()
+        if not fields:
             raise MalformedDocumentError(inline)
+        return fields[0], tuple(fields[1:])
 
     def inline(self):
         doc = self.api
@@ -154,9 +269,9 @@ class UnknownEndpoint(Endpoint):
 
 class BMAEndpoint(Endpoint):
     API = "BASIC_MERKLED_API"
-    re_inline = re.compile('^BASIC_MERKLED_API(?: ({host_regex}))?(?: ({ipv4_regex}))?(?: ({ipv6_regex}))?(?: ([0-9]+))$'.format(host_regex=host_regex,
-                                                                                                                                 ipv4_regex=ipv4_regex,
-                                                                                                                                 ipv6_regex=ipv6_regex))
+    # kept for compatibility, parse_inline splits the fields instead
+    re_inline = LazyPattern('^BASIC_MERKLED_API(?: ({host_regex}))?(?: ({ipv4_regex}))?(?: ({ipv6_regex}))?(?: ([0-9]+))$'
+                            .format(host_regex=host_regex, ipv4_regex=ipv4_regex, ipv6_regex=ipv6_regex))
 
     def __init__(self, server, ipv4, ipv6, port):
         self.server = server
@@ -165,16 +280,13 @@ class BMAEndpoint(Endpoint):
         self.port = port
 
     @classmethod
-    def from_inline(cls, inline):
-        m = BMAEndpoint.re_inline.match(inline)
-        str_re = BMAEndpoint.re_inline.pattern
-        if m is None:
+    def parse_inline(cls, inline):
+        fields = _fields(inline)
+        address = _address(fields[:-1])
+        if address is None or not fields or not _is_port(fields[-1]):
             raise MalformedDocumentError(BMAEndpoint.API)
-        server = m.group(1)
-        ipv4 = m.group(2)
-        ipv6 = m.group(3)
-        port = int(m.group(4))
-        return cls(server, ipv4, ipv6, port)
+        server, ipv4, ipv6 = address
+        return server, ipv4, ipv6, int(fields[-1])
 
     def inline(self):
         return BMAEndpoint.API + "{DNS}{IPv4}{IPv6}{PORT}" \
@@ -189,6 +301,8 @@ class BMAEndpoint(Endpoint):
 
         :param aiohttp.ClientSession session: AIOHTTP client session instance
         """
+        from ..api.bma import ConnectionHandler
+
         if self.server:
             yield ConnectionHandler("http", "ws", self.server, self.port, "", proxy, session)
         elif self.ipv6:
@@ -212,28 +326,28 @@ class BMAEndpoint(Endpoint):
 
 class SecuredBMAEndpoint(BMAEndpoint):
     API = "BMAS"
-    re_inline = re.compile('^BMAS(?: ({host_regex}))?(?: ({ipv4_regex}))?(?: ({ipv6_regex}))? ([0-9]+)(?: ({path_regex}))?$'.format(host_regex=host_regex,
-                                                                                                                                   ipv4_regex=ipv4_regex,
-                                                                                                                                   ipv6_regex=ipv6_regex,
-                                                                                                                                   path_regex=path_regex))
+    # kept for compatibility, parse_inline splits the fields instead
+    re_inline = LazyPattern('^BMAS(?: ({host_regex}))?(?: ({ipv4_regex}))?(?: ({ipv6_regex}))? ([0-9]+)(?: ({path_regex}))?$'
+                            .format(host_regex=host_regex, ipv4_regex=ipv4_regex, ipv6_regex=ipv6_regex,
+                                    path_regex=path_regex))
 
     def __init__(self, server, ipv4, ipv6, port, path):
         super().__init__(server, ipv4, ipv6, port)
         self.path = path
 
     @classmethod
-    def from_inline(cls, inline):
-        m = SecuredBMAEndpoint.re_inline.match(inline)
-        if m is None:
-            raise MalformedDocumentError(SecuredBMAEndpoint.API)
-        server = m.group(1)
-        ipv4 = m.group(2)
-        ipv6 = m.group(3)
-        port = int(m.group(4))
-        path = m.group(5)
-        if not path:
-            path = ""
-        return cls(server, ipv4, ipv6, port, path)
+    def parse_inline(cls, inline):
+        fields = _fields(inline)
+        # the port is the last digits field followed by a valid path, after at most 3 address fields
+        for index in range(min(3, len(fields) - 1), -1, -1):
+            if not _is_port(fields[index]):
+                continue
+            path = " ".join(fields[index + 1:])
+            address = _address(fields[:index])
+            if address is not None and _is_path(path):
+                server, ipv4, ipv6 = address
+                return server, ipv4, ipv6, int(fields[index]), path
+        raise MalformedDocumentError(SecuredBMAEndpoint.API)
 
     def inline(self):
         inlined = [str(info) for info in (self.server, self.ipv4, self.ipv6, self.port, self.path) if info]
@@ -246,6 +360,8 @@ class SecuredBMAEndpoint(BMAEndpoint):
         :param aiohttp.ClientSession session: AIOHTTP client session instance
         :rtype: ConnectionHandler
         """
+        from ..api.bma import ConnectionHandler
+
         if self.server:
             yield ConnectionHandler("https", "wss", self.server, self.port, self.path, proxy, session)
         elif self.ipv6:
@@ -256,11 +372,10 @@ class SecuredBMAEndpoint(BMAEndpoint):
 
 class WS2PEndpoint(Endpoint):
     API = "WS2P"
-    re_inline = re.compile('^WS2P ({ws2pid_regex}) ((?:{host_regex})|(?:{ipv4_regex})) ([0-9]+)?(?: ({path_regex}))?$'.format(ws2pid_regex=ws2pid_regex,
-                                                                                                                 host_regex=host_regex,
-                                                                                                                 ipv4_regex=ipv4_regex,
-                                                                                                                 ipv6_regex=ipv6_regex,
-                                                                                                                 path_regex=path_regex))
+    # kept for compatibility, parse_inline splits the fields instead
+    re_inline = LazyPattern('^WS2P ({ws2pid_regex}) ((?:{host_regex})|(?:{ipv4_regex})) ([0-9]+)?(?: ({path_regex}))?$'
+                            .format(ws2pid_regex=ws2pid_regex, host_regex=host_regex, ipv4_regex=ipv4_regex,
+                                    path_regex=path_regex))
 
     def __init__(self, ws2pid, server, port, path):
         self.ws2pid = ws2pid
@@ -269,17 +384,15 @@ class WS2PEndpoint(Endpoint):
         self.path = path
 
     @classmethod
-    def from_inline(cls, inline):
-        m = WS2PEndpoint.re_inline.match(inline)
-        if m is None:
+    def parse_inline(cls, inline):
+        fields = _fields(inline)
+        if len(fields) < 3 or re_ws2pid.fullmatch(fields[0]) is None \
+                or not (_is_host(fields[1]) or _is_ipv4(fields[1])) or not _is_port(fields[2]):
             raise MalformedDocumentError(WS2PEndpoint.API)
-        ws2pid = m.group(1)
-        server = m.group(2)
-        port = int(m.group(3))
-        path = m.group(4)
-        if not path:
-            path = ""
-        return cls(ws2pid, server, port, path)
+        path = " ".join(fields[3:])
+        if not _is_path(path):
+            raise MalformedDocumentError(WS2PEndpoint.API)
+        return fields[0], fields[1], int(fields[2]), path
 
     def inline(self):
         inlined = [str(info) for info in (self.ws2pid, self.server, self.port, self.path) if info]
@@ -292,6 +405,8 @@ class WS2PEndpoint(Endpoint):
         :param aiohttp.ClientSession session: AIOHTTP client session instance
         :rtype: ConnectionHandler
         """
+        from ..api.bma import ConnectionHandler
+
         yield ConnectionHandler("https", "wss", self.server, self.port, self.path, proxy, session)
 
     def __str__(self):
@@ -310,22 +425,20 @@ class WS2PEndpoint(Endpoint):
 
 class ESUserEndpoint(Endpoint):
     API = "ES_USER_API"
-    re_inline = re.compile('^ES_USER_API ((?:{host_regex})|(?:{ipv4_regex})) ([0-9]+)$'.format(ws2pid_regex=ws2pid_regex,
-                                                                                             host_regex=host_regex,
-                                                                                             ipv4_regex=ipv4_regex))
+    # kept for compatibility, parse_inline splits the fields instead
+    re_inline = LazyPattern('^ES_USER_API ((?:{host_regex})|(?:{ipv4_regex})) ([0-9]+)$'
+                            .format(host_regex=host_regex, ipv4_regex=ipv4_regex))
 
     def __init__(self, server, port):
         self.server = server
         self.port = port
 
     @classmethod
-    def from_inline(cls, inline):
-        m = ESUserEndpoint.re_inline.match(inline)
-        if m is None:
+    def parse_inline(cls, inline):
+        fields = _fields(inline)
+        if len(fields) != 2 or not (_is_host(fields[0]) or _is_ipv4(fields[0])) or not _is_port(fields[1]):
             raise MalformedDocumentError(ESUserEndpoint.API)
-        server = m.group(1)
-        port = int(m.group(2))
-        return cls(server, port)
+        return fields[0], int(fields[1])
 
     def inline(self):
         inlined = [str(info) for info in (self.server, self.port) if info]
@@ -338,6 +451,8 @@ class ESUserEndpoint(Endpoint):
         :param aiohttp.ClientSession session: AIOHTTP client session instance
         :rtype: ConnectionHandler
         """
+        from ..api.bma import ConnectionHandler
+
         yield ConnectionHandler("https", "wss", self.server, self.port, "", proxy, session)
 
     def __str__(self):
@@ -355,22 +470,20 @@ class ESUserEndpoint(Endpoint):
 
 class ESSubscribtionEndpoint(Endpoint):
     API = "ES_SUBSCRIPTION_API"
-    re_inline = re.compile('^ES_SUBSCRIPTION_API ((?:{host_regex})|(?:{ipv4_regex})) ([0-9]+)$'.format(ws2pid_regex=ws2pid_regex,
-                                                                                                      host_regex=host_regex,
-                                                                                                      ipv4_regex=ipv4_regex))
+    # kept for compatibility, parse_inline splits the fields instead
+    re_inline = LazyPattern('^ES_SUBSCRIPTION_API ((?:{host_regex})|(?:{ipv4_regex})) ([0-9]+)$'
+                            .format(host_regex=host_regex, ipv4_regex=ipv4_regex))
 
     def __init__(self, server, port):
         self.server = server
         self.port = port
 
     @classmethod
-    def from_inline(cls, inline):
-        m = ESSubscribtionEndpoint.re_inline.match(inline)
-        if m is None:
+    def parse_inline(cls, inline):
+        fields = _fields(inline)
+        if len(fields) != 2 or not (_is_host(fields[0]) or _is_ipv4(fields[0])) or not _is_port(fields[1]):
             raise MalformedDocumentError(ESSubscribtionEndpoint.API)
-        server = m.group(1)
-        port = int(m.group(2))
-        return cls(server, port)
+        return fields[0], int(fields[1])
 
     def inline(self):
         inlined = [str(info) for info in (self.server, self.port) if info]
@@ -383,6 +496,8 @@ class ESSubscribtionEndpoint(Endpoint):
         :param aiohttp.ClientSession session: AIOHTTP client session instance
         :rtype: ConnectionHandler
         """
+        from ..api.bma import ConnectionHandler
+
         yield ConnectionHandler("https", "wss", self.server, self.port, "", proxy, session)
 
     def __str__(self):
@@ -0,0 +1,86 @@
+"""
+Signing of many documents at once, in a thread or process pool.
+
+The raw document of each document is rendered once, whatever the number of keys,
+and the signatures are computed by chunks::
+
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        signing.sign_documents([(certification, identity) for ...], [key], executor)
+"""
+import base64
+import concurrent.futures
+import itertools
+
+from .block import Block
+
+# signers rebuilt from their seed in a worker process, by seed
+_signers = {}
+
+
+def _signer(key):
+    """
+    The signer of a key. In a worker process, the keys are received as seeds, the signers are rebuilt once.
+
+    :param key: a SigningKey or its seed
+    :rtype: libnacl.sign.Signer
+    """
+    if not isinstance(key, bytes):
+        return key
+    signer = _signers.get(key)
+    if signer is None:
+        import libnacl.sign
+        signer = _signers[key] = libnacl.sign.Signer(key)
+    return signer
+
+
+def sign_payloads(keys, payloads):
+    """
+    Sign payloads with keys. This is the task run by the workers of the pools.
+
+    :param list keys: the SigningKey instances, or their seeds
+    :param list[bytes] payloads: the signed parts of the documents
+    :return: the base64 signatures of each payload, one per key
+    :rtype: list[list[str]]
+    """
+    signers = [_signer(key) for key in keys]
+    return [[base64.b64encode(signer.signature(payload)).decode("ascii") for signer in signers]
+            for payload in payloads]
+
+
+def _payload(document, selfcert):
+    if isinstance(document, Block):
+        raise TypeError("Blocks are signed over their inner hash and nonce, use Block.sign")
+    raw = document.raw() if selfcert is None else document.raw(selfcert)
+    return bytes(raw, 'ascii')
+
+
+def sign_documents(documents, keys, executor=None, chunk_size=256):
+    """
+    Sign documents, as their sign method does : the current signatures are replaced with the new ones.
+
+    The ed25519 primitives of libsodium release the GIL, so a thread pool signs in parallel.
+    With a process pool, the seeds of the keys are sent to the workers.
+
+    :param list documents: the documents, or (document, selfcert) pairs for the Certification
+        and Revocation documents, which need the Identity they are about
+    :param list[duniterpy.key.SigningKey] keys: the keys signing every document
+    :param concurrent.futures.Executor executor: a thread or process pool, None to sign in the calling thread
+    :param int chunk_size: the number of documents of a task of the pool
+    :return: the signed documents
+    :rtype: list[duniterpy.documents.Document]
+    """
+    items = [document if isinstance(document, tuple) else (document, None) for document in documents]
+    payloads = [_payload(document, selfcert) for document, selfcert in items]
+    keys = list(keys)
+    if executor is None:
+        signatures = sign_payloads(keys, payloads)
+    else:
+        if isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+            keys = [key.seed for key in keys]
+        chunks = [payloads[i:i + chunk_size] for i in range(0, len(payloads), chunk_size)]
+        results = executor.map(sign_payloads, itertools.repeat(keys, len(chunks)), chunks)
+        signatures = [chunk_signatures for chunk in results for chunk_signatures in chunk]
+
+    for (document, _), document_signatures in zip(items, signatures):
+        document.signatures = document_signatures
+    return [document for document, _ in items]
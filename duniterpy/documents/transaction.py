@@ -1,8 +1,6 @@
-from .document import Document, MalformedDocumentError
+from .document import Document, MalformedDocumentError, LazyPattern
 from .constants import pubkey_regex, transaction_hash_regex, block_id_regex, block_uid_regex, conditions_regex
-from ..grammars import output
-import pypeg2
-import re
+from .interning import intern_str, intern_token
 
 
 def reduce_base(amount, base):
@@ -16,14 +14,13 @@ def reduce_base(amount, base):
     if amount == 0:
         return 0, 0
 
-    next_amount = amount
-    next_base = base
-    while int(next_amount) == next_amount:
-        amount = next_amount
-        base = next_base
-        next_amount /= 10
-        next_base += 1
-    return int(amount), int(base)
+    # exact integer arithmetic : floats lose the units of amounts above 2**53
+    amount = int(amount)
+    base = int(base)
+    while amount % 10 == 0:
+        amount //= 10
+        base += 1
+    return amount, base
 
 
 class Transaction(Document):
@@ -61,18 +58,18 @@ class Transaction(Document):
 
     """
 
-    re_type = re.compile("Type: (Transaction)\n")
-    re_header = re.compile("TX:([0-9]+):([0-9]+):([0-9]+):([0-9]+):([0-9]+):(0|1):([0-9]+)\n")
-    re_compact_blockstamp = re.compile("({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
-    re_blockstamp = re.compile("Blockstamp: ({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
-    re_locktime = re.compile("Locktime: ([0-9]+)\n")
-    re_issuers = re.compile("Issuers:\n")
-    re_inputs = re.compile("Inputs:\n")
-    re_unlocks = re.compile("Unlocks:\n")
-    re_outputs = re.compile("Outputs:\n")
-    re_compact_comment = re.compile("([^\n]+)\n")
-    re_comment = re.compile("Comment: ([^\n]*)\n")
-    re_pubkey = re.compile("({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
+    re_type = LazyPattern("Type: (Transaction)\n")
+    re_header = LazyPattern("TX:([0-9]+):([0-9]+):([0-9]+):([0-9]+):([0-9]+):(0|1):([0-9]+)\n")
+    re_compact_blockstamp = LazyPattern("({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
+    re_blockstamp = LazyPattern("Blockstamp: ({block_uid_regex})\n".format(block_uid_regex=block_uid_regex))
+    re_locktime = LazyPattern("Locktime: ([0-9]+)\n")
+    re_issuers = LazyPattern("Issuers:\n")
+    re_inputs = LazyPattern("Inputs:\n")
+    re_unlocks = LazyPattern("Unlocks:\n")
+    re_outputs = LazyPattern("Outputs:\n")
+    re_compact_comment = LazyPattern("([^\n]+)\n")
+    re_comment = LazyPattern("Comment: ([^\n]*)\n")
+    re_pubkey = LazyPattern("({pubkey_regex})\n".format(pubkey_regex=pubkey_regex))
 
     fields_parsers = {**Document.fields_parsers, **{
             "Type": re_type,
@@ -108,124 +105,112 @@ class Transaction(Document):
         super().__init__(version, currency, signatures)
         self.blockstamp = blockstamp
         self.locktime = locktime
-        self.issuers = issuers
+        self.issuers = [intern_str(i) for i in issuers]
         self.inputs = inputs
         self.unlocks = unlocks
         self.outputs = outputs
         self.comment = comment
 
     @classmethod
-    def from_bma_history(cls, currency, tx_data):
+    def from_bma_history(cls, currency, tx_data, lazy_conditions=False):
         """
-        Get the transaction from json
+        Get the transaction from json.
+        The inputs, unlocks and outputs are built directly from their inline json values.
+
         :param str currency: the currency of the tx
         :param dict tx_data: json data of the transaction
+        :param bool lazy_conditions: parse the conditions of the outputs on first access
         :rtype: Transaction
         """
-        tx_data = tx_data.copy()
-        tx_data["currency"] = currency
-        for data_list in ('issuers', 'outputs', 'inputs', 'unlocks', 'signatures'):
-            tx_data['multiline_{0}'.format(data_list)] = '\n'.join(tx_data[data_list])
-        if tx_data["version"] >= 3:
-                signed_raw = """Version: {version}
-Type: Transaction
-Currency: {currency}
-Blockstamp: {blockstamp}
-Locktime: {locktime}
-Issuers:
-{multiline_issuers}
-Inputs:
-{multiline_inputs}
-Unlocks:
-{multiline_unlocks}
-Outputs:
-{multiline_outputs}
-Comment: {comment}
-{multiline_signatures}
-""".format(**tx_data)
+        from .block import BlockUID
+        version = tx_data["version"]
+        if version >= 3:
+            blockstamp = BlockUID.from_str(tx_data["blockstamp"])
         else:
-            signed_raw = """Version: {version}
-Type: Transaction
-Currency: {currency}
-Locktime: {locktime}
-Issuers:
-{multiline_issuers}
-Inputs:
-{multiline_inputs}
-Unlocks:
-{multiline_unlocks}
-Outputs:
-{multiline_outputs}
-Comment: {comment}
-{multiline_signatures}
-""".format(**tx_data)
-        return Transaction.from_signed_raw(signed_raw)
+            blockstamp = None
+        # the inline parsers expect the line ending of the documents
+        inputs = [InputSource.from_inline(version, i + "\n") for i in tx_data["inputs"]]
+        unlocks = [Unlock.from_inline(u + "\n") for u in tx_data["unlocks"]]
+        outputs = [OutputSource.from_inline(o + "\n", lazy_conditions) for o in tx_data["outputs"]]
+        return cls(version, currency, blockstamp, tx_data["locktime"], tx_data["issuers"], inputs, unlocks, outputs,
+                   tx_data["comment"], list(tx_data["signatures"]))
 
     @classmethod
     def from_compact(cls, currency, compact):
-        from .block import BlockUID
         lines = compact.splitlines(True)
-        n = 0
+        return cls.from_compact_lines(currency, lines, 0, len(lines))[0]
 
-        header_data = Transaction.re_header.match(lines[n])
+    @classmethod
+    def from_compact_lines(cls, currency, lines, start=0, end=None):
+        """
+        Parse a compact transaction in a list of lines, as the lines of a block, without copying them
+
+        :param str currency: the currency of the transaction
+        :param list[str] lines: the lines, with their line ending
+        :param int start: the index of the header line of the transaction
+        :param int end: the index of the line following the transaction,
+            None to read one signature per issuer
+        :return: the transaction and the index of the line following it
+        :rtype: tuple[Transaction, int]
+        """
+        from .block import BlockUID
+        header_data = Transaction.re_header.match(lines[start])
         if header_data is None:
             raise MalformedDocumentError("Compact TX header")
-        version = int(header_data.group(1))
-        issuers_num = int(header_data.group(2))
-        inputs_num = int(header_data.group(3))
-        unlocks_num = int(header_data.group(4))
-        outputs_num = int(header_data.group(5))
-        has_comment = int(header_data.group(6))
-        locktime = int(header_data.group(7))
-        n += 1
+        version, issuers_num, inputs_num, unlocks_num, outputs_num, has_comment, locktime = \
+            [int(value) for value in header_data.groups()]
+        n = start + 1
+        documents_end = n + (1 if version >= 3 else 0) + issuers_num + inputs_num + unlocks_num + outputs_num \
+            + has_comment
+        if end is None:
+            end = documents_end + issuers_num
+        if documents_end > end or end > len(lines):
+            raise MalformedDocumentError("Compact TX lines")
 
         if version >= 3:
-            blockstamp = BlockUID.from_str(Transaction.parse_field("CompactBlockstamp", lines[n]))
+            data = Transaction.re_compact_blockstamp.match(lines[n])
+            if data is None:
+                raise MalformedDocumentError("CompactBlockstamp")
+            blockstamp = BlockUID.from_str(data.group(1))
             n += 1
         else:
             blockstamp = None
 
         issuers = []
-        inputs = []
-        unlocks = []
-        outputs = []
-        signatures = []
-        for i in range(0, issuers_num):
-            issuer = Transaction.parse_field("Pubkey", lines[n])
-            issuers.append(issuer)
-            n += 1
-
-        for i in range(0, inputs_num):
-            input_source = InputSource.from_inline(version, lines[n])
-            inputs.append(input_source)
-            n += 1
-
-        for i in range(0, unlocks_num):
-            unlock = Unlock.from_inline(lines[n])
-            unlocks.append(unlock)
-            n += 1
+        match_pubkey = Transaction.re_pubkey.match
+        for i in range(n, n + issuers_num):
+            data = match_pubkey(lines[i])
+            if data is None:
+                raise MalformedDocumentError("Pubkey")
+            issuers.append(data.group(1))
+        n += issuers_num
 
-        for i in range(0, outputs_num):
-            output_source = OutputSource.from_inline(lines[n])
-            outputs.append(output_source)
-            n += 1
+        inputs = [InputSource.from_inline(version, lines[i]) for i in range(n, n + inputs_num)]
+        n += inputs_num
+        unlocks = [Unlock.from_inline(lines[i]) for i in range(n, n + unlocks_num)]
+        n += unlocks_num
+        outputs = [OutputSource.from_inline(lines[i]) for i in range(n, n + outputs_num)]
+        n += outputs_num
 
         comment = ""
         if has_comment == 1:
-            if Transaction.re_compact_comment.match(lines[n]):
-                comment = Transaction.re_compact_comment.match(lines[n]).group(1)
-                n += 1
-            else:
+            data = Transaction.re_compact_comment.match(lines[n])
+            if data is None:
                 raise MalformedDocumentError("Compact TX Comment")
+            comment = data.group(1)
+            n += 1
 
-        while n < len(lines):
-            if Transaction.re_signature.match(lines[n]):
-                signatures.append(Transaction.re_signature.match(lines[n]).group(1))
-                n += 1
-            else:
+        signatures = []
+        match_signature = Transaction.re_signature.match
+        for i in range(n, end):
+            data = match_signature(lines[i])
+            if data is None:
                 raise MalformedDocumentError("Compact TX Signatures")
+            signatures.append(data.group(1))
 
-        return cls(version, currency, blockstamp, locktime, issuers, inputs, unlocks, outputs, comment, signatures)
+        transaction = cls(version, currency, blockstamp, locktime, issuers, inputs, unlocks, outputs, comment,
+                          signatures)
+        return transaction, end
 
     @classmethod
     def from_signed_raw(cls, raw):
@@ -393,6 +378,8 @@ class SimpleTransaction(Transaction):
         :param duniterpy.documents.Transaction tx: the transaction to check
         :return: True if a simple transaction
         """
+        from ..grammars import output
+
         simple = True
         if len(tx.issuers) != 1:
             simple = False
@@ -421,11 +408,11 @@ class InputSource:
     INDEX:SOURCE:FINGERPRINT:AMOUNT
 
     """
-    re_inline = re.compile("(?:(?:(D):({pubkey_regex}):({block_id_regex}))|(?:(T):({transaction_hash_regex}):([0-9]+)))\n"
+    re_inline = LazyPattern("(?:(?:(D):({pubkey_regex}):({block_id_regex}))|(?:(T):({transaction_hash_regex}):([0-9]+)))\n"
                            .format(pubkey_regex=pubkey_regex,
                                    block_id_regex=block_id_regex,
                                     transaction_hash_regex=transaction_hash_regex))
-    re_inline_v3 = re.compile("([0-9]+):([0-9]+):(?:(?:(D):({pubkey_regex}):({block_id_regex}))|(?:(T):({transaction_hash_regex}):([0-9]+)))\n"
+    re_inline_v3 = LazyPattern("([0-9]+):([0-9]+):(?:(?:(D):({pubkey_regex}):({block_id_regex}))|(?:(T):({transaction_hash_regex}):([0-9]+)))\n"
                            .format(pubkey_regex=pubkey_regex,
                                    block_id_regex=block_id_regex,
                                     transaction_hash_regex=transaction_hash_regex))
@@ -444,7 +431,8 @@ class InputSource:
         self.amount = amount
         self.base = base
         self.source = source
-        self.origin_id = origin_id
+        # dividends sources are identified by the pubkey of the member
+        self.origin_id = intern_str(origin_id) if source == "D" else origin_id
         self.index = index
 
     @classmethod
@@ -507,7 +495,7 @@ class SIGParameter:
     """
     A Transaction UNLOCK SIG parameter
     """
-    re_sig = re.compile("SIG\(([0-9]+)\)")
+    re_sig = LazyPattern("SIG\(([0-9]+)\)")
 
     def __init__(self, index):
         self.index = index
@@ -528,7 +516,7 @@ class XHXParameter:
     """
     A Transaction UNLOCK XHX parameter
     """
-    re_xhx = re.compile("XHX\(([0-9]+)\)")
+    re_xhx = LazyPattern("XHX\(([0-9]+)\)")
 
     def __init__(self, integer):
         self.integer = integer
@@ -552,7 +540,7 @@ class Unlock:
     """
     A Transaction UNLOCK
     """
-    re_inline = re.compile("([0-9]+):((?:SIG\([0-9]+\)|XHX\([0-9]+\)|\s)+)\n")
+    re_inline = LazyPattern("([0-9]+):((?:SIG\([0-9]+\)|XHX\([0-9]+\)|\s)+)\n")
 
     def __init__(self, index, parameters):
         self.index = index
@@ -580,33 +568,102 @@ class OutputSource:
     """
     A Transaction OUTPUT
     """
-    re_inline = re.compile("([0-9]+):([0-9]+):(.*)\n")
+    re_inline = LazyPattern("([0-9]+):([0-9]+):(.*)\n")
 
     def __init__(self, amount, base, conditions):
         self.amount = amount
         self.base = base
         self.conditions = conditions
 
+    @property
+    def conditions(self):
+        """
+        The conditions of the output, parsed on first access if the output was read lazily
+
+        :rtype: duniterpy.grammars.output.Condition|str
+        """
+        if self._conditions_text is not None:
+            self._conditions = _parse_conditions(self._conditions_text)
+            self._conditions_text = None
+        return self._conditions
+
+    @conditions.setter
+    def conditions(self, conditions):
+        self._conditions = conditions
+        self._conditions_text = None
+
     @classmethod
-    def from_inline(cls, inline):
+    def from_inline(cls, inline, lazy=False):
+        """
+        Parse an inline output
+
+        :param str inline: the inline output, with its line ending
+        :param bool lazy: parse the conditions on first access
+        :rtype: OutputSource
+        """
         data = OutputSource.re_inline.match(inline)
         if data is None:
             raise MalformedDocumentError("Inline output")
         amount = int(data.group(1))
         base = int(data.group(2))
         conditions_text = data.group(3)
-        try:
-            conditions = pypeg2.parse(conditions_text, output.Condition)
-        except SyntaxError:
-            # Invalid conditions are possible, see https://github.com/duniter/duniter/issues/1156
-            # In such a case, they are store "as-is" and considered unlockable
-            conditions = conditions_text
-        return cls(amount, base, conditions)
+        if lazy:
+            output_source = cls(amount, base, None)
+            output_source._conditions_text = conditions_text
+            return output_source
+        return cls(amount, base, _parse_conditions(conditions_text))
 
     def inline(self):
-        if type(self.conditions) is str:
+        if self._conditions_text is not None:
+            return "{0}:{1}:{2}".format(self.amount, self.base, self._conditions_text)
+        elif type(self.conditions) is str:
             return "{0}:{1}:{2}".format(self.amount, self.base, self.conditions)
         else:
+            import pypeg2
+            from ..grammars import output
+
             return "{0}:{1}:{2}".format(self.amount, self.base,
                                         pypeg2.compose(self.conditions, output.Condition))
 
+
+_re_sig_condition = LazyPattern("SIG\\(({pubkey_regex})\\)".format(pubkey_regex=pubkey_regex))
+
+
+def _parse_conditions(conditions_text):
+    """
+    Parse the conditions of an output
+
+    :param str conditions_text: the conditions
+    :rtype: duniterpy.grammars.output.Condition|str
+    """
+    # pypeg2 and the grammar are only loaded when conditions are parsed
+    import pypeg2
+    from ..grammars import output
+
+    # most outputs are a single SIG condition, built without the pypeg2 parser
+    data = _re_sig_condition.fullmatch(conditions_text)
+    if data is not None:
+        return output.Condition.token(output.SIG.token(intern_token(output.Pubkey, data.group(1))))
+    try:
+        conditions = pypeg2.parse(conditions_text, output.Condition)
+        _intern_conditions(conditions)
+    except SyntaxError:
+        # Invalid conditions are possible, see https://github.com/duniter/duniter/issues/1156
+        # In such a case, they are store "as-is" and considered unlockable
+        conditions = conditions_text
+    return conditions
+
+
+def _intern_conditions(condition):
+    """
+    Intern the pubkeys of the SIG functions of an output condition, as shared Pubkey tokens
+
+    :param duniterpy.grammars.output.Condition condition: the parsed condition
+    """
+    from ..grammars import output
+
+    for side in (getattr(condition, 'left', None), getattr(condition, 'right', None)):
+        if type(side) is output.Condition:
+            _intern_conditions(side)
+        elif type(side) is output.SIG:
+            side.pubkey = intern_token(output.Pubkey, str(side.pubkey))
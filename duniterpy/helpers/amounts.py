@@ -0,0 +1,135 @@
+"""
+Exact arithmetic on arrays of amounts in mixed bases, as the sources of a wallet.
+
+An amount of a base is worth ``amount * 10 ** base`` units.
+NumPy is used when it is installed (``pip install duniterpy[numpy]``) and the values fit in 64 bits integers,
+pure python integers otherwise. The results are the same in both cases.
+"""
+from ..documents.transaction import reduce_base
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_INT64_MAX = 2 ** 63 - 1
+
+
+def _int64_array(values):
+    """
+    The values as an array of 64 bits integers, None if numpy is missing or a value does not fit
+
+    :rtype: numpy.ndarray|None
+    """
+    if numpy is None:
+        return None
+    try:
+        return numpy.asarray(values, dtype=numpy.int64)
+    except (OverflowError, TypeError, ValueError):
+        return None
+
+
+def _max_abs(array):
+    return int(numpy.abs(array).max()) if len(array) else 0
+
+
+def reduce_bases(amounts, bases):
+    """
+    Reduce the base of each amount, as reduce_base does
+
+    :param list[int] amounts: the amounts
+    :param list[int] bases: the bases of the amounts
+    :return: the reduced amounts and bases, as numpy arrays if numpy is used, as lists otherwise
+    :rtype: tuple
+    """
+    if len(amounts) != len(bases):
+        raise ValueError("As many bases as amounts are needed")
+    amounts_array = _int64_array(amounts)
+    bases_array = _int64_array(bases)
+    if amounts_array is None or bases_array is None:
+        reduced = [reduce_base(amount, base) for amount, base in zip(amounts, bases)]
+        return [amount for amount, _ in reduced], [base for _, base in reduced]
+
+    amounts_array = amounts_array.copy()
+    bases_array = bases_array.copy()
+    zero = amounts_array == 0
+    bases_array[zero] = 0
+    divisible = (amounts_array % 10 == 0) & ~zero
+    while divisible.any():
+        amounts_array[divisible] //= 10
+        bases_array[divisible] += 1
+        divisible &= amounts_array % 10 == 0
+    return amounts_array, bases_array
+
+
+def normalize(amounts, bases, base=None):
+    """
+    Express amounts of mixed bases in a single base
+
+    :param list[int] amounts: the amounts
+    :param list[int] bases: the bases of the amounts
+    :param int base: the common base, the lowest base of the amounts by default.
+        It can not be above the lowest base, the amounts would lose units.
+    :return: the amounts in the common base, as a numpy array if numpy is used, as a list otherwise,
+        and the common base
+    :rtype: tuple
+    """
+    if len(amounts) != len(bases):
+        raise ValueError("As many bases as amounts are needed")
+    if not len(bases):
+        return [], 0 if base is None else base
+    lowest = int(min(bases))
+    if base is None:
+        base = lowest
+    elif base > lowest:
+        raise ValueError("Amounts of base {0} can not be expressed in base {1}".format(lowest, base))
+
+    amounts_array = _int64_array(amounts)
+    bases_array = _int64_array(bases)
+    if amounts_array is not None and bases_array is not None:
+        shifts = bases_array - base
+        max_shift = int(shifts.max())
+        # 10 ** 18 is the highest power of 10 of 64 bits integers
+        if max_shift <= 18 and _max_abs(amounts_array) * 10 ** max_shift <= _INT64_MAX:
+            return amounts_array * numpy.power(10, shifts, dtype=numpy.int64), base
+    return [int(amount) * 10 ** (int(amount_base) - base) for amount, amount_base in zip(amounts, bases)], base
+
+
+def total(amounts, bases):
+    """
+    The exact sum of amounts of mixed bases
+
+    :param list[int] amounts: the amounts
+    :param list[int] bases: the bases of the amounts
+    :return: the reduced (amount, base) of the sum
+    :rtype: tuple[int, int]
+    """
+    normalized, base = normalize(amounts, bases)
+    if numpy is not None and isinstance(normalized, numpy.ndarray):
+        if _max_abs(normalized) * len(normalized) <= _INT64_MAX:
+            return reduce_base(int(normalized.sum()), base)
+        normalized = [int(amount) for amount in normalized]
+    return reduce_base(sum(normalized), base)
+
+
+def compare(amounts, bases, other_amounts, other_bases):
+    """
+    Compare two arrays of amounts of mixed bases, pair by pair
+
+    :param list[int] amounts: the amounts
+    :param list[int] bases: the bases of the amounts
+    :param list[int] other_amounts: the amounts to compare with
+    :param list[int] other_bases: the bases of the amounts to compare with
+    :return: -1, 0 or 1 for each pair, as numpy array if numpy is used, as a list otherwise
+    """
+    if len(amounts) != len(other_amounts):
+        raise ValueError("As many amounts are needed on both sides")
+    if not len(amounts):
+        return []
+    base = min(int(min(bases)), int(min(other_bases)))
+    left, _ = normalize(amounts, bases, base)
+    right, _ = normalize(other_amounts, other_bases, base)
+    if numpy is not None and isinstance(left, numpy.ndarray) and isinstance(right, numpy.ndarray):
+        # the difference of two int64 values may overflow, their comparison never does
+        return (left > right).astype(numpy.int8) - (left < right).astype(numpy.int8)
+    return [(int(a) > int(b)) - (int(a) < int(b)) for a, b in zip(left, right)]
@@ -0,0 +1,321 @@
+"""
+Columnar analytics of accounts and of the money : balance curves, income per period,
+amounts relative to the universal dividend and monetary mass.
+
+The answers of ud.history and tx.history and the parsed blocks are converted to columns of integers,
+in units (``amount * 10 ** base``). The columns are numpy arrays when NumPy is installed and the values fit
+in 64 bits integers, lists otherwise ; the aggregations give the same results with both.
+"""
+import bisect
+import itertools
+
+from .amounts import normalize
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+_INT64_MAX = 2 ** 63 - 1
+
+
+def _is_array(values):
+    return numpy is not None and isinstance(values, numpy.ndarray)
+
+
+def _sum_fits(values):
+    """
+    True if any sum of the values of an array fits in 64 bits integers
+    """
+    return not len(values) or int(numpy.abs(values).max()) * len(values) <= _INT64_MAX
+
+
+def _integers(values):
+    """
+    A column of integers : a numpy array when possible, a list otherwise
+    """
+    if numpy is not None:
+        try:
+            return numpy.asarray(values, dtype=numpy.int64)
+        except OverflowError:
+            pass
+    return list(values)
+
+
+def _take(values, order):
+    if _is_array(values):
+        return values[order]
+    return [values[index] for index in order]
+
+
+def cumulative(values):
+    """
+    Running total of a column
+
+    :param values: the column
+    :return: the column of the running totals
+    """
+    if _is_array(values) and _sum_fits(values):
+        return numpy.cumsum(values)
+    return list(itertools.accumulate(int(value) for value in values))
+
+
+def per_period(times, values, period, start=None):
+    """
+    Totals of the values of each period
+
+    :param times: the column of the times of the values, sorted
+    :param values: the column of the values
+    :param int period: the duration of a period in seconds
+    :param int start: the start time of the first period, the first time by default
+    :return: the start times of the periods and the totals of the periods, empty periods included
+    :rtype: tuple
+    """
+    if not len(times):
+        return _integers([]), _integers([])
+    if start is None:
+        start = int(times[0])
+    if _is_array(times) and _is_array(values) and _sum_fits(values):
+        indexes = (times - start) // period
+        if len(indexes) and indexes.min() < 0:
+            raise ValueError("Values before the start of the first period")
+        totals = numpy.zeros(int(indexes.max()) + 1, dtype=numpy.int64)
+        numpy.add.at(totals, indexes, values)
+        return start + period * numpy.arange(len(totals), dtype=numpy.int64), totals
+    indexes = [(int(time) - start) // period for time in times]
+    if min(indexes) < 0:
+        raise ValueError("Values before the start of the first period")
+    totals = [0] * (max(indexes) + 1)
+    for index, value in zip(indexes, values):
+        totals[index] += int(value)
+    return [start + period * index for index in range(len(totals))], totals
+
+
+class Movements:
+    """
+    Amounts received (positive) and spent (negative) by an account, sorted by time
+    """
+    def __init__(self, times, block_numbers, amounts):
+        """
+        :param list[int] times: the times of the movements
+        :param list[int] block_numbers: the numbers of the blocks of the movements
+        :param list[int] amounts: the signed amounts of the movements, in units
+        """
+        times = _integers(times)
+        block_numbers = _integers(block_numbers)
+        amounts = _integers(amounts)
+        if _is_array(times):
+            order = numpy.argsort(times, kind="stable")
+        else:
+            order = sorted(range(len(times)), key=times.__getitem__)
+        self.times = _take(times, order)
+        self.block_numbers = _take(block_numbers, order)
+        self.amounts = _take(amounts, order)
+
+    def __len__(self):
+        return len(self.times)
+
+    @classmethod
+    def from_ud_history(cls, data):
+        """
+        The universal dividends of a member
+
+        :param dict data: the answer of ud.history
+        :rtype: Movements
+        """
+        history = data["history"]["history"]
+        amounts, _ = normalize([ud["amount"] for ud in history], [ud["base"] for ud in history], 0)
+        return cls([ud["time"] for ud in history], [ud["block_number"] for ud in history], amounts)
+
+    @classmethod
+    def from_tx_history(cls, data, pubkey=None):
+        """
+        The written transactions of an account : the outputs locked by SIG(pubkey) are received,
+        the inputs of the transactions issued by the pubkey are spent.
+
+        The inputs of a transaction with several issuers can not all be attributed from the json :
+        only the dividends of the pubkey (D sources) are counted as spent by it.
+
+        :param dict data: the answer of tx.history
+        :param str pubkey: the pubkey of the account, the pubkey of the answer by default
+        :rtype: Movements
+        """
+        pubkey = pubkey or data["pubkey"]
+        condition = "SIG({0})".format(pubkey)
+        dividend_source = "D:{0}:".format(pubkey)
+        times = []
+        block_numbers = []
+        amounts = []
+        bases = []
+        seen = set()
+        # a transaction sent to its own issuer is both in sent and in received
+        for tx in itertools.chain(data["history"]["sent"], data["history"]["received"]):
+            if tx["hash"] in seen:
+                continue
+            seen.add(tx["hash"])
+            movement = []
+            for output in tx["outputs"]:
+                amount, base, output_condition = output.split(":", 2)
+                if output_condition == condition:
+                    movement.append((int(amount), int(base)))
+            if pubkey in tx["issuers"]:
+                single_issuer = len(tx["issuers"]) == 1
+                for input_source in tx["inputs"]:
+                    amount, base, source = input_source.split(":", 2)
+                    if single_issuer or source.startswith(dividend_source):
+                        movement.append((-int(amount), int(base)))
+            for amount, base in movement:
+                times.append(tx["time"])
+                block_numbers.append(tx["block_number"])
+                amounts.append(amount)
+                bases.append(base)
+        normalized, _ = normalize(amounts, bases, 0)
+        return cls(times, block_numbers, normalized)
+
+    @classmethod
+    def merge(cls, *movements):
+        """
+        All the movements of several series, sorted by time
+
+        :param Movements movements: the series
+        :rtype: Movements
+        """
+        def column(name):
+            values = [getattr(m, name) for m in movements]
+            if values and all(_is_array(v) for v in values):
+                return numpy.concatenate(values)
+            return [int(value) for v in values for value in v]
+
+        return cls(column("times"), column("block_numbers"), column("amounts"))
+
+    def balance(self):
+        """
+        The balance after each movement
+
+        :return: the column of the balances, in units
+        """
+        return cumulative(self.amounts)
+
+    def income(self, period, start=None):
+        """
+        The amounts received in each period
+
+        :param int period: the duration of a period in seconds
+        :param int start: the start time of the first period, the first movement time by default
+        :return: the start times of the periods and the amounts received
+        :rtype: tuple
+        """
+        if _is_array(self.amounts):
+            received = numpy.where(self.amounts > 0, self.amounts, 0)
+        else:
+            received = [max(amount, 0) for amount in self.amounts]
+        return per_period(self.times, received, period, start)
+
+    def spending(self, period, start=None):
+        """
+        The amounts spent in each period, as positive amounts
+
+        :param int period: the duration of a period in seconds
+        :param int start: the start time of the first period, the first movement time by default
+        :return: the start times of the periods and the amounts spent
+        :rtype: tuple
+        """
+        if _is_array(self.amounts):
+            spent = numpy.where(self.amounts < 0, -self.amounts, 0)
+        else:
+            spent = [max(-amount, 0) for amount in self.amounts]
+        return per_period(self.times, spent, period, start)
+
+
+class BlockSeries:
+    """
+    The universal dividends, members counts and monetary mass of a segment of the chain
+    """
+    def __init__(self, numbers, times, dividends, members_counts):
+        """
+        :param list[int] numbers: the numbers of the blocks, sorted
+        :param list[int] times: the median times of the blocks
+        :param list[int] dividends: the universal dividends of the blocks in units, 0 if none
+        :param list[int] members_counts: the members counts of the blocks
+        """
+        self.numbers = _integers(numbers)
+        self.times = _integers(times)
+        self.dividends = _integers(dividends)
+        self.members_counts = _integers(members_counts)
+
+    def __len__(self):
+        return len(self.numbers)
+
+    @classmethod
+    def from_blocks(cls, blocks):
+        """
+        :param list[duniterpy.documents.Block] blocks: the blocks, sorted by number
+        :rtype: BlockSeries
+        """
+        dividends, _ = normalize([block.ud or 0 for block in blocks],
+                                 [block.unit_base if block.ud else 0 for block in blocks], 0)
+        return cls([block.number for block in blocks], [block.mediantime for block in blocks], dividends,
+                   [block.members_count for block in blocks])
+
+    def dividend_blocks(self):
+        """
+        The times and amounts of the universal dividends of the segment
+
+        :return: the times and the dividends, in units
+        :rtype: tuple
+        """
+        if _is_array(self.dividends):
+            mask = self.dividends > 0
+            return self.times[mask], self.dividends[mask]
+        indexes = [i for i, dividend in enumerate(self.dividends) if dividend]
+        return [self.times[i] for i in indexes], [self.dividends[i] for i in indexes]
+
+    def monetary_mass(self, initial=0):
+        """
+        The monetary mass after each block : each dividend creates one dividend per member
+
+        :param int initial: the monetary mass before the first block, in units
+        :return: the column of the monetary mass, in units
+        """
+        if _is_array(self.dividends) and _is_array(self.members_counts) \
+                and int(self.dividends.max(initial=0)) * int(self.members_counts.max(initial=0)) <= _INT64_MAX:
+            created = self.dividends * self.members_counts
+        else:
+            created = [int(d) * int(n) for d, n in zip(self.dividends, self.members_counts)]
+        mass = cumulative(created)
+        return mass + initial if _is_array(mass) else [value + initial for value in mass]
+
+    def dividend_at(self, times):
+        """
+        The universal dividend of reference at given times : the last one created at or before each time
+
+        :param times: the column of times
+        :return: the column of the dividends in units, 0 before the first dividend
+        """
+        ud_times, uds = self.dividend_blocks()
+        if _is_array(ud_times):
+            indexes = numpy.searchsorted(ud_times, numpy.asarray(times, dtype=numpy.int64), side="right") - 1
+            # the index -1, before the first dividend, takes the appended 0
+            return numpy.append(uds, 0)[indexes]
+        ud_times = [int(t) for t in ud_times]
+        result = []
+        for time in times:
+            index = bisect.bisect_right(ud_times, int(time)) - 1
+            result.append(int(uds[index]) if index >= 0 else 0)
+        return result
+
+    def relative(self, times, amounts):
+        """
+        Amounts expressed in universal dividends of their time
+
+        :param times: the column of the times of the amounts
+        :param amounts: the column of the amounts, in units
+        :return: the column of the relative amounts, as floats, nan before the first dividend
+        """
+        dividends = self.dividend_at(times)
+        if _is_array(dividends):
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                return numpy.where(dividends > 0, numpy.asarray(amounts, dtype=numpy.float64) /
+                                   numpy.where(dividends > 0, dividends, 1), numpy.nan)
+        return [int(amount) / dividend if dividend else float("nan") for amount, dividend in zip(amounts, dividends)]
@@ -0,0 +1,198 @@
+"""
+Peer discovery crawler over the network.peers Merkle tree
+"""
+import asyncio
+import logging
+import time
+
+import aiohttp
+import jsonschema
+
+from ..api.bma import network, node, blockchain
+from ..api.errors import DuniterError
+from ..documents import BlockUID, BMAEndpoint, MalformedDocumentError, Peer
+
+logger = logging.getLogger("duniter/crawler")
+
+# Errors caught when a node is unreachable or answers garbage
+NODE_ERRORS = (asyncio.TimeoutError, aiohttp.ClientError, OSError, ValueError,
+               DuniterError, jsonschema.ValidationError)
+
+
+class NodeInfo:
+    """
+    The state of a node endpoint, as probed by the crawler
+    """
+    def __init__(self, peer, endpoint):
+        """
+        :param duniterpy.documents.Peer peer: the peer document of the node
+        :param duniterpy.documents.BMAEndpoint endpoint: the probed endpoint
+        """
+        self.peer = peer
+        self.endpoint = endpoint
+        self.software = None
+        self.version = None
+        self.current = None
+        self.latency = None
+        self.error = None
+
+    @property
+    def pubkey(self):
+        return self.peer.pubkey
+
+    @property
+    def reachable(self):
+        return self.error is None and self.current is not None
+
+    def __str__(self):
+        if self.reachable:
+            return "{0} {1} {2}/{3} {4} {5:.0f}ms".format(self.pubkey[:8], self.endpoint, self.software,
+                                                          self.version, self.current, self.latency * 1000)
+        else:
+            return "{0} {1} unreachable ({2})".format(self.pubkey[:8], self.endpoint, self.error)
+
+
+async def leaves(connection):
+    """
+    Get the hashes of the leaves of the peers Merkle tree
+
+    :param duniterpy.api.bma.ConnectionHandler connection: Connection handler instance
+    :rtype: list[str]
+    """
+    data = await network.peers(connection, leaves=True)
+    return data.get("leaves", [])
+
+
+async def leaf(connection, leaf_hash):
+    """
+    Get the peer document stored in a leaf of the peers Merkle tree
+
+    :param duniterpy.api.bma.ConnectionHandler connection: Connection handler instance
+    :param str leaf_hash: the hash of the leaf
+    :rtype: duniterpy.documents.Peer
+    """
+    data = await network.peers(connection, leaf=leaf_hash)
+    if "leaf" in data:
+        data = data["leaf"]
+    return Peer.from_bma(data["value"])
+
+
+def unique_peers(peers):
+    """
+    Remove duplicated peer documents.
+    For each pubkey, the peer document with the most recent blockUID is kept.
+
+    :param list[duniterpy.documents.Peer] peers: the peer documents
+    :rtype: list[duniterpy.documents.Peer]
+    """
+    by_pubkey = {}
+    for peer in peers:
+        known = by_pubkey.get(peer.pubkey)
+        if known is None or known.blockUID < peer.blockUID:
+            by_pubkey[peer.pubkey] = peer
+    return list(by_pubkey.values())
+
+
+async def fetch_leaves(connection, hashes, concurrency=20):
+    """
+    Get the peer documents of many leaves concurrently.
+    Leaves which could not be fetched or parsed are left out.
+
+    :param duniterpy.api.bma.ConnectionHandler connection: Connection handler instance
+    :param list[str] hashes: the hashes of the leaves
+    :param int concurrency: maximum number of simultaneous requests
+    :return: the peer documents by leaf hash
+    :rtype: dict[str, duniterpy.documents.Peer]
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(leaf_hash):
+        async with semaphore:
+            try:
+                return await leaf(connection, leaf_hash)
+            except NODE_ERRORS + (MalformedDocumentError, KeyError) as e:
+                logger.debug("Could not get leaf {0} : {1}".format(leaf_hash, str(e)))
+                return None
+
+    hashes = list(hashes)
+    peers = await asyncio.gather(*[fetch(h) for h in hashes])
+    return {h: p for h, p in zip(hashes, peers) if p is not None}
+
+
+async def fetch_peers(connection, concurrency=20):
+    """
+    Walk the leaves of the peers Merkle tree concurrently
+
+    :param duniterpy.api.bma.ConnectionHandler connection: Connection handler instance
+    :param int concurrency: maximum number of simultaneous requests
+    :return: the peer documents, one per pubkey
+    :rtype: list[duniterpy.documents.Peer]
+    """
+    hashes = await leaves(connection)
+    peers = await fetch_leaves(connection, hashes, concurrency)
+    return unique_peers(list(peers.values()))
+
+
+async def probe(peer, endpoint, session, timeout=5, proxy=None):
+    """
+    Request node.summary and blockchain.current of an endpoint in parallel
+
+    :param duniterpy.documents.Peer peer: the peer document of the node
+    :param duniterpy.documents.BMAEndpoint endpoint: the endpoint to probe
+    :param aiohttp.ClientSession session: AIOHTTP client session instance
+    :param float timeout: seconds allowed to the node to answer both requests
+    :param str proxy: proxy url
+    :rtype: NodeInfo
+    """
+    info = NodeInfo(peer, endpoint)
+    connection = next(endpoint.conn_handler(session, proxy))
+    start = time.monotonic()
+    try:
+        summary, current = await asyncio.wait_for(asyncio.gather(node.summary(connection),
+                                                                 blockchain.current(connection)),
+                                                  timeout)
+    except NODE_ERRORS as e:
+        info.error = getattr(e, "message", None) or str(e) or type(e).__name__
+        return info
+    info.latency = time.monotonic() - start
+    info.software = summary["duniter"]["software"]
+    info.version = summary["duniter"]["version"]
+    info.current = BlockUID(current["number"], current["hash"])
+    return info
+
+
+def rank(nodes):
+    """
+    Sort nodes : reachable nodes first, then the highest current block, then the fastest
+
+    :param list[NodeInfo] nodes: the probed nodes
+    :rtype: list[NodeInfo]
+    """
+    def key(info):
+        if not info.reachable:
+            return 1, 0, 0
+        return 0, -info.current.number, info.latency
+
+    return sorted(nodes, key=key)
+
+
+async def crawl(connection, timeout=5, concurrency=20):
+    """
+    Discover the nodes of the currency and probe all their BMA endpoints
+
+    :param duniterpy.api.bma.ConnectionHandler connection: Connection handler of the entry node
+    :param float timeout: seconds allowed to each endpoint to answer
+    :param int concurrency: maximum number of simultaneous requests
+    :return: the ranked node table
+    :rtype: list[NodeInfo]
+    """
+    peers = await fetch_peers(connection, concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited_probe(peer, endpoint):
+        async with semaphore:
+            return await probe(peer, endpoint, connection.session, timeout, connection.proxy)
+
+    probes = [limited_probe(peer, e) for peer in peers for e in peer.endpoints if isinstance(e, BMAEndpoint)]
+    nodes = await asyncio.gather(*probes)
+    return rank(nodes)
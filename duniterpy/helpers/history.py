@@ -0,0 +1,155 @@
+"""
+Transactions history of an account fetched by windows of blocks or of times, concurrently.
+
+tx.history answers the whole history of an account at once, which is slow and may time out for old accounts.
+The windows of tx.blocks or tx.times are small requests, sent in parallel and possibly to several nodes::
+
+    for future in history.fetch_windows(pool, pubkey, 0, current_number):
+        (start, end), data = await future
+        ...
+
+    data = await history.fetch_history(pool, pubkey, 0, current_number)
+"""
+import asyncio
+import itertools
+
+from ..api.bma import tx
+from ..api.pool import NodePool
+
+BLOCKS = "blocks"
+TIMES = "times"
+
+# default size of a window : a few days of blocks, a month of times
+DEFAULT_WINDOWS = {BLOCKS: 2000, TIMES: 30 * 24 * 3600}
+
+WRITTEN = ("sent", "received")
+PENDING = ("sending", "receiving")
+
+
+def windows(start, end, size):
+    """
+    Split a range in consecutive windows. The bounds are included, as in tx.blocks and tx.times.
+
+    :param int start: the first block number or time
+    :param int end: the last block number or time
+    :param int size: the number of block numbers or seconds of a window
+    :rtype: list[tuple[int, int]]
+    """
+    if size < 1:
+        raise ValueError("A window is at least 1 wide")
+    return [(first, min(first + size - 1, end)) for first in range(start, end + 1, size)]
+
+
+def _read(connections, by):
+    """
+    The coroutine function reading a window, and the connections to spread the windows over
+
+    :rtype: tuple
+    """
+    try:
+        func = {BLOCKS: tx.blocks, TIMES: tx.times}[by]
+    except KeyError:
+        raise ValueError("Windows are by {0} or by {1}, not by {2}".format(BLOCKS, TIMES, by))
+    if isinstance(connections, NodePool):
+        return lambda _, *args: connections.request(func, *args), [connections]
+    if not isinstance(connections, (list, tuple)):
+        connections = [connections]
+    if not connections:
+        raise ValueError("At least one connection is needed")
+    return func, connections
+
+
+def _window_tasks(connections, pubkey, start, end, size, by, concurrency):
+    """
+    Start the tasks fetching the windows
+
+    :rtype: list[asyncio.Future]
+    """
+    func, connections = _read(connections, by)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(connection, window):
+        async with semaphore:
+            return window, await func(connection, pubkey, window[0], window[1])
+
+    ranges = windows(start, end, size or DEFAULT_WINDOWS[by])
+    return [asyncio.ensure_future(fetch(connection, window))
+            for connection, window in zip(itertools.cycle(connections), ranges)]
+
+
+def fetch_windows(connections, pubkey, start, end, size=None, by=BLOCKS, concurrency=4):
+    """
+    Fetch the history of an account by windows, concurrently.
+    The windows are spread over the connections in turn. With a NodePool, the pool chooses the node of each window,
+    and hedges and fails over the slow and failing ones.
+
+    Must be called from a running event loop.
+
+    :param connections: a connection handler, a list of connection handlers or a NodePool
+    :param str pubkey: the pubkey of the account
+    :param int start: the first block number or time
+    :param int end: the last block number or time
+    :param int size: the width of a window, DEFAULT_WINDOWS by default
+    :param str by: BLOCKS for tx.blocks windows, TIMES for tx.times windows
+    :param int concurrency: maximum number of windows fetched at the same time
+    :return: the futures of the windows in the order they complete, resolving to ((start, end), data)
+        where data is the tx.history like answer of the window
+    :rtype: iterator
+    """
+    return asyncio.as_completed(_window_tasks(connections, pubkey, start, end, size, by, concurrency))
+
+
+def merge(histories):
+    """
+    Merge tx.history like answers : the transactions are deduplicated by hash,
+    the written ones are sorted by block number and time, the pending ones keep their order.
+
+    :param list[dict] histories: the answers
+    :return: a tx.history like answer
+    :rtype: dict
+    """
+    merged = {name: [] for name in WRITTEN + PENDING}
+    seen = {name: set() for name in WRITTEN + PENDING}
+    currency = pubkey = None
+    for data in histories:
+        currency = currency or data.get("currency")
+        pubkey = pubkey or data.get("pubkey")
+        for name in WRITTEN + PENDING:
+            for transaction in data["history"].get(name, []):
+                if transaction["hash"] not in seen[name]:
+                    seen[name].add(transaction["hash"])
+                    merged[name].append(transaction)
+    # a pending transaction written in the meantime is only kept as written
+    written = seen["sent"] | seen["received"]
+    for name in PENDING:
+        merged[name] = [transaction for transaction in merged[name] if transaction["hash"] not in written]
+    for name in WRITTEN:
+        merged[name].sort(key=lambda transaction: (transaction["block_number"], transaction["time"]))
+    return {"currency": currency, "pubkey": pubkey, "history": merged}
+
+
+async def fetch_history(connections, pubkey, start, end, size=None, by=BLOCKS, concurrency=4):
+    """
+    Fetch the history of an account by windows, concurrently, and merge them.
+    If a window fails, the other windows are cancelled and the error is raised.
+
+    :param connections: a connection handler, a list of connection handlers or a NodePool
+    :param str pubkey: the pubkey of the account
+    :param int start: the first block number or time
+    :param int end: the last block number or time
+    :param int size: the width of a window, DEFAULT_WINDOWS by default
+    :param str by: BLOCKS for tx.blocks windows, TIMES for tx.times windows
+    :param int concurrency: maximum number of windows fetched at the same time
+    :return: a tx.history like answer
+    :rtype: dict
+    """
+    tasks = _window_tasks(connections, pubkey, start, end, size, by, concurrency)
+    histories = []
+    try:
+        for future in asyncio.as_completed(tasks):
+            _, data = await future
+            histories.append(data)
+    finally:
+        for task in tasks:
+            task.cancel()
+    return merge(histories)
@@ -0,0 +1,201 @@
+"""
+Members of the web of trust, bootstrapped once from wot.members and kept up to date from the new blocks.
+
+A block changes the members with its joiners (new and returning members), actives (renewed memberships),
+leavers (members asking to leave, still members until they are excluded), excluded and revoked identities.
+Each change is sent to the listeners of the set::
+
+    members = MembersSet()
+    members.add_listener(print)
+    await members.sync(connection)
+    ...
+    # on each new block, or for each block of the ws/block websocket
+    await members.sync(connection)
+    if pubkey in members:
+        ...
+"""
+import collections
+import logging
+
+from ..api.bma import blockchain, wot
+from ..documents import Block
+
+logger = logging.getLogger("duniter/members")
+
+# kinds of changes
+JOINED = "joined"
+RENEWED = "renewed"
+LEAVING = "leaving"
+EXCLUDED = "excluded"
+REVOKED = "revoked"
+
+Change = collections.namedtuple("Change", "kind pubkey uid block_number")
+Change.__doc__ = """
+A change of the members
+
+:param str kind: JOINED, RENEWED, LEAVING, EXCLUDED or REVOKED
+:param str pubkey: the pubkey of the identity
+:param str uid: the uid of the identity, None if not known
+:param int block_number: the number of the block of the change
+"""
+
+
+class MembersSet:
+    """
+    The members of the web of trust at a head block, by pubkey.
+
+    The set is bootstrapped from wot.members, then the blocks following the head are applied in order.
+    A block not following the head is refused : sync bootstraps the set again after a fork or a long gap.
+    """
+    def __init__(self):
+        # uid by pubkey
+        self.members = {}
+        # members who asked to leave
+        self.leaving = set()
+        # identities revoked while the set is kept up to date
+        self.revoked = set()
+        self.head = None
+        self.head_hash = None
+        self._listeners = []
+
+    def __contains__(self, pubkey):
+        return pubkey in self.members
+
+    def __len__(self):
+        return len(self.members)
+
+    def __iter__(self):
+        return iter(self.members)
+
+    def uid(self, pubkey):
+        """
+        The uid of a member
+
+        :param str pubkey: the pubkey
+        :return: the uid, None if the pubkey is not a member
+        :rtype: str
+        """
+        return self.members.get(pubkey)
+
+    def add_listener(self, listener):
+        """
+        Register a function called with each Change
+
+        :param listener: the function
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """
+        Unregister a listener
+
+        :param listener: the function
+        """
+        self._listeners.remove(listener)
+
+    def _notify(self, changes):
+        for change in changes:
+            for listener in list(self._listeners):
+                try:
+                    listener(change)
+                except Exception:
+                    logger.exception("Members listener {0} failed".format(listener))
+
+    async def bootstrap(self, connection):
+        """
+        Download the members list. The current block is read first : the blocks applied next may be
+        already in the list, applying them again leads to the same members.
+        When the set is bootstrapped again, the members added and removed meanwhile are sent to the listeners
+        as JOINED and EXCLUDED changes.
+
+        :param duniterpy.api.bma.ConnectionHandler connection: Connection handler instance
+        :return: the changes
+        :rtype: list[Change]
+        """
+        current = await blockchain.current(connection)
+        data = await wot.members(connection)
+        members = {member["pubkey"]: member["uid"] for member in data["results"]}
+        changes = []
+        # bootstrapped again : the differences are sent to the listeners
+        if self.head is not None:
+            changes = [Change(JOINED, pubkey, uid, current["number"]) for pubkey, uid in members.items()
+                       if self.members.get(pubkey) != uid]
+            changes.extend(Change(EXCLUDED, pubkey, uid, current["number"]) for pubkey, uid in self.members.items()
+                           if pubkey not in members)
+        self.members = members
+        self.leaving = set(pubkey for pubkey in self.leaving if pubkey in members)
+        self.head, self.head_hash = current["number"], current["hash"]
+        logger.debug("Members bootstrapped at block {0} : {1} members".format(self.head, len(self.members)))
+        self._notify(changes)
+        return changes
+
+    def apply_block(self, block):
+        """
+        Apply the changes of the block following the head
+
+        :param duniterpy.documents.Block block: the block
+        :return: the changes
+        :rtype: list[Change]
+        """
+        if self.head is not None:
+            if block.number != self.head + 1:
+                raise ValueError("Block #{0} does not follow the head #{1}".format(block.number, self.head))
+            if block.prev_hash != self.head_hash:
+                raise ValueError("Block #{0} is on a fork : its previous hash {1} is not the head hash {2}"
+                                 .format(block.number, block.prev_hash, self.head_hash))
+        changes = []
+        for membership in block.joiners:
+            self.leaving.discard(membership.issuer)
+            if self.members.get(membership.issuer) != membership.uid:
+                self.members[membership.issuer] = membership.uid
+                changes.append(Change(JOINED, membership.issuer, membership.uid, block.number))
+        for membership in block.actives:
+            self.leaving.discard(membership.issuer)
+            self.members[membership.issuer] = membership.uid
+            changes.append(Change(RENEWED, membership.issuer, membership.uid, block.number))
+        for membership in block.leavers:
+            if membership.issuer not in self.leaving:
+                self.leaving.add(membership.issuer)
+                changes.append(Change(LEAVING, membership.issuer, membership.uid, block.number))
+        # a revoked member is excluded in the same block
+        for revocation in block.revoked:
+            self.revoked.add(revocation.pubkey)
+            self.leaving.discard(revocation.pubkey)
+            changes.append(Change(REVOKED, revocation.pubkey, self.members.pop(revocation.pubkey, None),
+                                  block.number))
+        for pubkey in block.excluded:
+            self.leaving.discard(pubkey)
+            if pubkey in self.members:
+                changes.append(Change(EXCLUDED, pubkey, self.members.pop(pubkey), block.number))
+        self.head, self.head_hash = block.number, block.blockUID.sha_hash
+        self._notify(changes)
+        return changes
+
+    async def sync(self, connection, max_gap=100):
+        """
+        Apply the blocks between the head and the current block of a node.
+        The set is bootstrapped the first time, after a fork or when more than max_gap blocks are missing.
+
+        :param duniterpy.api.bma.ConnectionHandler connection: Connection handler instance
+        :param int max_gap: the maximum number of blocks applied, the set is bootstrapped again beyond
+        :return: the changes
+        :rtype: list[Change]
+        """
+        current = await blockchain.current(connection)
+        if current["number"] == self.head and current["hash"] == self.head_hash:
+            return []
+        changes = []
+        missing = current["number"] - self.head if self.head is not None else 0
+        if 0 < missing <= max_gap:
+            blocks = []
+            if missing > 1:
+                blocks = [Block.from_bma_json(data)
+                          for data in await blockchain.blocks(connection, missing - 1, self.head + 1)]
+            blocks.append(Block.from_bma_json(current))
+            try:
+                for block in blocks:
+                    changes.extend(self.apply_block(block))
+                return changes
+            except ValueError as e:
+                logger.debug("Members bootstrapped again : {0}".format(e))
+        return changes + await self.bootstrap(connection)
@@ -0,0 +1,59 @@
+"""
+Peer table synchronized incrementally from the network.peers Merkle tree
+"""
+import logging
+
+from ..api.bma import network
+from .crawler import fetch_leaves, unique_peers
+
+logger = logging.getLogger("duniter/peer_table")
+
+
+class PeerTable:
+    """
+    Local copy of the leaves of the peers Merkle tree of a node.
+
+    Each refresh only requests the leaf hashes, and downloads the leaves
+    which are not known locally. A changed peer document gets a new leaf hash,
+    so it is seen as a removed leaf and a new one.
+    """
+    def __init__(self):
+        self.root = None
+        self.leaves = {}
+
+    @property
+    def peers(self):
+        """
+        The peer documents of the table, one per pubkey
+
+        :rtype: list[duniterpy.documents.Peer]
+        """
+        return unique_peers(list(self.leaves.values()))
+
+    async def refresh(self, connection, concurrency=20):
+        """
+        Synchronize the table with the peers Merkle tree of a node
+
+        :param duniterpy.api.bma.ConnectionHandler connection: Connection handler instance
+        :param int concurrency: maximum number of simultaneous requests
+        :return: the new peer documents and the removed ones
+        :rtype: tuple[list[duniterpy.documents.Peer], list[duniterpy.documents.Peer]]
+        """
+        data = await network.peers(connection, leaves=True)
+        if data["root"] == self.root:
+            return [], []
+
+        remote = set(data.get("leaves", []))
+        removed = [self.leaves.pop(h) for h in set(self.leaves) - remote]
+        missing = remote - set(self.leaves)
+        added = await fetch_leaves(connection, missing, concurrency)
+        self.leaves.update(added)
+
+        # the root is only stored when every leaf is known, so failed leaves are requested again
+        if len(added) == len(missing):
+            self.root = data["root"]
+        else:
+            self.root = None
+        logger.debug("Peer table refresh : {0} new leaves, {1} removed, {2} failed"
+                     .format(len(added), len(removed), len(missing) - len(added)))
+        return list(added.values()), removed
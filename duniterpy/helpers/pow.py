@@ -0,0 +1,214 @@
+"""
+Proof of work of the blocks : check a hash against a difficulty, and search the nonce of a block.
+
+The proof of work of a block is the sha256 of "InnerHash: <inner hash>\\nNonce: <nonce>\\n<signature>\\n",
+where the signature is the signature of the issuer over the first two lines.
+Each attempt signs a new nonce and hashes it, on top of the precomputed hash state of the constant prefix.
+
+The nonce space is split in ranges, searched in worker processes::
+
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        result = pow.search_nonce(block, signing_key, executor=executor)
+    print(result.hash_rate_per_core)
+"""
+import base64
+import concurrent.futures
+import hashlib
+import os
+import time
+
+# secret keys rebuilt from their seed in a worker process, by seed
+_secret_keys = {}
+
+
+def difficulty(powmin):
+    """
+    The leading zeros required by a difficulty, and the highest hexadecimal digit allowed after them
+
+    :param int powmin: the difficulty
+    :rtype: tuple[int, str]
+    """
+    zeros, remainder = divmod(powmin, 16)
+    return zeros, "{0:X}".format(15 - remainder)
+
+
+def meets_powmin(hash_hex, powmin):
+    """
+    True if a proof of work hash meets a difficulty : powmin // 16 leading zeros,
+    followed by a digit of at most 15 - powmin % 16
+
+    :param str hash_hex: the hexadecimal hash
+    :param int powmin: the difficulty
+    :rtype: bool
+    """
+    zeros, highest = difficulty(powmin)
+    hash_hex = hash_hex.upper()
+    return hash_hex.startswith("0" * zeros) and hash_hex[zeros] <= highest
+
+
+def _sign_function(key):
+    """
+    The function signing a message with a key, or with its seed in a worker process
+    """
+    import libnacl
+    if isinstance(key, bytes):
+        secret = _secret_keys.get(key)
+        if secret is None:
+            import libnacl.sign
+            secret = _secret_keys[key] = libnacl.sign.Signer(key).sk
+    else:
+        secret = key.sk
+    return lambda message: libnacl.crypto_sign_detached(message, secret)
+
+
+def search_range(key, inner_hash, powmin, first, count):
+    """
+    Search a nonce meeting a difficulty in a range. This is the task run by the workers.
+
+    :param key: the SigningKey of the issuer, or its seed
+    :param str inner_hash: the inner hash of the block
+    :param int powmin: the difficulty
+    :param int first: the first nonce of the range
+    :param int count: the number of nonces of the range
+    :return: the nonce found or None, its signature, its hash, the number of attempts and the time spent
+    :rtype: tuple
+    """
+    start = time.perf_counter()
+    sign = _sign_function(key)
+    prefix = "InnerHash: {0}\nNonce: ".format(inner_hash).encode("ascii")
+    prefix_state = hashlib.sha256(prefix)
+    zeros, highest = difficulty(powmin)
+    # hexdigest is lower case
+    leading = "0" * zeros
+    highest = highest.lower()
+    b64encode = base64.b64encode
+    for nonce in range(first, first + count):
+        nonce_line = b"%d\n" % nonce
+        signature = b64encode(sign(prefix + nonce_line))
+        state = prefix_state.copy()
+        state.update(nonce_line + signature + b"\n")
+        digest = state.hexdigest()
+        if digest.startswith(leading) and digest[zeros] <= highest:
+            return nonce, signature.decode("ascii"), digest.upper(), nonce - first + 1, time.perf_counter() - start
+    return None, None, None, count, time.perf_counter() - start
+
+
+class PowResult:
+    """
+    The outcome of a nonce search
+    """
+    def __init__(self, nonce, signature, pow_hash, attempts, duration, busy):
+        """
+        :param int nonce: the nonce found, None if none was found
+        :param str signature: the signature of the block with this nonce
+        :param str pow_hash: the proof of work hash
+        :param int attempts: the number of nonces tried
+        :param float duration: the duration of the search in seconds
+        :param float busy: the time spent searching by all the workers, in seconds
+        """
+        self.nonce = nonce
+        self.signature = signature
+        self.hash = pow_hash
+        self.attempts = attempts
+        self.duration = duration
+        self.busy = busy
+
+    @property
+    def found(self):
+        return self.nonce is not None
+
+    @property
+    def hash_rate(self):
+        """
+        Hashes per second of the whole search
+        """
+        return self.attempts / self.duration if self.duration else 0.
+
+    @property
+    def hash_rate_per_core(self):
+        """
+        Hashes per second of one worker
+        """
+        return self.attempts / self.busy if self.busy else 0.
+
+
+def search_nonce(block, key, powmin=None, start=0, max_attempts=None, executor=None, workers=None,
+                 chunk_size=10000):
+    """
+    Search a nonce giving a proof of work meeting a difficulty.
+    The inner hash of the block is computed first. When a nonce is found, the nonce and the signature
+    of the block are set.
+
+    The ranges of nonces are searched in the calling process, or in the workers of an executor,
+    a ProcessPoolExecutor being the one to use. The search stops as soon as a range holding a valid nonce is done :
+    the ranges not started are cancelled, the running ones end in the background.
+
+    :param duniterpy.documents.Block block: the block
+    :param duniterpy.key.SigningKey key: the key of the issuer of the block
+    :param int powmin: the difficulty, the PoWMin of the block by default.
+        The personalized difficulty of an issuer is above it.
+    :param int start: the first nonce tried
+    :param int max_attempts: the maximum number of nonces tried, None for no limit
+    :param concurrent.futures.Executor executor: the pool to search with, None to search in the calling process
+    :param int workers: the number of ranges searched at the same time, the number of cpus by default
+    :param int chunk_size: the number of nonces of a range
+    :rtype: PowResult
+    """
+    powmin = block.powmin if powmin is None else powmin
+    block.inner_hash = block.computed_inner_hash()
+    end = None if max_attempts is None else start + max_attempts
+    began = time.perf_counter()
+
+    def ranges():
+        first = start
+        while end is None or first < end:
+            count = chunk_size if end is None else min(chunk_size, end - first)
+            yield first, count
+            first += count
+
+    found = None
+    attempts = 0
+    busy = 0.
+    if executor is None:
+        for first, count in ranges():
+            nonce, signature, pow_hash, tried, spent = search_range(key, block.inner_hash, powmin, first, count)
+            attempts += tried
+            busy += spent
+            if nonce is not None:
+                found = nonce, signature, pow_hash
+                break
+    else:
+        if isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+            key = key.seed
+        workers = workers or os.cpu_count() or 1
+        pending = ranges()
+        running = set()
+        try:
+            while True:
+                while len(running) < workers:
+                    task = next(pending, None)
+                    if task is None:
+                        break
+                    running.add(executor.submit(search_range, key, block.inner_hash, powmin, *task))
+                if not running:
+                    break
+                done, running = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    nonce, signature, pow_hash, tried, spent = future.result()
+                    attempts += tried
+                    busy += spent
+                    # the lowest nonce wins among the ranges done together
+                    if nonce is not None and (found is None or nonce < found[0]):
+                        found = nonce, signature, pow_hash
+                if found is not None:
+                    break
+        finally:
+            for future in running:
+                future.cancel()
+
+    result = PowResult(None, None, None, attempts, time.perf_counter() - began, busy)
+    if found is not None:
+        result.nonce, result.signature, result.hash = found
+        block.noonce = result.nonce
+        block.signatures = [result.signature]
+    return result
@@ -0,0 +1,95 @@
+"""
+Requirements of many identities, fetched concurrently.
+
+BMA answers the requirements of one pubkey or uid per wot.requirements request. The requests of many searches
+are sent with a bounded concurrency, spread over several nodes or a NodePool, and the answers are streamed
+in the order they complete::
+
+    for future in requirements.fetch_requirements(pool, pubkeys):
+        pubkey, data, error = await future
+        ...
+
+    answers, errors = await requirements.requirements_of(pool, pubkeys)
+"""
+import asyncio
+import itertools
+
+from ..api.bma import wot
+from ..api.pool import NodePool
+
+
+def _requirements_tasks(connections, searches, concurrency):
+    """
+    Start the tasks fetching the requirements
+
+    :rtype: list[asyncio.Future]
+    """
+    if isinstance(connections, NodePool):
+        pool = connections
+        request, connections = lambda _, search: pool.request(wot.requirements, search), [pool]
+    else:
+        request = wot.requirements
+        if not isinstance(connections, (list, tuple)):
+            connections = [connections]
+        if not connections:
+            raise ValueError("At least one connection is needed")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(connection, search):
+        async with semaphore:
+            try:
+                return search, await request(connection, search), None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                return search, None, e
+
+    # a search asked twice is only fetched once
+    searches = list(dict.fromkeys(searches))
+    return [asyncio.ensure_future(fetch(connection, search))
+            for connection, search in zip(itertools.cycle(connections), searches)]
+
+
+def fetch_requirements(connections, searches, concurrency=20):
+    """
+    Fetch the requirements of many pubkeys or uids, concurrently.
+    The searches are spread over the connections in turn. With a NodePool, the pool chooses the node of each search,
+    and hedges and fails over the slow and failing ones.
+
+    Must be called from a running event loop.
+
+    :param connections: a connection handler, a list of connection handlers or a NodePool
+    :param searches: the pubkeys or uids
+    :param int concurrency: maximum number of requests sent at the same time
+    :return: the futures of the searches in the order they complete, resolving to (search, data, error)
+        where data is the wot.requirements answer, or None and error is the exception of the failed request
+    :rtype: iterator
+    """
+    return asyncio.as_completed(_requirements_tasks(connections, searches, concurrency))
+
+
+async def requirements_of(connections, searches, concurrency=20):
+    """
+    Fetch the requirements of many pubkeys or uids, concurrently, and gather them.
+    An identity unknown to the node is an error : DuniterError with the NO_MATCHING_IDENTITY code.
+
+    :param connections: a connection handler, a list of connection handlers or a NodePool
+    :param searches: the pubkeys or uids
+    :param int concurrency: maximum number of requests sent at the same time
+    :return: the wot.requirements answers and the errors, by search
+    :rtype: tuple[dict, dict]
+    """
+    tasks = _requirements_tasks(connections, searches, concurrency)
+    answers = {}
+    errors = {}
+    try:
+        for future in asyncio.as_completed(tasks):
+            search, data, error = await future
+            if error is None:
+                answers[search] = data
+            else:
+                errors[search] = error
+    finally:
+        for task in tasks:
+            task.cancel()
+    return answers, errors
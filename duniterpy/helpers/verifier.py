@@ -0,0 +1,185 @@
+"""
+Integrity of a segment of the chain : the inner hash, the proof of work and the signature of each block,
+and the chaining of the blocks.
+
+The checks of each block are independent and run by chunks, in the calling process or in the workers
+of a concurrent.futures executor. The chaining is checked in order, from the hashes of the blocks::
+
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        report = verifier.verify_blocks(blocks, executor=executor)
+    if not report.ok:
+        print(report)
+"""
+import base64
+import collections
+import hashlib
+import itertools
+import os
+
+import libnacl
+
+from ..key.base58 import Base58Encoder
+from .pow import meets_powmin
+
+# the failures of a block
+INNER_HASH = "inner_hash"
+POW = "pow"
+SIGNATURE = "signature"
+NUMBER = "number"
+PREVIOUS_HASH = "previous_hash"
+PREVIOUS_ISSUER = "previous_issuer"
+
+# verifying keys of the issuers, by pubkey
+_issuer_keys = {}
+
+
+def _issuer_key(pubkey):
+    key = _issuer_keys.get(pubkey)
+    if key is None:
+        key = _issuer_keys[pubkey] = Base58Encoder.decode(pubkey)
+    return key
+
+
+def check_block(block):
+    """
+    Check the inner hash, the proof of work against the PoWMin and the issuer signature of a block
+
+    :param duniterpy.documents.Block block: the block
+    :return: the hash of the block and its failures
+    :rtype: tuple[str, list[str]]
+    """
+    failures = []
+    if block.computed_inner_hash() != block.inner_hash:
+        failures.append(INNER_HASH)
+    signed_part = block.signed_part()
+    signature = block.signatures[0] if block.signatures else ""
+    block_hash = hashlib.sha256("{0}{1}\n".format(signed_part, signature).encode("ascii")).hexdigest().upper()
+    if not meets_powmin(block_hash, block.powmin):
+        failures.append(POW)
+    try:
+        libnacl.crypto_sign_verify_detached(base64.b64decode(signature), signed_part.encode("ascii"),
+                                            _issuer_key(block.issuer))
+    except ValueError:
+        failures.append(SIGNATURE)
+    return block_hash, failures
+
+
+def check_blocks(blocks):
+    """
+    Check blocks independently. This is the task run by the workers.
+
+    :param list[duniterpy.documents.Block] blocks: the blocks
+    :return: the hash and the failures of each block
+    :rtype: list[tuple[str, list[str]]]
+    """
+    return [check_block(block) for block in blocks]
+
+
+class VerificationReport:
+    """
+    The failing blocks of a verified segment
+    """
+    def __init__(self):
+        self.checked = 0
+        self.first = None
+        self.last = None
+        # the failures by block number
+        self.failures = collections.OrderedDict()
+
+    @property
+    def ok(self):
+        return not self.failures
+
+    @property
+    def failed(self):
+        """
+        The numbers of the failing blocks
+
+        :rtype: list[int]
+        """
+        return list(self.failures)
+
+    def add(self, number, failures):
+        if self.first is None:
+            self.first = number
+        self.last = number
+        self.checked += 1
+        if failures:
+            self.failures.setdefault(number, []).extend(failures)
+
+    def __str__(self):
+        if not self.checked:
+            return "No block checked"
+        summary = "{0} blocks checked from #{1} to #{2}".format(self.checked, self.first, self.last)
+        if self.ok:
+            return summary + ", all valid"
+        return summary + ", {0} failing : {1}".format(len(self.failures), ", ".join(
+            "#{0} ({1})".format(number, " ".join(failures)) for number, failures in self.failures.items()))
+
+
+def _chunks(blocks, chunk_size):
+    blocks = iter(blocks)
+    while True:
+        chunk = list(itertools.islice(blocks, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def verify_blocks(blocks, previous=None, executor=None, workers=None, chunk_size=100):
+    """
+    Verify a segment of the chain, given as a sequence or as a stream of blocks sorted by number.
+    The blocks are read by chunks, only a few chunks are held at a time.
+
+    Besides the checks of check_block, each block must follow the previous one : its number is the next one,
+    its PreviousHash is the hash of the previous block and its PreviousIssuer is the issuer of the previous block.
+
+    :param blocks: the blocks
+    :param duniterpy.documents.Block previous: the block before the first block, None to not check the chaining
+        of the first block
+    :param concurrent.futures.Executor executor: the pool checking the chunks, None to check them
+        in the calling process
+    :param int workers: the number of chunks checked at the same time, the number of cpus by default
+    :param int chunk_size: the number of blocks of a chunk
+    :rtype: VerificationReport
+    """
+    report = VerificationReport()
+    last = None
+    if previous is not None:
+        last = (previous.number, previous.blockUID.sha_hash, previous.issuer)
+
+    def link(chunk, results):
+        nonlocal last
+        for block, (block_hash, failures) in zip(chunk, results):
+            if last is not None:
+                number, last_hash, last_issuer = last
+                if block.number != number + 1:
+                    failures.append(NUMBER)
+                if block.prev_hash != last_hash:
+                    failures.append(PREVIOUS_HASH)
+                if block.prev_issuer != last_issuer:
+                    failures.append(PREVIOUS_ISSUER)
+            report.add(block.number, failures)
+            last = (block.number, block_hash, block.issuer)
+
+    if executor is None:
+        for chunk in _chunks(blocks, chunk_size):
+            link(chunk, check_blocks(chunk))
+        return report
+
+    workers = workers or os.cpu_count() or 1
+    running = collections.deque()
+    try:
+        for chunk in _chunks(blocks, chunk_size):
+            running.append((chunk, executor.submit(check_blocks, chunk)))
+            # the chunks are linked in order, the next ones are checked meanwhile
+            if len(running) > workers:
+                chunk, future = running.popleft()
+                link(chunk, future.result())
+        while running:
+            chunk, future = running.popleft()
+            link(chunk, future.result())
+    finally:
+        for _, future in running:
+            future.cancel()
+    return report
@@ -0,0 +1,324 @@
+"""
+Cache of the web of trust answers of a node, scoped by the height of the chain.
+
+The answers of wot.lookup, wot.requirements, wot.certifiers_of and wot.certified_by only change when a block
+is applied. They are kept with the number of the current block at fetch time. When the head advances,
+the whole cache is dropped (bulk invalidation), or only the answers about the pubkeys and uids touched
+by the new blocks (selective invalidation)::
+
+    cache = WotCache(connection)
+    await cache.refresh()
+    data = await cache.requirements(pubkey)
+    ...
+    # each new block from the ws/block websocket
+    cache.apply_block(block_data)
+"""
+import asyncio
+import collections
+import logging
+import time
+
+from ..api.bma import blockchain, wot
+from ..api.pool import NodePool
+
+logger = logging.getLogger("duniter/wot_cache")
+
+# kinds of cached answers
+LOOKUP = "lookup"
+REQUIREMENTS = "requirements"
+CERTIFIERS_OF = "certifiers_of"
+CERTIFIED_BY = "certified_by"
+
+_REQUESTS = {
+    LOOKUP: wot.lookup,
+    REQUIREMENTS: wot.requirements,
+    CERTIFIERS_OF: wot.certifiers_of,
+    CERTIFIED_BY: wot.certified_by,
+}
+
+
+def touched(block):
+    """
+    The pubkeys and uids whose web of trust changes with a block : its new identities, joiners, actives,
+    leavers, revoked and excluded members, and both ends of its certifications
+
+    :param dict block: the block, as answered by blockchain.block
+    :rtype: set[str]
+    """
+    keys = set(block.get("excluded", []))
+    for inline in block.get("identities", []):
+        # PUBKEY:SIGNATURE:BLOCKSTAMP:UID
+        fields = inline.split(":")
+        keys.update((fields[0], fields[3]))
+    for name in ("joiners", "actives", "leavers"):
+        for inline in block.get(name, []):
+            # PUBKEY:SIGNATURE:MEMBERSHIP_BLOCKSTAMP:IDENTITY_BLOCKSTAMP:UID
+            fields = inline.split(":")
+            keys.update((fields[0], fields[4]))
+    for inline in block.get("revoked", []):
+        # PUBKEY:SIGNATURE
+        keys.add(inline.split(":")[0])
+    for inline in block.get("certifications", []):
+        # PUBKEY_FROM:PUBKEY_TO:BLOCK_NUMBER:SIGNATURE
+        keys.update(inline.split(":")[:2])
+    return keys
+
+
+def subjects(kind, data):
+    """
+    The pubkeys and uids an answer is about : the identities it describes and the other ends
+    of their certifications
+
+    :param str kind: the kind of answer, LOOKUP, REQUIREMENTS, CERTIFIERS_OF or CERTIFIED_BY
+    :param dict data: the answer
+    :rtype: set[str]
+    """
+    keys = set()
+    if kind == LOOKUP:
+        for result in data.get("results", []):
+            keys.add(result["pubkey"])
+            for uid in result.get("uids", []):
+                keys.add(uid["uid"])
+                keys.update(other["pubkey"] for other in uid.get("others", []))
+            keys.update(signed["pubkey"] for signed in result.get("signed", []))
+    elif kind == REQUIREMENTS:
+        for identity in data.get("identities", []):
+            keys.update((identity["pubkey"], identity["uid"]))
+            keys.update(certification["from"] for certification in identity.get("certifications", []))
+    else:
+        keys.update((data["pubkey"], data["uid"]))
+        keys.update(certification["pubkey"] for certification in data.get("certifications", []))
+    return keys
+
+
+class WotCache:
+    """
+    The web of trust answers of a node or of a NodePool, valid at the head block of the cache.
+
+    The head is moved by refresh, which reads the current block of the node, or by apply_block.
+    Answers are only cached when no block was applied while they were fetched. The requests of an answer
+    being fetched are not sent again, they wait for it. Errors are not cached.
+    """
+    def __init__(self, connection, selective=True, max_entries=4096, max_gap=100, refresh_interval=None):
+        """
+        :param connection: the ConnectionHandler of the node, or a NodePool
+        :param bool selective: only drop the answers touched by the new blocks, instead of every answer
+        :param int max_entries: the maximum number of answers kept, the least recently used are dropped
+        :param int max_gap: the maximum number of new blocks read by refresh for a selective invalidation,
+            every answer is dropped beyond
+        :param float refresh_interval: the age in seconds of the head after which the requests refresh it first,
+            None to only refresh on demand
+        """
+        self.connection = connection
+        self.selective = selective
+        self.max_entries = max_entries
+        self.max_gap = max_gap
+        self.refresh_interval = refresh_interval
+        self.head = None
+        self.head_hash = None
+        self.hits = 0
+        self.misses = 0
+        # answers by (kind, search) : the head number at fetch time, the answer and its subjects
+        self._entries = collections.OrderedDict()
+        # keys of the answers, by subject
+        self._index = collections.defaultdict(set)
+        self._pending = {}
+        # incremented by each invalidation, the answers fetched meanwhile are not cached
+        self._generation = 0
+        self._refreshing = None
+        self._refreshed = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _call(self, func, *args):
+        if isinstance(self.connection, NodePool):
+            return self.connection.request(func, *args)
+        return func(self.connection, *args)
+
+    async def lookup(self, search):
+        """
+        Cached wot.lookup
+
+        :param str search: UID or public key
+        :rtype: dict
+        """
+        return await self.get(LOOKUP, search)
+
+    async def requirements(self, search):
+        """
+        Cached wot.requirements
+
+        :param str search: UID or public key
+        :rtype: dict
+        """
+        return await self.get(REQUIREMENTS, search)
+
+    async def certifiers_of(self, search):
+        """
+        Cached wot.certifiers_of
+
+        :param str search: UID or public key
+        :rtype: dict
+        """
+        return await self.get(CERTIFIERS_OF, search)
+
+    async def certified_by(self, search):
+        """
+        Cached wot.certified_by
+
+        :param str search: UID or public key
+        :rtype: dict
+        """
+        return await self.get(CERTIFIED_BY, search)
+
+    async def get(self, kind, search):
+        """
+        The answer of a request, from the cache or from the node
+
+        :param str kind: the kind of answer, LOOKUP, REQUIREMENTS, CERTIFIERS_OF or CERTIFIED_BY
+        :param str search: UID or public key
+        :rtype: dict
+        """
+        if kind not in _REQUESTS:
+            raise ValueError("Unknown kind of answer : {0}".format(kind))
+        if self.refresh_interval is not None and (self._refreshed is None or
+                                                  time.monotonic() - self._refreshed >= self.refresh_interval):
+            await self.refresh()
+        key = (kind, search)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        task = self._pending.get(key)
+        if task is None:
+            task = self._pending[key] = asyncio.ensure_future(self._fetch(key))
+            task.add_done_callback(lambda done: self._pending.pop(key, None) if self._pending.get(key) is done
+                                   else None)
+        # a cancelled request does not cancel the other requests waiting for the same answer
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key):
+        kind, search = key
+        generation = self._generation
+        number = self.head
+        data = await self._call(_REQUESTS[kind], search)
+        # a block was applied meanwhile : the answer may be older than it
+        if generation == self._generation:
+            self._store(key, number, data)
+        return data
+
+    def _store(self, key, number, data):
+        keys = subjects(key[0], data)
+        keys.add(key[1])
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (number, data, keys)
+        for subject in keys:
+            self._index[subject].add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        _, _, keys = self._entries.pop(key)
+        for subject in keys:
+            entries = self._index.get(subject)
+            if entries is not None:
+                entries.discard(key)
+                if not entries:
+                    del self._index[subject]
+
+    def number(self, kind, search):
+        """
+        The number of the head block when a cached answer was fetched
+
+        :param str kind: the kind of answer
+        :param str search: UID or public key
+        :return: the block number, None if the answer is not cached or was fetched before the first refresh
+        :rtype: int
+        """
+        entry = self._entries.get((kind, search))
+        return entry[0] if entry is not None else None
+
+    def invalidate(self, keys):
+        """
+        Drop the answers about pubkeys or uids
+
+        :param keys: the pubkeys and uids
+        :return: the number of answers dropped
+        :rtype: int
+        """
+        self._generation += 1
+        dropped = set()
+        for subject in keys:
+            dropped.update(self._index.get(subject, ()))
+        for key in dropped:
+            self._drop(key)
+        return len(dropped)
+
+    def clear(self):
+        """
+        Drop every answer
+
+        :return: the number of answers dropped
+        :rtype: int
+        """
+        self._generation += 1
+        dropped = len(self._entries)
+        self._entries.clear()
+        self._index.clear()
+        return dropped
+
+    def apply_block(self, block):
+        """
+        Move the head to a new block, received from the ws/block websocket for example.
+        In selective mode, only the answers touched by the block are dropped if it follows the head.
+        Otherwise, as after a gap or a fork, every answer is dropped.
+
+        :param dict block: the block, as answered by blockchain.block
+        :return: the number of answers dropped
+        :rtype: int
+        """
+        if block["number"] == self.head and block["hash"] == self.head_hash:
+            return 0
+        follows = self.head is not None and block["number"] == self.head + 1 \
+            and block["previousHash"] == self.head_hash
+        if self.selective and follows:
+            dropped = self.invalidate(touched(block))
+        else:
+            dropped = self.clear()
+        self.head, self.head_hash = block["number"], block["hash"]
+        logger.debug("WoT cache at block {0} : {1} answers dropped, {2} kept"
+                     .format(self.head, dropped, len(self._entries)))
+        return dropped
+
+    async def refresh(self):
+        """
+        Read the current block of the node and move the head to it.
+        In selective mode, the blocks since the head are read to drop only the answers they touch.
+        Concurrent refreshes share the same requests.
+
+        :return: the number of answers dropped
+        :rtype: int
+        """
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._refresh())
+        task = self._refreshing
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if task.done() and self._refreshing is task:
+                self._refreshing = None
+
+    async def _refresh(self):
+        current = await self._call(blockchain.current)
+        self._refreshed = time.monotonic()
+        blocks = []
+        # the blocks between the head and the current one, for a selective invalidation
+        if self.selective and self.head is not None:
+            missing = current["number"] - self.head - 1
+            if 0 < missing <= self.max_gap:
+                blocks = await self._call(blockchain.blocks, missing, self.head + 1)
+        return sum(self.apply_block(block) for block in blocks + [current])
@@ -1,3 +1,28 @@
-from .signing_key import SigningKey, ScryptParams
-from .verifying_key import VerifyingKey
-from .encryption_key import SecretKey, PublicKey
\ No newline at end of file
+import importlib
+import sys
+
+# the keys classes are imported on first access, so that importing duniterpy.key.base58
+# does not load libnacl and pylibscrypt
+_EXPORTS = {
+    "SigningKey": "signing_key",
+    "ScryptParams": "signing_key",
+    "VerifyingKey": "verifying_key",
+    "SecretKey": "encryption_key",
+    "PublicKey": "encryption_key",
+}
+
+if sys.version_info < (3, 7):
+    # module __getattr__ (PEP 562) is not available
+    from .signing_key import SigningKey, ScryptParams
+    from .verifying_key import VerifyingKey
+    from .encryption_key import SecretKey, PublicKey
+else:
+    def __getattr__(name):
+        try:
+            module = importlib.import_module("." + _EXPORTS[name], __name__)
+        except KeyError:
+            raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+        return getattr(module, name)
+
+    def __dir__():
+        return sorted(list(globals()) + list(_EXPORTS))
@@ -3,7 +3,9 @@ import base58
 class Base58Encoder(object):
     @staticmethod
     def encode(data):
-        return base58.b58encode(data)
+        encoded = base58.b58encode(data)
+        # base58 >= 2.0 returns bytes
+        return encoded.decode("ascii") if isinstance(encoded, bytes) else encoded
 
     @staticmethod
     def decode(data):
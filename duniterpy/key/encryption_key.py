@@ -3,6 +3,8 @@ duniter public and private keys
 
 @author: inso
 """
+import collections
+import threading
 
 import libnacl.public
 from pylibscrypt import scrypt
@@ -16,10 +18,12 @@ SCRYPT_PARAMS = {'N': 4096,
                  'r': 16,
                  'p': 1
                  }
+# number of shared keys kept by a secret key, one per correspondent
+BOX_CACHE_SIZE = 1024
 
 
 class SecretKey(libnacl.public.SecretKey):
-    def __init__(self, salt, password):
+    def __init__(self, salt, password, box_cache_size=BOX_CACHE_SIZE):
         salt = _ensure_bytes(salt)
         password = _ensure_bytes(password)
         seed = scrypt(password, salt,
@@ -28,21 +32,89 @@ class SecretKey(libnacl.public.SecretKey):
 
         super().__init__(seed)
         self.public_key = PublicKey(Base58Encoder.encode(self.pk))
+        self.box_cache_size = box_cache_size
+        # the boxes hold the shared key with each correspondent (a Curve25519 scalar multiplication),
+        # the least recently used ones are dropped first
+        self._boxes = collections.OrderedDict()
+        self._boxes_lock = threading.Lock()
+
+    def box(self, pubkey):
+        """
+        The box of the shared key with a correspondent, computed once and cached
+
+        :param str pubkey: the base58 public key of the correspondent
+        :rtype: libnacl.public.Box
+        """
+        with self._boxes_lock:
+            box = self._boxes.get(pubkey)
+            if box is not None:
+                self._boxes.move_to_end(pubkey)
+                return box
+        box = libnacl.public.Box(self, PublicKey(pubkey))
+        with self._boxes_lock:
+            self._boxes[pubkey] = box
+            while len(self._boxes) > self.box_cache_size:
+                self._boxes.popitem(last=False)
+        return box
+
+    def clear_boxes(self):
+        """
+        Forget the cached shared keys
+        """
+        with self._boxes_lock:
+            self._boxes.clear()
 
     def encrypt(self, pubkey, noonce, text):
         text_bytes = _ensure_bytes(text)
         noonce_bytes = _ensure_bytes(noonce)
-        recipient_pubkey = PublicKey(pubkey)
-        crypt_bytes = libnacl.public.Box(self, recipient_pubkey).encrypt(text_bytes, noonce_bytes)
+        crypt_bytes = self.box(pubkey).encrypt(text_bytes, noonce_bytes)
         return Base58Encoder.encode(crypt_bytes[24:])
 
     def decrypt(self, pubkey, noonce, text):
-        sender_pubkey = PublicKey(pubkey)
         noonce_bytes = _ensure_bytes(noonce)
         encrypt_bytes = Base58Encoder.decode(text)
-        decrypt_bytes = libnacl.public.Box(self, sender_pubkey).decrypt(encrypt_bytes, noonce_bytes)
+        decrypt_bytes = self.box(pubkey).decrypt(encrypt_bytes, noonce_bytes)
         return decrypt_bytes.decode('utf-8')
 
+    def encrypt_many(self, messages, executor=None, chunk_size=256):
+        """
+        Encrypt many messages, reusing the shared key of each recipient
+
+        :param messages: the (pubkey, noonce, text) of the messages
+        :param concurrent.futures.Executor executor: a thread pool to spread the messages over,
+            None to encrypt them in the calling thread
+        :param int chunk_size: the number of messages of a task of the pool
+        :return: the encrypted messages, in the order of the messages
+        :rtype: list[str]
+        """
+        return self._map(self.encrypt, messages, executor, chunk_size)
+
+    def decrypt_many(self, messages, executor=None, chunk_size=256):
+        """
+        Decrypt many messages, reusing the shared key of each sender
+
+        :param messages: the (pubkey, noonce, text) of the messages
+        :param concurrent.futures.Executor executor: a thread pool to spread the messages over,
+            None to decrypt them in the calling thread
+        :param int chunk_size: the number of messages of a task of the pool
+        :return: the decrypted messages, in the order of the messages
+        :rtype: list[str]
+        """
+        return self._map(self.decrypt, messages, executor, chunk_size)
+
+    @staticmethod
+    def _map(func, messages, executor, chunk_size):
+        messages = list(messages)
+        if executor is None:
+            return [func(*message) for message in messages]
+
+        def run(chunk):
+            return [func(*message) for message in chunk]
+
+        # libnacl releases the GIL in the primitives, the threads run them in parallel
+        chunks = [messages[i:i + chunk_size] for i in range(0, len(messages), chunk_size)]
+        return [result for results in executor.map(run, chunks) for result in results]
+
 
 class PublicKey(libnacl.public.PublicKey):
     def __init__(self, pubkey):
@@ -30,7 +30,9 @@ class VerifyingKey(libnacl.sign.Verifier):
         :return:
         """
         signature = base64.b64decode(document.signatures[0])
-        prepended = signature + bytes(document.raw(**kwargs), 'ascii')
+        # a block is signed over its inner hash and nonce only
+        signed = document.signed_part() if hasattr(document, "signed_part") else document.raw(**kwargs)
+        prepended = signature + bytes(signed, 'ascii')
 
         try:
             self.verify(prepended)
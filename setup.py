@@ -69,6 +69,7 @@ setup(
         "Topic :: Communications",
     ],
     install_requires=install_requires,
+    extras_require={"numpy": ["numpy"]},
     dependency_links=dependency_links
 
 )
\ No newline at end of file
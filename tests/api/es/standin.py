@@ -0,0 +1,106 @@
+"""
+A local stand-in of a Cesium+ pod : the _mget, _search and _search/scroll requests of an index of documents
+"""
+import collections
+import json
+
+from aiohttp import web
+
+
+class StandinPod:
+    def __init__(self, documents, index="user/profile"):
+        """
+        :param dict documents: the sources of the documents, by id
+        :param str index: the index and type served
+        """
+        self.documents = documents
+        self.index = index
+        self.requests = collections.Counter()
+        # the number of next requests answered by a 503 error
+        self.failures = 0
+        # the remaining hits of the scroll contexts, by scroll id
+        self.scrolls = {}
+        self.port = None
+        self._runner = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_route("POST", "/{0}/_mget".format(self.index), self.mget)
+        app.router.add_route("POST", "/{0}/_search".format(self.index), self.search)
+        app.router.add_route("POST", "/_search/scroll", self.scroll)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self.port
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        if self.failures > 0:
+            self.failures -= 1
+            self.requests["failed"] += 1
+            return web.Response(body=b"Service unavailable", status=503)
+        return await handler(request)
+
+    def _source(self, doc_id, fields):
+        source = self.documents[doc_id]
+        return {k: v for k, v in source.items() if k in fields} if fields else dict(source)
+
+    async def mget(self, request):
+        self.requests["_mget"] += 1
+        body = await request.json()
+        fields = request.query["_source"].split(",") if "_source" in request.query else None
+        docs = []
+        for doc_id in body["ids"]:
+            doc = {"_index": self.index.split("/")[0], "_type": self.index.split("/")[1], "_id": doc_id,
+                   "found": doc_id in self.documents}
+            if doc["found"]:
+                doc["_source"] = self._source(doc_id, fields)
+            docs.append(doc)
+        return web.json_response({"docs": docs})
+
+    def _hits(self, ids, fields, sort_values=False):
+        hits = []
+        for doc_id in ids:
+            hit = {"_id": doc_id, "_source": self._source(doc_id, fields)}
+            if sort_values:
+                hit["sort"] = [doc_id]
+            hits.append(hit)
+        return hits
+
+    async def search(self, request):
+        self.requests["_search"] += 1
+        body = await request.json()
+        ids = sorted(self.documents)
+        match = body["query"].get("prefix", {}).get("title")
+        if match is not None:
+            ids = [i for i in ids if self.documents[i].get("title", "").startswith(match)]
+        size = body["size"]
+        total = len(ids)
+        if "sort" in body:
+            # sorted by id
+            if "search_after" in body:
+                ids = [i for i in ids if i > body["search_after"][0]]
+            return web.json_response({"took": 1, "hits": {"total": total,
+                                                          "hits": self._hits(ids[:size], body.get("_source"), True)}})
+        data = {"took": 1, "hits": {"total": {"value": total, "relation": "eq"},
+                                    "hits": self._hits(ids[:size], body.get("_source"))}}
+        if "scroll" in request.query:
+            scroll_id = "scroll{0}".format(len(self.scrolls))
+            self.scrolls[scroll_id] = (ids[size:], size, body.get("_source"), len(ids))
+            data["_scroll_id"] = scroll_id
+        return web.json_response(data)
+
+    async def scroll(self, request):
+        self.requests["scroll"] += 1
+        body = await request.json()
+        if body["scroll_id"] not in self.scrolls:
+            return web.json_response({"error": "No search context found"}, status=404)
+        ids, size, fields, total = self.scrolls[body["scroll_id"]]
+        self.scrolls[body["scroll_id"]] = (ids[size:], size, fields, total)
+        return web.json_response({"_scroll_id": body["scroll_id"], "took": 1,
+                                  "hits": {"total": total, "hits": self._hits(ids[:size], fields)}})
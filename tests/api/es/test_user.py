@@ -0,0 +1,123 @@
+import asyncio
+import unittest
+
+import aiohttp
+
+from duniterpy.api.bma import ConnectionHandler
+from duniterpy.api.es import api, subscription, user
+from duniterpy.api.pool import NodePool
+from duniterpy.api.retry import RetryPolicy
+from tests.api.es.standin import StandinPod
+
+
+async def collect(iterator):
+    items = []
+    async for item in iterator:
+        items.append(item)
+    return items
+
+
+class TestUserProfiles(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.documents = {"pubkey{0:04d}".format(i): {"title": "user{0:04d}".format(i), "city": "Paris"}
+                          for i in range(1200)}
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_pods(self, test, count=1):
+        pods = [StandinPod(self.documents) for _ in range(count)]
+
+        async def go():
+            ports = [await pod.start() for pod in pods]
+            try:
+                async with aiohttp.ClientSession() as session:
+                    handlers = [ConnectionHandler("http", "ws", "127.0.0.1", port, session=session)
+                                for port in ports]
+                    return await test(pods, handlers)
+            finally:
+                for pod in pods:
+                    await pod.stop()
+
+        self.loop.run_until_complete(go())
+
+    def test_profile(self):
+        async def test(pods, handlers):
+            self.assertEqual(await user.profile(handlers[0], "pubkey0001"), self.documents["pubkey0001"])
+            self.assertEqual(await user.profile(handlers[0], "pubkey0001", ["title"]), {"title": "user0001"})
+            self.assertIsNone(await user.profile(handlers[0], "unknown"))
+
+        self.run_pods(test)
+
+    def test_retried(self):
+        async def test(pods, handlers):
+            pods[0].failures = 1
+            with self.assertRaises(ValueError):
+                await user.profile(handlers[0], "pubkey0001")
+            handlers[0].retry_policy = RetryPolicy(attempts=3, backoff=0.01, jitter=0)
+            pods[0].failures = 2
+            self.assertEqual(await user.profile(handlers[0], "pubkey0001"), self.documents["pubkey0001"])
+            hits = await collect(user.iter_profiles(handlers[0], page_size=500))
+            self.assertEqual(len(hits), len(self.documents))
+            self.assertEqual(pods[0].requests["failed"], 3)
+
+        self.run_pods(test)
+
+    def test_profiles(self):
+        async def test(pods, handlers):
+            pubkeys = sorted(self.documents) + ["unknown", "pubkey0001"]
+            cache = {}
+            profiles = await user.profiles(handlers, pubkeys, fields=["title"], chunk_size=500, cache=cache)
+            self.assertEqual(profiles, {pubkey: {"title": data["title"]} for pubkey, data in self.documents.items()})
+            # the chunks are spread over the pods
+            self.assertEqual([pod.requests["_mget"] for pod in pods], [2, 1])
+            self.assertIsNone(cache["unknown"])
+
+            # the cached pubkeys are not requested
+            profiles = await user.profiles(handlers, ["pubkey0002", "unknown"], cache=cache)
+            self.assertEqual(profiles, {"pubkey0002": {"title": "user0002"}})
+            self.assertEqual(sum(pod.requests["_mget"] for pod in pods), 3)
+
+            pool = NodePool(handlers, hedge=False)
+            profiles = await user.profiles(pool, ["pubkey0003", "pubkey0004"], chunk_size=1)
+            self.assertEqual(profiles["pubkey0004"], self.documents["pubkey0004"])
+            self.assertEqual(sum(pod.requests["_mget"] for pod in pods), 5)
+
+        self.run_pods(test, count=2)
+
+    def test_search_after(self):
+        async def test(pods, handlers):
+            data = await user.search(handlers[0], {"prefix": {"title": "user001"}})
+            self.assertEqual(len(data["hits"]["hits"]), 10)
+
+            hits = await collect(user.iter_profiles(NodePool(handlers, hedge=False), sort=["_id"], page_size=500))
+            self.assertEqual([hit["_id"] for hit in hits], sorted(self.documents))
+            self.assertEqual(sum(pod.requests["_search"] for pod in pods), 1 + 3)
+
+            iterator = user.iter_profiles(handlers[0], {"prefix": {"title": "user01"}}, sort=["_id"],
+                                          page_size=30, fields=["title"], limit=45)
+            hits = await collect(iterator)
+            self.assertEqual([hit["_id"] for hit in hits], ["pubkey{0:04d}".format(i) for i in range(100, 145)])
+            self.assertEqual(hits[0]["_source"], {"title": "user0100"})
+            self.assertEqual(iterator.total, 100)
+
+        self.run_pods(test, count=2)
+
+    def test_scroll(self):
+        async def test(pods, handlers):
+            iterator = user.iter_profiles(handlers[0], page_size=500)
+            hits = await collect(iterator)
+            self.assertEqual([hit["_id"] for hit in hits], sorted(self.documents))
+            self.assertEqual(iterator.total, 1200)
+            self.assertEqual(pods[0].requests["_search"], 1)
+            self.assertEqual(pods[0].requests["scroll"], 2)
+
+            with self.assertRaises(ValueError):
+                await api.scroll(handlers[0], "expired")
+            with self.assertRaises(ValueError):
+                subscription.iter_records(NodePool(handlers))
+
+        self.run_pods(test)
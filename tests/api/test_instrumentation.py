@@ -0,0 +1,125 @@
+import unittest
+
+import aiohttp
+import jsonschema
+
+from duniterpy.api import instrumentation
+from duniterpy.api.bma.blockchain import current, block
+from duniterpy.api.errors import DuniterError
+from duniterpy.api.instrumentation import Event, Histogram, MetricsRegistry
+from duniterpy.documents import BMAEndpoint
+from tests.api.webserver import WebFunctionalSetupMixin, web
+
+
+class TestHistogram(unittest.TestCase):
+    def test_quantiles(self):
+        histogram = Histogram((1, 2, 5, 10))
+        for value in range(1, 101):
+            histogram.observe(value / 10)
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.counts, [10, 10, 30, 50, 0])
+        self.assertAlmostEqual(histogram.sum, 505)
+        self.assertAlmostEqual(histogram.quantile(0.5), 5)
+        self.assertAlmostEqual(histogram.quantile(0.95), 9.5)
+        self.assertAlmostEqual(histogram.quantile(1), 10)
+        self.assertIsNone(Histogram().quantile(0.5))
+
+    def test_overflow(self):
+        histogram = Histogram((1,))
+        histogram.observe(3)
+        histogram.observe(5)
+        self.assertEqual(histogram.counts, [0, 2])
+        self.assertEqual(histogram.quantile(1), 5)
+        self.assertEqual(histogram.snapshot()["buckets"], [(1, 0), (float("inf"), 2)])
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_route(self):
+        self.assertEqual(instrumentation.route("blockchain", "/block/12"), "blockchain/block")
+        self.assertEqual(instrumentation.route("wot", "/members"), "wot/members")
+        self.assertEqual(instrumentation.route("node", ""), "node")
+
+    def test_record(self):
+        registry = MetricsRegistry()
+        route = "blockchain/block"
+        registry.record(Event(instrumentation.REQUEST, "GET", route, "u", 200, 0.02, None, None))
+        registry.record(Event(instrumentation.REQUEST, "GET", route, "u", 500, 0.3, None, None))
+        registry.record(Event(instrumentation.REQUEST, "GET", route, "u", None, 15., None, TimeoutError()))
+        registry.record(Event(instrumentation.RETRY, "GET", route, "u", None, 0., None, None))
+        registry.record(Event(instrumentation.DECODE, "GET", route, "u", 200, 0.001, 1234, None))
+        registry.record(Event(instrumentation.VALIDATE, "GET", route, "u", 200, 0.002, None, None))
+        snapshot = registry.snapshot()[route]
+        self.assertEqual(snapshot["requests"], 3)
+        self.assertEqual(snapshot["errors"], 2)
+        self.assertEqual(snapshot["statuses"], {200: 1, 500: 1})
+        self.assertEqual(snapshot["retries"], 1)
+        self.assertEqual(snapshot["bytes"], 1234)
+        self.assertEqual(snapshot["latency"]["count"], 3)
+        self.assertEqual(snapshot["latency"]["max"], 15.)
+        self.assertEqual(snapshot["decode"]["count"], 1)
+        self.assertEqual(snapshot["validate"]["sum"], 0.002)
+        registry.reset()
+        self.assertEqual(registry.snapshot(), {})
+
+
+class TestInstrumentedRequests(WebFunctionalSetupMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.events = []
+        instrumentation.add_hook(self.events.append)
+
+    def tearDown(self):
+        instrumentation.remove_hook(self.events.append)
+        super().tearDown()
+
+    def test_events(self):
+        async def handler(request):
+            await request.read()
+            return web.Response(body=b'{}', content_type='application/json')
+
+        async def go():
+            _, srv, port, url = await self.create_server('GET', '/blockchain/block/100', handler)
+            with self.assertRaises(jsonschema.exceptions.ValidationError):
+                async with aiohttp.ClientSession() as session:
+                    connection = next(BMAEndpoint("127.0.0.1", None, None, port).conn_handler(session))
+                    await block(connection, 100)
+
+        self.loop.run_until_complete(go())
+        # the validation failed, so no VALIDATE event
+        self.assertEqual([e.kind for e in self.events], [instrumentation.REQUEST, instrumentation.DECODE])
+        request, decode = self.events
+        self.assertEqual(request.route, "blockchain/block")
+        self.assertEqual(request.method, "GET")
+        self.assertEqual(request.status, 200)
+        self.assertTrue(request.url.endswith("/blockchain/block/100"))
+        self.assertEqual(decode.route, "blockchain/block")
+        self.assertEqual(decode.size, 2)
+
+    def test_error_status(self):
+        async def handler(request):
+            await request.read()
+            return web.Response(body=b'{"ucode": 2010, "message": "No current block"}', status=404,
+                                content_type='application/json')
+
+        registry = MetricsRegistry()
+        instrumentation.add_hook(registry.record)
+
+        async def go():
+            _, srv, port, url = await self.create_server('GET', '/blockchain/current', handler)
+            async with aiohttp.ClientSession() as session:
+                connection = next(BMAEndpoint("127.0.0.1", None, None, port).conn_handler(session))
+                with self.assertRaises(DuniterError):
+                    await current(connection)
+
+        try:
+            self.loop.run_until_complete(go())
+        finally:
+            instrumentation.remove_hook(registry.record)
+        metrics = registry.snapshot()["blockchain/current"]
+        self.assertEqual(metrics["requests"], 1)
+        self.assertEqual(metrics["errors"], 1)
+        self.assertEqual(metrics["statuses"], {404: 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
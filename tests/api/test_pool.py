@@ -0,0 +1,94 @@
+import asyncio
+import unittest
+
+from duniterpy.api.errors import DuniterError
+from duniterpy.api.pool import NodePool
+
+
+class FakeNode:
+    def __init__(self, name, latency=0., error=None):
+        self.name = name
+        self.latency = latency
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+
+
+async def fake_read(node, value):
+    node.calls += 1
+    try:
+        await asyncio.sleep(node.latency)
+    except asyncio.CancelledError:
+        node.cancelled += 1
+        raise
+    if node.error:
+        raise node.error
+    return node.name, value
+
+
+class TestNodePool(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_round_robin(self):
+        nodes = [FakeNode("a"), FakeNode("b"), FakeNode("c")]
+        pool = NodePool(nodes)
+
+        async def go():
+            return [await pool.request(fake_read, i) for i in range(6)]
+
+        results = self.loop.run_until_complete(go())
+        self.assertEqual(results, [("a", 0), ("b", 1), ("c", 2), ("a", 3), ("b", 4), ("c", 5)])
+        self.assertEqual(pool.latencies["fake_read"].count, 6)
+
+    def test_hedged(self):
+        slow, fast = FakeNode("slow", latency=5), FakeNode("fast")
+        pool = NodePool([slow, fast], default_delay=0.05)
+
+        async def go():
+            return await asyncio.wait_for(pool.request(fake_read, 1), 2)
+
+        self.assertEqual(self.loop.run_until_complete(go()), ("fast", 1))
+        self.assertEqual(pool.hedged, 1)
+        self.assertEqual(slow.cancelled, 1)
+
+    def test_hedge_delay(self):
+        pool = NodePool([FakeNode("a")], default_delay=1, min_samples=10)
+        self.assertEqual(pool.hedge_delay("fake_read"), 1)
+        for _ in range(100):
+            pool.latencies["fake_read"].observe(0.02)
+        self.assertAlmostEqual(pool.hedge_delay("fake_read"), 0.02)
+
+    def test_failover(self):
+        broken, working = FakeNode("broken", error=OSError("refused")), FakeNode("working")
+        pool = NodePool([broken, working], hedge=False)
+
+        async def go():
+            return [await pool.request(fake_read, i) for i in range(3)]
+
+        self.assertEqual(self.loop.run_until_complete(go()), [("working", 0), ("working", 1), ("working", 2)])
+        self.assertEqual(pool.failovers, 1)
+        # the broken node is tried last once it failed
+        self.assertEqual(broken.calls, 1)
+
+    def test_all_failed(self):
+        pool = NodePool([FakeNode("a", error=OSError("a")), FakeNode("b", error=OSError("b"))])
+        with self.assertRaises(OSError):
+            self.loop.run_until_complete(pool.request(fake_read, 1))
+
+    def test_answer_error(self):
+        error = DuniterError({"ucode": 2011, "message": "Block not found"})
+        a, b = FakeNode("a", error=error), FakeNode("b")
+        pool = NodePool([a, b])
+        with self.assertRaises(DuniterError):
+            self.loop.run_until_complete(pool.request(fake_read, 1))
+        self.assertEqual(b.calls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import asyncio
+import time
+import unittest
+
+import aiohttp
+
+from duniterpy.api import instrumentation
+from duniterpy.api.bma.node import summary
+from duniterpy.api.retry import RetryPolicy
+from duniterpy.documents import BMAEndpoint
+from tests.api.webserver import WebFunctionalSetupMixin, web
+
+SUMMARY = b'{"duniter": {"software": "duniter", "version": "1.6.14", "forkWindowSize": 100}}'
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_delay(self):
+        policy = RetryPolicy(attempts=5, backoff=0.1, multiplier=2, max_backoff=0.3, jitter=0)
+        self.assertEqual([policy.delay(n) for n in range(1, 5)], [0.1, 0.2, 0.3, 0.3])
+        policy = RetryPolicy(backoff=1, jitter=0.5)
+        for _ in range(100):
+            self.assertTrue(0.5 <= policy.delay(1) <= 1)
+
+    def test_next_delay(self):
+        policy = RetryPolicy(attempts=2, backoff=0.1, jitter=0)
+        start = 0.
+        self.assertEqual(policy.next_delay(1, start, status=503), 0.1)
+        self.assertIsNone(policy.next_delay(1, start, status=404))
+        self.assertIsNone(policy.next_delay(2, start, status=503))
+        self.assertEqual(policy.next_delay(1, start, error=asyncio.TimeoutError()), 0.1)
+        self.assertIsNone(policy.next_delay(1, start, error=KeyError()))
+
+    def test_deadline(self):
+        policy = RetryPolicy(backoff=1, jitter=0, deadline=0.5)
+        start = time.perf_counter()
+        self.assertIsNone(policy.next_delay(1, start, status=503))
+        self.assertLessEqual(policy.timeout(start, 15), 0.5)
+        self.assertEqual(RetryPolicy().timeout(start, 15), 15)
+        # a used up budget never gives a timeout of 0, read by aiohttp as no timeout
+        policy = RetryPolicy(deadline=0)
+        self.assertTrue(policy.expired(start))
+        self.assertGreater(policy.timeout(start, 15), 0)
+        self.assertFalse(RetryPolicy().expired(start))
+
+    def test_bad_parameters(self):
+        with self.assertRaises(ValueError):
+            RetryPolicy(attempts=0)
+        with self.assertRaises(ValueError):
+            RetryPolicy(jitter=2)
+
+
+class TestRetriedRequests(WebFunctionalSetupMixin, unittest.TestCase):
+    def run_summary(self, statuses, policy, calls=None):
+        calls = [] if calls is None else calls
+
+        async def handler(request):
+            await request.read()
+            status = statuses[len(calls)] if len(calls) < len(statuses) else 200
+            calls.append(status)
+            if status == 200:
+                return web.Response(body=SUMMARY, content_type='application/json')
+            return web.Response(body=b'Service unavailable', status=status)
+
+        async def go():
+            _, srv, port, url = await self.create_server('GET', '/node/summary', handler)
+            async with aiohttp.ClientSession() as session:
+                connection = next(BMAEndpoint("127.0.0.1", None, None, port).conn_handler(session))
+                connection.retry_policy = policy
+                return await summary(connection)
+
+        return self.loop.run_until_complete(go()), calls
+
+    def test_retried(self):
+        events = []
+        instrumentation.add_hook(events.append)
+        try:
+            data, calls = self.run_summary([503, 502], RetryPolicy(attempts=3, backoff=0.01, jitter=0))
+        finally:
+            instrumentation.remove_hook(events.append)
+        self.assertEqual(data["duniter"]["version"], "1.6.14")
+        self.assertEqual(calls, [503, 502, 200])
+        self.assertEqual([e.kind for e in events if e.kind != instrumentation.DECODE and
+                          e.kind != instrumentation.VALIDATE],
+                         ["request", "retry", "request", "retry", "request"])
+
+    def test_attempts_exhausted(self):
+        with self.assertRaises(ValueError):
+            self.run_summary([503, 503, 503], RetryPolicy(attempts=2, backoff=0.01, jitter=0))
+
+    def test_deadline_passed_while_waiting(self):
+        policy = RetryPolicy(attempts=3, jitter=0, deadline=0.1)
+        # a sleep running longer than the time left
+        policy.next_delay = lambda *args, **kwargs: 0.15
+        calls = []
+        with self.assertRaises(ValueError) as context:
+            self.run_summary([503, 503], policy, calls)
+        # the answer of the last attempt is not retried after the deadline
+        self.assertEqual(calls, [503])
+        self.assertIn("503", str(context.exception))
+
+    def test_no_policy(self):
+        with self.assertRaises(ValueError):
+            self.run_summary([503], None)
+
+
+if __name__ == '__main__':
+    unittest.main()
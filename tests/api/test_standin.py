@@ -0,0 +1,105 @@
+import asyncio
+import json
+import unittest
+
+import aiohttp
+
+from benchmarks import fixtures
+from benchmarks.standin import StandinNode
+from duniterpy.api.bma import blockchain, network, node, tx, ud, wot, ws
+from duniterpy.api.errors import DuniterError
+from duniterpy.documents import BMAEndpoint, Block
+from duniterpy.helpers import crawler
+
+
+class TestStandinNode(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.blocks = fixtures.chain(10, members_count=50, joiners=2, transactions=3)
+        # a dividend in the last blocks
+        self.blocks[-2].ud = 1000
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_node(self, test, **kwargs):
+        node_ = StandinNode(self.blocks, **kwargs)
+
+        async def go():
+            port = await node_.start()
+            try:
+                async with aiohttp.ClientSession() as session:
+                    connection = next(BMAEndpoint("127.0.0.1", None, None, port).conn_handler(session))
+                    return await test(node_, connection)
+            finally:
+                await node_.stop()
+
+        return self.loop.run_until_complete(go())
+
+    def test_routes(self):
+        async def test(standin, connection):
+            summary = await node.summary(connection)
+            self.assertEqual(summary["duniter"]["software"], "duniter")
+            current = await blockchain.current(connection)
+            self.assertEqual(current["number"], 10)
+            block = Block.from_bma_json(await blockchain.block(connection, 3))
+            self.assertEqual(block.signed_raw(), self.blocks[2].signed_raw())
+            self.assertEqual([b["number"] for b in await blockchain.blocks(connection, 3, 8)], [8, 9, 10])
+
+            issuer = self.blocks[0].transactions[0].issuers[0]
+            history = await tx.history(connection, issuer)
+            self.assertIn(self.blocks[0].transactions[0].sha_hash, [t["hash"] for t in history["history"]["sent"]])
+            window = await tx.blocks(connection, issuer, 2, 4)
+            self.assertTrue(all(2 <= t["block_number"] <= 4 for t in window["history"]["sent"]))
+
+            members = await wot.members(connection)
+            newcomer = self.blocks[0].identities[0]
+            self.assertIn(newcomer.pubkey, [m["pubkey"] for m in members["results"]])
+            lookup = await wot.lookup(connection, newcomer.uid)
+            self.assertEqual(lookup["results"][0]["pubkey"], newcomer.pubkey)
+            requirements = await wot.requirements(connection, newcomer.pubkey)
+            self.assertEqual(requirements["identities"][0]["uid"], newcomer.uid)
+            with self.assertRaises(DuniterError):
+                await wot.requirements(connection, "unknown")
+
+            dividends = await ud.history(connection, newcomer.pubkey)
+            self.assertEqual([d["block_number"] for d in dividends["history"]["history"]], [9])
+
+            peering = await network.peering(connection)
+            self.assertEqual(peering["endpoints"], ["BASIC_MERKLED_API 127.0.0.1 {0}".format(standin.port)])
+            peers = await crawler.fetch_peers(connection)
+            self.assertEqual(peers[0].pubkey, peering["pubkey"])
+
+            async with ws.block(connection) as websocket:
+                message = await websocket.receive()
+                self.assertEqual(json.loads(message.data)["number"], 10)
+                new_block = fixtures.chain(11, members_count=50)[10]
+                await standin.push_block(new_block)
+                message = await websocket.receive()
+                self.assertEqual(json.loads(message.data)["number"], 11)
+            self.assertEqual(standin.requests["/blockchain/block/{number}"], 1)
+
+        self.run_node(test)
+
+    def test_latency_errors_padding(self):
+        async def test(standin, connection):
+            start = self.loop.time()
+            results = await asyncio.gather(*[node.summary(connection) for _ in range(20)], return_exceptions=True)
+            elapsed = self.loop.time() - start
+            return standin, results, elapsed
+
+        standin, results, elapsed = self.run_node(test, latency=0.05, error_rate=0.5, padding=1000)
+        errors = [r for r in results if isinstance(r, Exception)]
+        self.assertEqual(len(errors), standin.errors["/node/summary"])
+        self.assertTrue(0 < len(errors) < 20)
+        self.assertEqual(len(results[results.index(next(r for r in results if isinstance(r, dict)))]["padding"]),
+                         1000)
+        # the requests are served concurrently
+        self.assertGreaterEqual(elapsed, 0.05)
+        self.assertLess(elapsed, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
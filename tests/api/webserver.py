@@ -29,12 +29,13 @@ class WebFunctionalSetupMixin:
         s.close()
         return port
 
-    async def create_server(self, method, path, handler=None, ssl_ctx=None):
+    async def create_server(self, method, path, handler=None, ssl_ctx=None, port=None):
         app = web.Application()
         if handler:
             app.router.add_route(method, path, handler)
 
-        port = self.find_unused_port()
+        if port is None:
+            port = self.find_unused_port()
         self.handler = app.make_handler(
             keep_alive_on=False,
             access_log=log.access_logger)
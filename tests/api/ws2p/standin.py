@@ -0,0 +1,112 @@
+"""
+A local stand-in of a WS2P node : it authenticates the connections, answers the block requests from a list
+of blocks and pushes documents to the authenticated connections
+"""
+import asyncio
+import collections
+import json
+
+from aiohttp import web
+
+from benchmarks.standin import bma_block
+from duniterpy.api.ws2p import auth
+
+
+class StandinWS2PNode:
+    def __init__(self, blocks, key, currency, delays=None, corrupt=None):
+        """
+        :param list[duniterpy.documents.Block] blocks: the chain, sorted by number
+        :param duniterpy.key.SigningKey key: the key of the node
+        :param str currency: the currency
+        :param dict delays: the delay before answering each kind of request, in seconds
+        :param str corrupt: the authentication message sent with an invalid signature, CONNECT, ACK or OK
+        """
+        self.blocks = blocks
+        self.key = key
+        self.currency = currency
+        self.delays = delays or {}
+        self.corrupt = corrupt
+        self.requests = collections.Counter()
+        # authenticated connections, with the pubkey of the remote side
+        self.connections = {}
+        self.port = None
+        self._runner = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        app = web.Application()
+        app.router.add_route("GET", "/", self.handler)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self.port
+
+    async def stop(self):
+        for ws in list(self.connections):
+            await ws.close()
+        await self._runner.cleanup()
+
+    async def push(self, name, field, document):
+        """
+        Push a json document to the authenticated connections
+        """
+        for ws in list(self.connections):
+            await ws.send_str(json.dumps({"body": {"name": name, field: document}}))
+
+    def _sign(self, kind, challenge):
+        signature = auth.sign(self.key, kind, self.currency, challenge)
+        if kind == self.corrupt:
+            signature = auth.sign(self.key, kind, self.currency, challenge + "x")
+        return signature
+
+    async def handler(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        challenge = auth.new_challenge()
+        remote = {}
+        await ws.send_str(json.dumps({"auth": auth.CONNECT, "pub": self.key.pubkey, "challenge": challenge,
+                                      "sig": self._sign(auth.CONNECT, challenge)}))
+        tasks = set()
+        try:
+            async for message in ws:
+                data = json.loads(message.data)
+                if data.get("auth") == auth.CONNECT:
+                    if not auth.verify(auth.CONNECT, self.currency, data["pub"], data["challenge"], data["sig"]):
+                        break
+                    remote.update(pub=data["pub"], challenge=data["challenge"])
+                    await ws.send_str(json.dumps({"auth": auth.ACK, "pub": self.key.pubkey,
+                                                  "sig": self._sign(auth.ACK, data["challenge"])}))
+                elif data.get("auth") == auth.ACK:
+                    if not auth.verify(auth.ACK, self.currency, remote["pub"], challenge, data["sig"]):
+                        break
+                    await ws.send_str(json.dumps({"auth": auth.OK, "sig": self._sign(auth.OK, challenge)}))
+                elif data.get("auth") == auth.OK:
+                    if not auth.verify(auth.OK, self.currency, remote["pub"], remote["challenge"], data["sig"]):
+                        break
+                    self.connections[ws] = remote["pub"]
+                elif "reqId" in data and ws in self.connections:
+                    tasks.add(asyncio.ensure_future(self.answer(ws, data)))
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.connections.pop(ws, None)
+        await ws.close()
+        return ws
+
+    async def answer(self, ws, data):
+        name, params = data["body"]["name"], data["body"]["params"]
+        self.requests[name] += 1
+        await asyncio.sleep(self.delays.get(name, 0))
+        by_number = {block.number: block for block in self.blocks}
+        if name == "CURRENT":
+            body = bma_block(self.blocks[-1])
+        elif name == "BLOCK_BY_NUMBER" and params["number"] in by_number:
+            body = bma_block(by_number[params["number"]])
+        elif name == "BLOCKS_CHUNK":
+            first = params["fromNumber"]
+            body = [bma_block(by_number[n]) for n in range(first, first + params["count"]) if n in by_number]
+        else:
+            await ws.send_str(json.dumps({"resId": data["reqId"], "err": "Unknown request or block"}))
+            return
+        await ws.send_str(json.dumps({"resId": data["reqId"], "body": body}))
@@ -0,0 +1,143 @@
+import asyncio
+import time
+import unittest
+
+import aiohttp
+
+from benchmarks import fixtures, standin
+from duniterpy.api.bma import ConnectionHandler
+from duniterpy.api.ws2p import WS2PConnection, WS2PError, auth, client
+from duniterpy.documents import Block, Certification, Identity, Membership, Peer, Transaction
+from duniterpy.key import SigningKey
+from tests.api.ws2p.standin import StandinWS2PNode
+
+
+class TestWS2PConnection(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.node_key = SigningKey("node salt", "node password")
+        cls.key = SigningKey("client salt", "client password")
+        cls.blocks = fixtures.chain(10, members_count=50, transactions=1)
+        cls.currency = cls.blocks[0].currency
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_node(self, test, **kwargs):
+        node = StandinWS2PNode(self.blocks, self.node_key, self.currency, **kwargs)
+
+        async def go():
+            port = await node.start()
+            try:
+                async with aiohttp.ClientSession() as session:
+                    handler = ConnectionHandler("http", "ws", "127.0.0.1", port, session=session)
+                    return await test(node, handler)
+            finally:
+                await node.stop()
+
+        self.loop.run_until_complete(go())
+
+    def test_auth(self):
+        self.assertTrue(auth.verify(auth.ACK, "g1", self.key.pubkey, "challenge",
+                                    auth.sign(self.key, auth.ACK, "g1", "challenge")))
+        self.assertFalse(auth.verify(auth.OK, "g1", self.key.pubkey, "challenge",
+                                     auth.sign(self.key, auth.ACK, "g1", "challenge")))
+        self.assertFalse(auth.verify(auth.OK, "g1", self.key.pubkey, "challenge", "not a signature"))
+        self.assertEqual(len(auth.new_challenge()), 64)
+
+    def test_requests(self):
+        async def test(node, handler):
+            async with WS2PConnection(handler, self.key, self.currency) as ws2p:
+                self.assertEqual(ws2p.remote_pubkey, self.node_key.pubkey)
+                self.assertEqual(list(node.connections.values()), [self.key.pubkey])
+                current = await ws2p.current()
+                self.assertEqual(current.number, 10)
+                block = await ws2p.block(3)
+                self.assertEqual(block.signed_raw(), self.blocks[2].signed_raw())
+                with self.assertRaises(WS2PError):
+                    await ws2p.block(999)
+
+                # the chunks are requested at the same time over the socket
+                node.delays[client.BLOCKS_CHUNK] = 0.2
+                start = time.perf_counter()
+                blocks = await ws2p.blocks_range(1, 10, chunk_size=3)
+                self.assertLess(time.perf_counter() - start, 0.6)
+                self.assertEqual(node.requests[client.BLOCKS_CHUNK], 4)
+                self.assertEqual([b.number for b in blocks], list(range(1, 11)))
+
+        self.run_node(test)
+
+    def test_pushes(self):
+        async def test(node, handler):
+            block = self.blocks[4]
+            identity = block.identities[0]
+            certification = block.certifications[0]
+            membership = block.joiners[0]
+            transaction = block.transactions[0]
+            peering = {"version": 10, "currency": self.currency, "pubkey": self.node_key.pubkey,
+                       "block": "10-{0}".format(fixtures.block_hash(10)),
+                       "endpoints": ["WS2P 1234abcd 127.0.0.1 {0}".format(node.port)],
+                       "signature": fixtures.signature("peer")}
+            ws2p = WS2PConnection(handler, self.key, self.currency)
+            await ws2p.connect()
+            await node.push(client.BLOCK, "block", standin.bma_block(block))
+            await node.push(client.IDENTITY, "identity",
+                            {"pubkey": identity.pubkey, "uid": identity.uid, "buid": str(identity.timestamp),
+                             "sig": identity.signatures[0]})
+            await node.push(client.CERTIFICATION, "certification",
+                            {"from": certification.pubkey_from, "to": certification.pubkey_to,
+                             "buid": str(certification.timestamp), "sig": certification.signatures[0]})
+            await node.push(client.MEMBERSHIP, "membership",
+                            {"issuer": membership.issuer, "membership": "IN", "block": str(membership.membership_ts),
+                             "userid": membership.uid, "certts": str(membership.identity_ts),
+                             "signature": membership.signatures[0]})
+            await node.push(client.TRANSACTION, "transaction", standin.bma_transaction(transaction))
+            await node.push(client.PEER, "peer", peering)
+            await node.push("UNKNOWN", "document", {})
+
+            received = []
+            for _ in range(6):
+                received.append(await ws2p.receive())
+            self.assertEqual([name for name, _ in received], [client.BLOCK, client.IDENTITY, client.CERTIFICATION,
+                                                              client.MEMBERSHIP, client.TRANSACTION, client.PEER])
+            documents = [document for _, document in received]
+            self.assertIsInstance(documents[0], Block)
+            self.assertEqual(documents[0].signed_raw(), block.signed_raw())
+            self.assertIsInstance(documents[1], Identity)
+            self.assertEqual(documents[1].inline(), identity.inline())
+            self.assertIsInstance(documents[2], Certification)
+            self.assertEqual(documents[2].signed_raw(identity), certification.signed_raw(identity))
+            self.assertIsInstance(documents[3], Membership)
+            self.assertEqual(documents[3].inline(), membership.inline())
+            self.assertIsInstance(documents[4], Transaction)
+            self.assertEqual(documents[4].signed_raw(), transaction.signed_raw())
+            self.assertIsInstance(documents[5], Peer)
+            self.assertEqual(documents[5].pubkey, self.node_key.pubkey)
+
+            # the node closes the connection : the iteration ends
+            for ws in list(node.connections):
+                await ws.close()
+            items = []
+            async for item in ws2p:
+                items.append(item)
+            self.assertEqual(items, [])
+            with self.assertRaises(ConnectionError):
+                await ws2p.current()
+            await ws2p.close()
+
+        self.run_node(test)
+
+    def test_refused(self):
+        async def connect(handler, **kwargs):
+            ws2p = WS2PConnection(handler, self.key, self.currency, timeout=2, **kwargs)
+            with self.assertRaises(WS2PError):
+                await ws2p.connect()
+
+        for corrupt in (auth.CONNECT, auth.ACK, auth.OK):
+            self.run_node(lambda node, handler: connect(handler), corrupt=corrupt)
+        self.run_node(lambda node, handler: connect(handler, remote_pubkey=self.key.pubkey))
@@ -0,0 +1,96 @@
+import random
+import unittest
+
+from duniterpy.documents import Block, Transaction, MalformedDocumentError, Revocation
+from duniterpy.documents import binary
+from duniterpy.documents.peer import Peer
+from tests.documents.test_block import raw_block_zero, raw_block_with_excluded, raw_block_with_tx, \
+    negative_issuers_frame_var
+from tests.documents.test_peer import rawpeer
+from tests.documents.test_transaction import tx_compact, compact_change
+
+
+class TestBinary(unittest.TestCase):
+    def test_block_round_trip(self):
+        for raw in (raw_block_zero, raw_block_with_excluded, raw_block_with_tx, negative_issuers_frame_var):
+            block = Block.from_signed_raw(raw)
+            data = binary.dumps(block)
+            self.assertLess(len(data), len(raw))
+            decoded = binary.loads(data)
+            self.assertIsInstance(decoded, Block)
+            self.assertEqual(decoded.signed_raw(), raw)
+            self.assertEqual(binary.loads(data, lazy_conditions=True).signed_raw(), raw)
+
+    def test_block_inner_documents(self):
+        block = Block.from_signed_raw(raw_block_zero)
+        for document in block.identities + block.joiners + block.certifications:
+            decoded = binary.loads(binary.dumps(document))
+            self.assertIsInstance(decoded, type(document))
+            self.assertEqual(decoded.inline(), document.inline())
+            self.assertEqual(decoded.currency, document.currency)
+
+    def test_unsigned_documents(self):
+        block = Block.from_signed_raw(raw_block_zero)
+        documents = [binary.loads(binary.dumps(document))
+                     for document in (block, block.identities[0], block.joiners[0], block.certifications[0])]
+        documents.append(Revocation(10, block.currency, block.identities[0].pubkey, None))
+        for document in documents:
+            document.signatures = []
+            data = binary.dumps(document)
+            decoded = binary.loads(data)
+            self.assertIsInstance(decoded, type(document))
+            self.assertEqual(decoded.signatures, [])
+            self.assertEqual(binary.dumps(decoded), data)
+        # a block being forged, its inner documents signed
+        self.assertEqual(binary.loads(binary.dumps(documents[0])).raw(), block.raw())
+        self.assertEqual(binary.loads(binary.dumps(documents[1])).raw(), block.identities[0].raw())
+
+    def test_transaction_round_trip(self):
+        for compact in (tx_compact, compact_change):
+            tx = Transaction.from_compact("zeta_brousouf", compact)
+            decoded = binary.loads(binary.dumps(tx))
+            self.assertIsInstance(decoded, Transaction)
+            self.assertEqual(decoded.compact(), tx.compact())
+            self.assertEqual(decoded.signed_raw(), tx.signed_raw())
+            self.assertEqual(decoded.sha_hash, tx.sha_hash)
+
+    def test_peer_round_trip(self):
+        peer = Peer.from_signed_raw(rawpeer)
+        decoded = binary.loads(binary.dumps(peer))
+        self.assertIsInstance(decoded, Peer)
+        self.assertEqual(decoded.signed_raw(), rawpeer)
+
+    def test_unsupported_document(self):
+        with self.assertRaises(TypeError):
+            binary.dumps("not a document")
+
+    def test_malformed_data(self):
+        data = binary.dumps(Block.from_signed_raw(raw_block_zero))
+        with self.assertRaises(MalformedDocumentError):
+            binary.loads(b"XYZ" + data[3:])
+        with self.assertRaises(MalformedDocumentError):
+            binary.loads(data[:3] + bytes([binary.FORMAT_VERSION + 1]) + data[4:])
+        with self.assertRaises(MalformedDocumentError):
+            binary.loads(data[:len(data) // 2])
+        with self.assertRaises(MalformedDocumentError):
+            binary.loads(data + b"\x00")
+
+    def test_garbled_data(self):
+        rng = random.Random(42)
+        for document in (Block.from_signed_raw(raw_block_with_tx), Transaction.from_compact("g1", tx_compact)):
+            data = binary.dumps(document)
+            for length in range(len(data)):
+                with self.assertRaises(MalformedDocumentError):
+                    binary.loads(data[:length])
+            for _ in range(1000):
+                garbled = bytearray(data)
+                for _ in range(3):
+                    garbled[rng.randrange(len(garbled))] = rng.randrange(256)
+                try:
+                    binary.loads(bytes(garbled))
+                except MalformedDocumentError:
+                    pass
+
+
+if __name__ == '__main__':
+    unittest.main()
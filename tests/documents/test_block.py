@@ -3,8 +3,11 @@ Created on 12 déc. 2014
 
 @author: inso
 '''
+import base64
 import unittest
+from duniterpy.documents import MalformedDocumentError
 from duniterpy.documents.block import Block, BlockUID, block_uid
+from duniterpy.key import SigningKey, VerifyingKey
 
 raw_block = """Version: 2
 Type: Block
@@ -482,8 +485,87 @@ AywstQpC0S5iaA/YQvbz2alpP6zTYG3tjkWpxy1jgeCo028Te2V327bBZbfDGDzsjxOrF4UVmEBiGsgb
 """
         block_doc = Block.from_signed_raw(block)
         self.assertEqual(block_doc.proof_of_work(), "00000A84839226046082E2B1AD49664E382D98C845644945D133D4A90408813A")
+        self.assertEqual(block_doc.computed_inner_hash(), block_doc.inner_hash)
+        self.assertEqual(block_doc.signed_part(), """InnerHash: 310F57575EA865EF47BFA236108B2B1CAEBFBF8EF70960E32E214E413E9C836B
+Nonce: 10200000037440
+""")
 
-if __name__ == '__main__':
-    unittest.main()
+    def test_sign(self):
+        key = SigningKey("saltsalt", "passwordpassword")
+        block = Block.from_signed_raw(raw_block)
+        block.sign([key])
+        signature = base64.b64decode(block.signatures[0])
+        VerifyingKey(key.pubkey).verify(signature + block.signed_part().encode("ascii"))
+
+    def test_from_bma_json(self):
+        for raw in (raw_block_zero, raw_block_with_excluded):
+            block = Block.from_signed_raw(raw)
+            data = {
+                "version": block.version,
+                "currency": block.currency,
+                "nonce": block.noonce,
+                "number": block.number,
+                "powMin": block.powmin,
+                "time": block.time,
+                "medianTime": block.mediantime,
+                "membersCount": block.members_count,
+                "monetaryMass": 0,
+                "unitbase": block.unit_base,
+                "issuersCount": int(block.different_issuers_count),
+                "issuersFrame": int(block.issuers_frame),
+                "issuersFrameVar": int(block.issuers_frame_var),
+                "issuer": block.issuer,
+                "signature": block.signatures[0],
+                "hash": block.sha_hash,
+                "parameters": ":".join(block.parameters) if block.parameters else "",
+                "previousHash": block.prev_hash,
+                "previousIssuer": block.prev_issuer,
+                "inner_hash": block.inner_hash,
+                "dividend": block.ud,
+                "identities": [i.inline() for i in block.identities],
+                "joiners": [m.inline() for m in block.joiners],
+                "actives": [m.inline() for m in block.actives],
+                "leavers": [m.inline() for m in block.leavers],
+                "revoked": [r.inline() for r in block.revoked],
+                "excluded": block.excluded,
+                "certifications": [c.inline() for c in block.certifications],
+                "transactions": [{
+                    "version": tx.version,
+                    "currency": tx.currency,
+                    "locktime": tx.locktime,
+                    "blockstamp": str(tx.blockstamp),
+                    "blockstampTime": 1472072569,
+                    "issuers": tx.issuers,
+                    "inputs": [i.inline(tx.version) for i in tx.inputs],
+                    "unlocks": [u.inline() for u in tx.unlocks],
+                    "outputs": [o.inline() for o in tx.outputs],
+                    "comment": tx.comment,
+                    "signatures": tx.signatures,
+                    "hash": tx.sha_hash
+                } for tx in block.transactions]
+            }
+            for json_block in Block.from_bma_blocks([data]) + [Block.from_bma_json(data, lazy_conditions=True)]:
+                self.assertEqual(json_block.signed_raw(), raw)
+                self.assertEqual(json_block.computed_inner_hash(), block.computed_inner_hash())
+                self.assertEqual(json_block.blockUID, block.blockUID)
+
+        for field, corrupt in (("hash", "not a hash"), ("previousHash", "XYZ"), ("previousHash", None)):
+            corrupt_data = dict(data, **{field: corrupt})
+            with self.assertRaises(MalformedDocumentError):
+                Block.from_bma_json(corrupt_data)
+            with self.assertRaises(MalformedDocumentError):
+                Block.from_bma_blocks([data, corrupt_data])
+        corrupt_data = dict(data, joiners=["HsLShAtzXTVxeUtQd7yi5Z5Zh4zNvbu8sTEZ53nfKcqY:sig:1-XYZ:1-XYZ:alice"])
+        with self.assertRaises(MalformedDocumentError):
+            Block.from_bma_json(corrupt_data)
+
+        data["certifications"] = ["8Fi1VSTbjkXguwThF4v2ZxC5whK7pwG2vcGTkPUPjPGU:0:sig"]
+        with self.assertRaises(MalformedDocumentError):
+            Block.from_bma_json(data)
+        del data["inner_hash"]
+        with self.assertRaises(MalformedDocumentError):
+            Block.from_bma_json(data)
 
 
+if __name__ == '__main__':
+    unittest.main()
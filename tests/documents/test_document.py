@@ -0,0 +1,37 @@
+import re
+import subprocess
+import sys
+import unittest
+
+from duniterpy.documents.document import Document, LazyPattern
+
+
+class LazyDocument(Document):
+    re_lazy = LazyPattern("Lazy: ([0-9]+)\n")
+
+    fields_parsers = dict(Document.fields_parsers, Lazy=re_lazy)
+
+
+class TestLazyPattern(unittest.TestCase):
+    def test_class_attribute(self):
+        self.assertEqual(LazyDocument.re_lazy.match("Lazy: 12\n").group(1), "12")
+        # replaced by the compiled pattern on first access
+        self.assertIsInstance(LazyDocument.__dict__["re_lazy"], type(re.compile("")))
+
+    def test_dict_value(self):
+        self.assertEqual(LazyDocument.parse_field("Lazy", "Lazy: 42\n"), "42")
+        self.assertEqual(LazyDocument.parse_field("Version", "Version: 10\n"), "10")
+        pattern = LazyPattern("([a-z]+)-([0-9]+)")
+        self.assertEqual(pattern.groups, 2)
+        self.assertIsNone(pattern.fullmatch("abc-12 "))
+
+    def test_documents_import(self):
+        # documents do not load the dependencies of the api, of the keys and of the outputs grammar
+        code = "import sys, duniterpy.documents; " \
+               "print(' '.join(m for m in ('aiohttp', 'jsonschema', 'pypeg2', 'libnacl') if m in sys.modules))"
+        loaded = subprocess.check_output([sys.executable, "-c", code]).decode("ascii").strip()
+        self.assertEqual(loaded, "")
+
+
+if __name__ == '__main__':
+    unittest.main()
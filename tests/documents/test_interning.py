@@ -0,0 +1,46 @@
+import unittest
+
+from duniterpy.documents import Certification, Membership
+from duniterpy.documents import interning
+from duniterpy.documents.interning import StringTable, intern_str, intern_token
+from duniterpy.grammars.output import Pubkey
+
+
+class TestInterning(unittest.TestCase):
+
+    def test_intern_str(self):
+        pubkey = "".join(["HsLShAtzXTVxeUtQd7yi5Z5Zh4", "zNvbu8sTEZ53nfKcqY"])
+        self.assertIs(intern_str(pubkey), intern_str("HsLShAtzXTVxeUtQd7yi5Z5Zh4zNvbu8sTEZ53nfKcqY"))
+        self.assertIsNone(intern_str(None))
+
+    def test_intern_token(self):
+        pubkey = "".join(["HsLShAtzXTVxeUtQd7yi5Z5Zh4", "zNvbu8sTEZ53nfKcqY"])
+        token = intern_token(Pubkey, pubkey)
+        self.assertIs(type(token), Pubkey)
+        self.assertIs(intern_token(Pubkey, "HsLShAtzXTVxeUtQd7yi5Z5Zh4zNvbu8sTEZ53nfKcqY"), token)
+        interning.enable(False)
+        try:
+            self.assertIsNot(intern_token(Pubkey, pubkey), intern_token(Pubkey, pubkey))
+        finally:
+            interning.enable(True)
+
+    def test_parsed_documents_share_pubkeys(self):
+        cert = Certification.from_inline(10, "g1", None, "5ocqzyDMMWf1V8bsoNhWb1iNwax1e9M7VTUN6navs8of:\
+ATkjQPa4sn4LBF69jqEPzFtRdHYJs6MJQjvP8JdN7MtN:0:6TuxRcARnpo13l3cXtgPTkjJlv8DZOUvsAzmZJMbjHZbbZfDQ6MJpH9DIuH0eyG3WGc0EX/\
+046mbMGBrKKg9DQ==\n")
+        membership = Membership.from_inline(10, "g1", "IN", "ATkjQPa4sn4LBF69jqEPzFtRdHYJs6MJQjvP8JdN7MtN:\
+QTowsupV+uXrcomL44WCxbu3LQoJM2C2VPMet5Xg6gXGAHEtGRp47FfQLb2ok1+/588JiIHskCyazj3UOsmKDw==:\
+34434-00000D21F80687248A8C02F16BB19A975B4F983D:34432-00000D21F80687248A8C02F16BB19A975B4F983D:urodelus\n")
+        self.assertIs(cert.pubkey_to, membership.issuer)
+        self.assertIs(cert.currency, membership.currency)
+        self.assertIs(membership.membership_ts.sha_hash, membership.identity_ts.sha_hash)
+
+    def test_string_table(self):
+        table = StringTable()
+        first = table.id_of("HsLShAtzXTVxeUtQd7yi5Z5Zh4zNvbu8sTEZ53nfKcqY")
+        second = table.id_of("CYYjHsNyg3HMRMpTHqCJAN9McjH5BwFLmDKGV3PmCuKp")
+        self.assertEqual(table.id_of("HsLShAtzXTVxeUtQd7yi5Z5Zh4zNvbu8sTEZ53nfKcqY"), first)
+        self.assertNotEqual(first, second)
+        self.assertEqual(table.value_of(second), "CYYjHsNyg3HMRMpTHqCJAN9McjH5BwFLmDKGV3PmCuKp")
+        self.assertIn("CYYjHsNyg3HMRMpTHqCJAN9McjH5BwFLmDKGV3PmCuKp", table)
+        self.assertEqual(len(table), 2)
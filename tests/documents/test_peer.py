@@ -1,5 +1,7 @@
 import unittest
-from duniterpy.documents.peer import Peer, BMAEndpoint, UnknownEndpoint, WS2PEndpoint
+from duniterpy.documents import MalformedDocumentError
+from duniterpy.documents.peer import Peer, BMAEndpoint, UnknownEndpoint, WS2PEndpoint, SecuredBMAEndpoint, \
+    ESUserEndpoint, ESSubscribtionEndpoint, endpoint
 
 
 rawpeer = """Version: 2
@@ -92,3 +94,62 @@ class TestPeer(unittest.TestCase):
         peer = Peer.from_signed_raw(test_weird_ipv6_peer)
         rendered_peer = peer.signed_raw()
         from_rendered_peer = Peer.from_signed_raw(rendered_peer)
+
+    def test_endpoint_dispatch(self):
+        self.assertIsInstance(endpoint("BASIC_MERKLED_API g1.duniter.org 80"), BMAEndpoint)
+        self.assertIsInstance(endpoint("BMAS g1.duniter.org 443 /bma"), SecuredBMAEndpoint)
+        self.assertIsInstance(endpoint("WS2P d2edcb92 g1-test.duniter.org 20902"), WS2PEndpoint)
+        self.assertIsInstance(endpoint("ES_USER_API g1.data.duniter.fr 443"), ESUserEndpoint)
+        self.assertIsInstance(endpoint("OTHER_PROTOCOL 88.77.66.55 9001"), UnknownEndpoint)
+        self.assertIsInstance(endpoint("BMAS"), UnknownEndpoint)
+        with self.assertRaises(MalformedDocumentError):
+            endpoint("BASIC_MERKLED_API g1.duniter.org")
+
+    def test_endpoint_cached_instances(self):
+        first = endpoint("BMAS g1.duniter.org 443 /bma")
+        second = endpoint("BMAS g1.duniter.org 443 /bma")
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        first.path = "/other"
+        self.assertEqual(second.path, "/bma")
+
+    def test_endpoint_fields(self):
+        bma = endpoint("BASIC_MERKLED_API 88.77.66.55 fe80::1%eth0 9001")
+        self.assertEqual((bma.server, bma.ipv4, bma.ipv6, bma.port), ("88.77.66.55", None, "fe80::1%eth0", 9001))
+        bma = endpoint("BASIC_MERKLED_API 1::2:3:4:5:6 9001")
+        self.assertEqual((bma.server, bma.ipv4, bma.ipv6, bma.port), (None, None, "1::2:3:4:5:6", 9001))
+        bmas = endpoint("BMAS 12345 443")
+        self.assertEqual((bmas.server, bmas.port, bmas.path), ("12345", 443, ""))
+        ws2p = endpoint("WS2P d2edcb92 g1-test.duniter.org 20902 /ws2p path\n")
+        self.assertEqual((ws2p.server, ws2p.port, ws2p.path), ("g1-test.duniter.org", 20902, "/ws2p path"))
+
+    def test_endpoint_regex_equivalence(self):
+        inlines = [
+            "BASIC_MERKLED_API some.dns.name 88.77.66.55 2001:42d0:52:a00::648 9001",
+            "BASIC_MERKLED_API 88.77.66.55 9001",
+            "BASIC_MERKLED_API 88.77.66.55 ::1 9001",
+            "BASIC_MERKLED_API 1.2.3.4 host.name 80",
+            "BASIC_MERKLED_API G1.Duniter.org 80",
+            "BASIC_MERKLED_API  g1.duniter.org 80",
+            "BASIC_MERKLED_API g1.duniter.org 80\n",
+            "BMAS 443 /bma",
+            "BMAS duniter.aquilenet.fr 443",
+            "BMAS g1.duniter.org 1.2.3.4 ::1 443 /bma path",
+            "BMAS g1.duniter.org 443 4 /bma",
+            "BMAS 1 2 3 4 5",
+        ]
+        for inline in inlines:
+            cls = SecuredBMAEndpoint if inline.startswith("BMAS") else BMAEndpoint
+            match = cls.re_inline.match(inline)
+            if match is None:
+                with self.assertRaises(MalformedDocumentError, msg=inline):
+                    cls.parse_inline(inline)
+            else:
+                expected = list(match.groups())
+                expected[3] = int(expected[3])
+                if cls is SecuredBMAEndpoint:
+                    expected[4] = expected[4] or ""
+                self.assertEqual(cls.parse_inline(inline), tuple(expected), inline)
+        self.assertIsNotNone(WS2PEndpoint.re_inline.match("WS2P d2edcb92 g1-test.duniter.org 20902 /ws2p"))
+        self.assertIsNotNone(ESUserEndpoint.re_inline.match("ES_USER_API g1.data.duniter.fr 443"))
+        self.assertIsNotNone(ESSubscribtionEndpoint.re_inline.match("ES_SUBSCRIPTION_API g1.data.duniter.fr 443"))
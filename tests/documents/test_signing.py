@@ -0,0 +1,63 @@
+import concurrent.futures
+import unittest
+
+from duniterpy.documents import Block, BlockUID, Identity, Certification, Membership
+from duniterpy.documents import signing
+from duniterpy.key import SigningKey, VerifyingKey
+from tests.documents.test_block import raw_block_zero
+
+CURRENCY = "beta_brousouf"
+TIMESTAMP = BlockUID(32, "DB30D958EE5CB75186972286ED3F4686B8A1C2CD")
+
+
+class TestSigning(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.keys = [SigningKey("saltsalt", "passwordpassword"), SigningKey("othersalt", "otherpassword")]
+
+    def identities(self, count):
+        return [Identity(10, CURRENCY, self.keys[0].pubkey, "member{0}".format(i), TIMESTAMP, None)
+                for i in range(count)]
+
+    def test_sign_documents(self):
+        identities = self.identities(5)
+        signed = signing.sign_documents(identities, self.keys)
+        self.assertEqual(signed, identities)
+        for identity in identities:
+            expected = Identity(10, CURRENCY, self.keys[0].pubkey, identity.uid, TIMESTAMP, None)
+            expected.sign(self.keys)
+            self.assertEqual(identity.signatures, expected.signatures)
+            self.assertEqual(len(identity.signatures), 2)
+        self.assertTrue(VerifyingKey(self.keys[0].pubkey).verify_document(identities[0]))
+
+    def test_certifications(self):
+        identity = self.identities(1)[0]
+        identity.sign(self.keys[:1])
+        certifications = [Certification(10, CURRENCY, self.keys[0].pubkey, identity.pubkey,
+                                        BlockUID(i, TIMESTAMP.sha_hash), None) for i in range(3)]
+        signing.sign_documents([(c, identity) for c in certifications], self.keys[:1])
+        expected = Certification(10, CURRENCY, self.keys[0].pubkey, identity.pubkey, BlockUID(2, TIMESTAMP.sha_hash),
+                                 None)
+        expected.sign(identity, self.keys[:1])
+        self.assertEqual(certifications[2].signatures, expected.signatures)
+
+    def test_executors(self):
+        reference = signing.sign_documents(self.identities(10), self.keys)
+        for executor_class in (concurrent.futures.ThreadPoolExecutor, concurrent.futures.ProcessPoolExecutor):
+            with executor_class(2) as executor:
+                signed = signing.sign_documents(self.identities(10), self.keys, executor, chunk_size=3)
+            self.assertEqual([d.signatures for d in signed], [d.signatures for d in reference])
+
+    def test_mixed_documents(self):
+        membership = Membership(10, CURRENCY, self.keys[0].pubkey, TIMESTAMP, "IN", "member", TIMESTAMP, None)
+        identity = self.identities(1)[0]
+        signing.sign_documents([membership, identity], self.keys[:1])
+        self.assertTrue(VerifyingKey(self.keys[0].pubkey).verify_document(membership))
+
+    def test_block(self):
+        with self.assertRaises(TypeError):
+            signing.sign_documents([Block.from_signed_raw(raw_block_zero)], self.keys)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,7 +6,8 @@ Created on 12 déc. 2014
 import unittest
 import pypeg2
 from duniterpy.grammars import output
-from duniterpy.documents.transaction import Transaction, reduce_base, SimpleTransaction
+from duniterpy.documents import MalformedDocumentError
+from duniterpy.documents.transaction import Transaction, reduce_base, SimpleTransaction, OutputSource
 
 
 compact_change = """TX:10:1:1:1:1:1:0
@@ -458,3 +459,71 @@ class Test_Transaction(unittest.TestCase):
 
         tx = Transaction.from_compact("zeta_brousouf", tx_compact)
         self.assertFalse(SimpleTransaction.is_simple(tx))
+
+    def test_from_bma_history(self):
+        tx = Transaction.from_signed_raw(xhx_output)
+        tx_data = {
+            "version": 10,
+            "locktime": 0,
+            "blockstamp": "13739-000087835A9B746C1A6E173DB13A2C3D23DBDE8B2C5E93565B644313FE3D179B",
+            "blockstampTime": 1489066498,
+            "issuers": ["95ApcNEeoFnjUYPwh4fbGqKPDe5mCJysfJfezLngEZcu"],
+            "inputs": ["250:1:T:7AEDF83C99071E040698ED6E1445BF02FADEF37DA380795684D5C9271C037D5A:0"],
+            "unlocks": ["0:SIG(0)"],
+            "outputs": [tx.outputs[0].inline()],
+            "comment": "XHX for pubkey DCYELkvV1aAsxFv58SbfRerHy5giJwKA1i4ZKTTcVGZe",
+            "signatures": ["GXGephqTSJfb+8xsG/UMKRW0y+edL4RoMHM+OlgFq1aYOuaQ3/CtBKVSA01n2mkI7zwepeIABSjS94iVH4vZDg=="],
+            "hash": tx.sha_hash,
+            "block_number": 13740,
+            "time": 1489066798
+        }
+        for lazy in (False, True):
+            history_tx = Transaction.from_bma_history("gtest", tx_data, lazy_conditions=lazy)
+            self.assertEqual(history_tx.signed_raw(), xhx_output)
+            self.assertEqual(history_tx.locktime, 0)
+            self.assertEqual(history_tx.outputs[0].inline(), tx_data["outputs"][0])
+            self.assertEqual(type(history_tx.outputs[0].conditions), output.Condition)
+            self.assertEqual(pypeg2.compose(history_tx.outputs[0].conditions, output.Condition),
+                             pypeg2.compose(tx.outputs[0].conditions, output.Condition))
+
+    def test_output_lazy_conditions(self):
+        output_source = OutputSource.from_inline("100:0:SIG(5zDvFjJB1PGDQNiExpfzL9c1tQGs6xPA8mf1phr3VoVi)\n", lazy=True)
+        self.assertEqual(output_source.inline(), "100:0:SIG(5zDvFjJB1PGDQNiExpfzL9c1tQGs6xPA8mf1phr3VoVi)")
+        self.assertEqual(output_source.conditions.left.pubkey, "5zDvFjJB1PGDQNiExpfzL9c1tQGs6xPA8mf1phr3VoVi")
+        output_source.conditions.left.pubkey = "GNPdPNwSJAYw7ixkDeibo3YpdELgLmrZ2Q86HF4cyg92"
+        self.assertEqual(output_source.inline(), "100:0:SIG(GNPdPNwSJAYw7ixkDeibo3YpdELgLmrZ2Q86HF4cyg92)")
+
+        output_source = OutputSource.from_inline("100:0:SIG(unlockable\n", lazy=True)
+        self.assertEqual(output_source.conditions, "SIG(unlockable")
+
+    def test_from_compact_lines(self):
+        lines = ["Transactions:\n"] + tx_compact.splitlines(True) + compact_change.splitlines(True) \
+            + ["InnerHash: 0000\n"]
+        first, n = Transaction.from_compact_lines("zeta_brousouf", lines, 1)
+        second, end = Transaction.from_compact_lines("gtest", lines, n)
+        self.assertEqual(first.compact(), Transaction.from_compact("zeta_brousouf", tx_compact).compact())
+        self.assertEqual(second.compact(), compact_change)
+        self.assertEqual(end, len(lines) - 1)
+        with self.assertRaises(MalformedDocumentError):
+            Transaction.from_compact_lines("gtest", lines[:n + 3], n)
+
+    def test_sig_condition(self):
+        inline = "100:0:SIG(5zDvFjJB1PGDQNiExpfzL9c1tQGs6xPA8mf1phr3VoVi)\n"
+        parsed = pypeg2.parse(inline.split(":", 2)[2].strip(), output.Condition)
+        output_source = OutputSource.from_inline(inline)
+        self.assertEqual(type(output_source.conditions), output.Condition)
+        self.assertEqual(type(output_source.conditions.left), output.SIG)
+        self.assertEqual(output_source.conditions.left.pubkey, parsed.left.pubkey)
+        self.assertEqual(type(output_source.conditions.left.pubkey), output.Pubkey)
+        # the pubkeys of the conditions parsed by pypeg2 are interned and stay Pubkey tokens
+        complex_source = OutputSource.from_inline("100:0:(SIG(5zDvFjJB1PGDQNiExpfzL9c1tQGs6xPA8mf1phr3VoVi) || "
+                                                  "XHX(309BC5E644F797F53E5A2065EAF38A173437F2E6))\n")
+        self.assertEqual(type(complex_source.conditions.left.left.pubkey), output.Pubkey)
+        self.assertEqual(complex_source.conditions.left.left.pubkey, parsed.left.pubkey)
+        # the outputs to the same pubkey share its token
+        self.assertIs(complex_source.conditions.left.left.pubkey, output_source.conditions.left.pubkey)
+        self.assertIs(OutputSource.from_inline(inline).conditions.left.pubkey, output_source.conditions.left.pubkey)
+        self.assertFalse(hasattr(output_source.conditions, "op"))
+        self.assertEqual(pypeg2.compose(output_source.conditions, output.Condition),
+                         pypeg2.compose(parsed, output.Condition))
+        self.assertEqual(output_source.inline(), inline[:-1])
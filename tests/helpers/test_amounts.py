@@ -0,0 +1,77 @@
+import random
+import unittest
+from unittest import mock
+
+from duniterpy.documents.transaction import reduce_base
+from duniterpy.helpers import amounts
+
+
+class AmountsTests:
+    """
+    Tests run with and without numpy
+    """
+    def test_reduce_bases(self):
+        reduced_amounts, reduced_bases = self.amounts.reduce_bases([1200, 120, 0, 7, -300, 10 ** 15],
+                                                                   [0, 4, 3, 1, 0, 2])
+        self.assertEqual(list(reduced_amounts), [12, 12, 0, 7, -3, 1])
+        self.assertEqual(list(reduced_bases), [2, 5, 0, 1, 2, 17])
+
+    def test_normalize(self):
+        normalized, base = self.amounts.normalize([12, 3, 450], [2, 0, 1])
+        self.assertEqual(base, 0)
+        self.assertEqual(list(normalized), [1200, 3, 4500])
+        with self.assertRaises(ValueError):
+            self.amounts.normalize([12, 3], [2, 0], base=1)
+        with self.assertRaises(ValueError):
+            self.amounts.normalize([12, 3], [2])
+
+    def test_total(self):
+        self.assertEqual(self.amounts.total([1200, 3, 450], [0, 2, 1]), (6, 3))
+        self.assertEqual(self.amounts.total([], []), (0, 0))
+        self.assertEqual(self.amounts.total([5, -5], [1, 1]), (0, 0))
+
+    def test_total_large(self):
+        # beyond 64 bits integers and beyond the precision of floats
+        values = [2 ** 62, 2 ** 62, 3]
+        self.assertEqual(self.amounts.total(values, [0, 0, 0]), reduce_base(2 ** 63 + 3, 0))
+        self.assertEqual(self.amounts.total([10 ** 25 + 1, 1], [0, 30]), reduce_base(10 ** 30 + 10 ** 25 + 1, 0))
+
+    def test_total_random(self):
+        rng = random.Random(7)
+        values = [rng.randint(1, 100000) for _ in range(1000)]
+        bases = [rng.randint(0, 3) for _ in range(1000)]
+        expected = reduce_base(sum(v * 10 ** b for v, b in zip(values, bases)), 0)
+        self.assertEqual(self.amounts.total(values, bases), expected)
+
+    def test_compare(self):
+        result = self.amounts.compare([12, 100, 5, 2 ** 62], [1, 0, 0, 1], [120, 1, 6, 1], [0, 2, 0, 0])
+        self.assertEqual(list(result), [0, 0, -1, 1])
+        self.assertEqual(list(self.amounts.compare([], [], [], [])), [])
+
+
+class TestAmountsPython(AmountsTests, unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(amounts, "numpy", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.amounts = amounts
+
+
+@unittest.skipIf(amounts.numpy is None, "numpy is not installed")
+class TestAmountsNumpy(AmountsTests, unittest.TestCase):
+    def setUp(self):
+        self.amounts = amounts
+
+    def test_numpy_arrays(self):
+        normalized, _ = amounts.normalize([1, 2], [1, 0])
+        self.assertIsInstance(normalized, amounts.numpy.ndarray)
+        # too large for 64 bits integers
+        normalized, _ = amounts.normalize([10 ** 20, 2], [1, 0])
+        self.assertIsInstance(normalized, list)
+
+
+class TestReduceBase(unittest.TestCase):
+    def test_exact(self):
+        self.assertEqual(reduce_base(10 ** 30, 0), (1, 30))
+        self.assertEqual(reduce_base(12345678901234567890, 3), (1234567890123456789, 4))
+        self.assertEqual(reduce_base(0, 5), (0, 0))
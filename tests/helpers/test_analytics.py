@@ -0,0 +1,121 @@
+import math
+import unittest
+from unittest import mock
+
+from duniterpy.documents import Block
+from duniterpy.helpers import amounts, analytics
+from duniterpy.helpers.analytics import Movements, BlockSeries, per_period
+
+PUBKEY = "8Fi1VSTbjkXguwThF4v2ZxC5whK7pwG2vcGTkPUPjPGU"
+OTHER = "HnFcSms8jzwngtVomTTnzudZx7SHUQY8sVE1y8yBmULk"
+DAY = 86400
+
+UD_HISTORY = {
+    "currency": "g1",
+    "pubkey": PUBKEY,
+    "history": {
+        "history": [
+            {"block_number": 10, "consumed": True, "time": 1000, "amount": 1000, "base": 0},
+            {"block_number": 20, "consumed": False, "time": 1000 + DAY, "amount": 101, "base": 1},
+            {"block_number": 30, "consumed": False, "time": 1000 + 2 * DAY, "amount": 102, "base": 1}
+        ]
+    }
+}
+
+
+def tx(tx_hash, time, issuers, inputs, outputs):
+    return {"version": 10, "issuers": issuers, "inputs": inputs, "outputs": outputs, "unlocks": [], "comment": "",
+            "signatures": [], "hash": tx_hash, "block_number": time // 100, "time": time}
+
+
+SENT = tx("A", 1000 + DAY + 10, [PUBKEY], ["1000:0:D:{0}:10".format(PUBKEY)],
+          ["300:0:SIG({0})".format(OTHER), "700:0:SIG({0})".format(PUBKEY)])
+RECEIVED = tx("B", 1000 + 3 * DAY, [OTHER], ["5:2:T:ABCD:0"], ["5:2:SIG({0})".format(PUBKEY)])
+
+TX_HISTORY = {
+    "currency": "g1",
+    "pubkey": PUBKEY,
+    "history": {
+        # the change output makes the first transaction appear in both lists
+        "sent": [SENT],
+        "received": [SENT, RECEIVED],
+        "sending": [],
+        "receiving": []
+    }
+}
+
+
+class AnalyticsTests:
+    def test_ud_history(self):
+        movements = Movements.from_ud_history(UD_HISTORY)
+        self.assertEqual(list(movements.amounts), [1000, 1010, 1020])
+        self.assertEqual(list(movements.balance()), [1000, 2010, 3030])
+        self.assertEqual(list(movements.block_numbers), [10, 20, 30])
+
+    def test_tx_history(self):
+        movements = Movements.from_tx_history(TX_HISTORY)
+        self.assertEqual(len(movements), 3)
+        # sorted by time, the change output first as it comes before the inputs in the transaction
+        self.assertEqual(sorted(movements.amounts[:2]), [-1000, 700])
+        self.assertEqual(int(movements.amounts[2]), 500)
+        self.assertEqual(int(movements.balance()[-1]), 200)
+
+    def test_income_and_spending(self):
+        movements = Movements.merge(Movements.from_ud_history(UD_HISTORY), Movements.from_tx_history(TX_HISTORY))
+        self.assertEqual(len(movements), 6)
+        self.assertEqual(int(movements.balance()[-1]), 3030 + 200)
+        starts, income = movements.income(DAY)
+        self.assertEqual(list(starts), [1000, 1000 + DAY, 1000 + 2 * DAY, 1000 + 3 * DAY])
+        self.assertEqual(list(income), [1000, 1010 + 700, 1020, 500])
+        starts, spent = movements.spending(DAY)
+        self.assertEqual(list(spent), [0, 1000, 0, 0])
+
+    def test_per_period(self):
+        starts, totals = per_period([0, 5, 25], [1, 2, 3], 10, start=0)
+        self.assertEqual(list(starts), [0, 10, 20])
+        self.assertEqual(list(totals), [3, 0, 3])
+        with self.assertRaises(ValueError):
+            per_period([0, 5], [1, 2], 10, start=3)
+        self.assertEqual([list(c) for c in per_period([], [], 10)], [[], []])
+
+    def test_block_series(self):
+        series = BlockSeries([1, 2, 3, 4], [100, 200, 300, 400], [0, 1000, 0, 1010], [10, 10, 11, 12])
+        self.assertEqual(list(series.monetary_mass()), [0, 10000, 10000, 10000 + 12120])
+        self.assertEqual(list(series.monetary_mass(initial=5)), [5, 10005, 10005, 22125])
+        self.assertEqual(list(series.dividend_at([50, 200, 350, 500])), [0, 1000, 1000, 1010])
+        relative = list(series.relative([50, 250, 450], [100, 2500, 2020]))
+        self.assertTrue(math.isnan(relative[0]))
+        self.assertEqual(relative[1:], [2.5, 2.0])
+
+    def test_large_amounts(self):
+        movements = Movements([1, 2], [1, 2], [2 ** 62, 2 ** 62])
+        self.assertEqual([int(b) for b in movements.balance()], [2 ** 62, 2 ** 63])
+
+
+class TestAnalyticsPython(AnalyticsTests, unittest.TestCase):
+    def setUp(self):
+        for module in (amounts, analytics):
+            patcher = mock.patch.object(module, "numpy", None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+@unittest.skipIf(analytics.numpy is None, "numpy is not installed")
+class TestAnalyticsNumpy(AnalyticsTests, unittest.TestCase):
+    def test_columns(self):
+        movements = Movements.from_ud_history(UD_HISTORY)
+        self.assertIsInstance(movements.amounts, analytics.numpy.ndarray)
+
+
+class TestBlockSeriesFromBlocks(unittest.TestCase):
+    def test_from_blocks(self):
+        from tests.documents.test_block import raw_block_zero, raw_block_with_excluded
+        blocks = [Block.from_signed_raw(raw_block_zero), Block.from_signed_raw(raw_block_with_excluded)]
+        series = BlockSeries.from_blocks(blocks)
+        self.assertEqual(list(series.numbers), [b.number for b in blocks])
+        self.assertEqual(list(series.members_counts), [b.members_count for b in blocks])
+        self.assertEqual(list(series.dividends), [(b.ud or 0) * 10 ** (b.unit_base if b.ud else 0) for b in blocks])
+
+
+if __name__ == '__main__':
+    unittest.main()
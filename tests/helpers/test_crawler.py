@@ -0,0 +1,105 @@
+import unittest
+
+import aiohttp
+
+from duniterpy.documents import BMAEndpoint, Peer
+from duniterpy.helpers import crawler
+from tests.api.webserver import WebFunctionalSetupMixin, web
+
+
+def peer_json(pubkey, block, port):
+    return {
+        "version": 10,
+        "currency": "g1",
+        "pubkey": pubkey,
+        "block": block,
+        "endpoints": [
+            "BASIC_MERKLED_API 127.0.0.1 {0}".format(port),
+            "WS2P d2edcb92 g1-test.duniter.org 20902"
+        ],
+        "signature": "dkaXIiCYUJtCg8Feh/BKvPYf4uFH9CJ/zY6J4MlA9BsjmcMe4YAblvNt/gJy31b1aGq3ue3h14mLMCu84rraDg=="
+    }
+
+
+current_json = {
+    "version": 10,
+    "currency": "g1",
+    "nonce": 10300000018323,
+    "number": 42,
+    "powMin": 80,
+    "time": 1488987127,
+    "medianTime": 1488987127,
+    "dividend": None,
+    "monetaryMass": 0,
+    "issuer": "2ny7YAdmzReQxAayyJZsyVYwYhVyax2thKcGknmQy5nQ",
+    "previousHash": "000003D02B95D3296A4F06DBAC51775C4336A4DC09D0E958DC40033BE7E20F3D",
+    "previousIssuer": "2ny7YAdmzReQxAayyJZsyVYwYhVyax2thKcGknmQy5nQ",
+    "membersCount": 59,
+    "hash": "00000F3B0C9A0B5A1C9B0C1FFB4A3F2F9E5E9DBDD0F1B5B2E3AF1CB7B1F6C0B9",
+    "inner_hash": "ABE8AE2E0A1D0C4D6E3F1B7A6D8C7E0F9B2C4D1A3E5F7B9C0D2E4F6A8B1C3D5E",
+    "identities": [],
+    "joiners": [],
+    "leavers": [],
+    "revoked": [],
+    "excluded": [],
+    "certifications": [],
+    "transactions": [],
+    "signature": "dkaXIiCYUJtCg8Feh/BKvPYf4uFH9CJ/zY6J4MlA9BsjmcMe4YAblvNt/gJy31b1aGq3ue3h14mLMCu84rraDg=="
+}
+
+
+class TestCrawler(WebFunctionalSetupMixin, unittest.TestCase):
+
+    def test_peer_from_bma(self):
+        peer = Peer.from_bma(peer_json("HsLShAtzXTVxeUtQd7yi5Z5Zh4zNvbu8sTEZ53nfKcqY",
+                                       "8-1922C324ABC4AF7EF7656734A31F5197888DDD52", 9001))
+        self.assertEqual(peer.pubkey, "HsLShAtzXTVxeUtQd7yi5Z5Zh4zNvbu8sTEZ53nfKcqY")
+        self.assertEqual(str(peer.blockUID), "8-1922C324ABC4AF7EF7656734A31F5197888DDD52")
+        self.assertEqual(len(peer.endpoints), 2)
+        self.assertIsInstance(peer.endpoints[0], BMAEndpoint)
+
+    def test_crawl(self):
+        port = self.find_unused_port()
+        leaves = {
+            "AAA": peer_json("HsLShAtzXTVxeUtQd7yi5Z5Zh4zNvbu8sTEZ53nfKcqY",
+                             "8-1922C324ABC4AF7EF7656734A31F5197888DDD52", port),
+            "BBB": peer_json("HsLShAtzXTVxeUtQd7yi5Z5Zh4zNvbu8sTEZ53nfKcqY",
+                             "12-1922C324ABC4AF7EF7656734A31F5197888DDD52", port),
+            "CCC": peer_json("CYYjHsNyg3HMRMpTHqCJAN9McjH5BwFLmDKGV3PmCuKp",
+                             "10-1922C324ABC4AF7EF7656734A31F5197888DDD52", self.find_unused_port()),
+        }
+
+        async def handler(request):
+            await request.read()
+            path = request.match_info["tail"]
+            if path == "network/peering/peers":
+                if request.query.get("leaves") == "true":
+                    return web.json_response({"depth": 2, "nodesCount": 4, "leavesCount": 3,
+                                              "root": "ROOT", "leaves": sorted(leaves)})
+                leaf = request.query["leaf"]
+                return web.json_response({"depth": 2, "nodesCount": 4, "leavesCount": 3, "root": "ROOT",
+                                          "leaves": [], "leaf": {"hash": leaf, "value": leaves[leaf]}})
+            elif path == "node/summary":
+                return web.json_response({"duniter": {"software": "duniter", "version": "1.6.14"}})
+            elif path == "blockchain/current":
+                return web.json_response(current_json)
+            return web.Response(status=404)
+
+        async def go():
+            _, srv, _, url = await self.create_server('GET', '/{tail:.*}', handler, port=port)
+            async with aiohttp.ClientSession() as session:
+                connection = next(BMAEndpoint("127.0.0.1", None, None, port).conn_handler(session))
+                peers = await crawler.fetch_peers(connection)
+                self.assertEqual(len(peers), 2)
+                by_pubkey = {p.pubkey: p for p in peers}
+                self.assertEqual(by_pubkey["HsLShAtzXTVxeUtQd7yi5Z5Zh4zNvbu8sTEZ53nfKcqY"].blockUID.number, 12)
+
+                nodes = await crawler.crawl(connection, timeout=2)
+                self.assertEqual(len(nodes), 2)
+                self.assertTrue(nodes[0].reachable)
+                self.assertEqual(nodes[0].pubkey, "HsLShAtzXTVxeUtQd7yi5Z5Zh4zNvbu8sTEZ53nfKcqY")
+                self.assertEqual(nodes[0].current.number, 42)
+                self.assertEqual(nodes[0].software, "duniter")
+                self.assertFalse(nodes[1].reachable)
+
+        self.loop.run_until_complete(go())
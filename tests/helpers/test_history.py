@@ -0,0 +1,118 @@
+import asyncio
+import unittest
+
+import aiohttp
+
+from duniterpy.api.pool import NodePool
+from duniterpy.documents import BMAEndpoint
+from duniterpy.helpers import history
+from tests.api.webserver import WebFunctionalSetupMixin, web
+
+PUBKEY = "8Fi1VSTbjkXguwThF4v2ZxC5whK7pwG2vcGTkPUPjPGU"
+
+
+def transaction(tx_hash, block_number):
+    return {"version": 10, "issuers": [PUBKEY], "inputs": ["100:0:D:{0}:1".format(PUBKEY)],
+            "outputs": ["100:0:SIG({0})".format(PUBKEY)], "unlocks": ["0:SIG(0)"], "comment": "",
+            "signatures": ["sig"], "hash": tx_hash, "block_number": block_number, "time": 1000 + block_number}
+
+
+# a self-sent transaction is both sent and received, the pending one is the same in every window
+WRITTEN = [transaction("TX{0}".format(number), number) for number in range(0, 100, 7)]
+PENDING = transaction("PENDING", 0)
+
+
+def window_answer(start, end):
+    written = [t for t in WRITTEN if start <= t["block_number"] <= end]
+    return {"currency": "g1", "pubkey": PUBKEY,
+            "history": {"sent": written, "received": written, "sending": [PENDING], "receiving": []}}
+
+
+class TestWindows(unittest.TestCase):
+    def test_windows(self):
+        self.assertEqual(history.windows(0, 9, 4), [(0, 3), (4, 7), (8, 9)])
+        self.assertEqual(history.windows(5, 5, 10), [(5, 5)])
+        self.assertEqual(history.windows(6, 5, 10), [])
+        with self.assertRaises(ValueError):
+            history.windows(0, 10, 0)
+
+    def test_merge(self):
+        merged = history.merge([window_answer(50, 99), window_answer(0, 49), window_answer(40, 60)])
+        self.assertEqual(merged["pubkey"], PUBKEY)
+        self.assertEqual([t["hash"] for t in merged["history"]["sent"]], [t["hash"] for t in WRITTEN])
+        self.assertEqual(merged["history"]["received"], merged["history"]["sent"])
+        self.assertEqual(merged["history"]["sending"], [PENDING])
+
+    def test_merge_written_pending(self):
+        written = window_answer(0, 99)
+        pending = {"currency": "g1", "pubkey": PUBKEY,
+                   "history": {"sent": [], "received": [], "sending": [WRITTEN[0]], "receiving": []}}
+        self.assertEqual(history.merge([pending, written])["history"]["sending"], [PENDING])
+
+
+class TestFetchHistory(WebFunctionalSetupMixin, unittest.TestCase):
+    def serve(self, requests, delay=0.):
+        async def handler(request):
+            start, end = int(request.match_info["start"]), int(request.match_info["end"])
+            requests.append((start, end))
+            await asyncio.sleep(delay * (100 - start) / 100)
+            return web.json_response(window_answer(start, end))
+        return self.create_server("GET", "/tx/history/{pubkey}/blocks/{start}/{end}", handler)
+
+    def test_fetch_windows(self):
+        requests = []
+
+        async def go():
+            _, _, port, _ = await self.serve(requests, delay=0.05)
+            async with aiohttp.ClientSession() as session:
+                connection = next(BMAEndpoint("127.0.0.1", None, None, port).conn_handler(session))
+                results = []
+                for future in history.fetch_windows(connection, PUBKEY, 0, 99, size=25, concurrency=4):
+                    results.append(await future)
+                return results
+
+        results = self.loop.run_until_complete(go())
+        self.assertEqual(sorted(requests), [(0, 24), (25, 49), (50, 74), (75, 99)])
+        # streamed as they complete : the last windows answer first
+        self.assertEqual([window for window, _ in results], [(75, 99), (50, 74), (25, 49), (0, 24)])
+
+    def test_fetch_history(self):
+        requests = []
+
+        async def go():
+            _, _, port, _ = await self.serve(requests)
+            async with aiohttp.ClientSession() as session:
+                connections = [next(BMAEndpoint("127.0.0.1", None, None, port).conn_handler(session))
+                               for _ in range(2)]
+                by_list = await history.fetch_history(connections, PUBKEY, 0, 99, size=10, concurrency=3)
+                by_pool = await history.fetch_history(NodePool(connections), PUBKEY, 0, 99, size=30)
+                return by_list, by_pool
+
+        by_list, by_pool = self.loop.run_until_complete(go())
+        self.assertEqual(len(requests), 10 + 4)
+        self.assertEqual(by_list, by_pool)
+        self.assertEqual(by_list, history.merge([window_answer(0, 99)]))
+
+    def test_failed_window(self):
+        async def handler(request):
+            if request.match_info["start"] == "0":
+                return web.Response(status=404, text="Not found")
+            await asyncio.sleep(0.5)
+            return web.json_response(window_answer(0, 0))
+
+        async def go():
+            _, _, port, _ = await self.create_server("GET", "/tx/history/{pubkey}/blocks/{start}/{end}", handler)
+            async with aiohttp.ClientSession() as session:
+                connection = next(BMAEndpoint("127.0.0.1", None, None, port).conn_handler(session))
+                with self.assertRaises(ValueError):
+                    await asyncio.wait_for(history.fetch_history(connection, PUBKEY, 0, 99, size=50), 2)
+
+        self.loop.run_until_complete(go())
+
+    def test_by(self):
+        with self.assertRaises(ValueError):
+            self.loop.run_until_complete(history.fetch_history([object()], PUBKEY, 0, 10, by="hours"))
+
+
+if __name__ == '__main__':
+    unittest.main()
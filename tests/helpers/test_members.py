@@ -0,0 +1,116 @@
+import asyncio
+import unittest
+
+import aiohttp
+
+from benchmarks import fixtures
+from benchmarks.standin import StandinNode
+from duniterpy.documents import BMAEndpoint, Membership, Revocation
+from duniterpy.helpers import members as members_module
+from duniterpy.helpers.members import MembersSet
+
+
+class TestMembersSet(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.blocks = fixtures.chain(14, members_count=50, joiners=2, transactions=0)
+        self.alice = self.blocks[0].identities[0]
+        self.bob = self.blocks[0].identities[1]
+        leaving, excluding, revoking = self.blocks[10:13]
+        leaving.leavers = [Membership(10, leaving.currency, self.alice.pubkey, self.alice.timestamp, "OUT",
+                                      self.alice.uid, self.alice.timestamp, fixtures.signature("leave"))]
+        excluding.excluded = [self.alice.pubkey]
+        revoking.revoked = [Revocation(10, revoking.currency, self.bob.pubkey, fixtures.signature("revoke"))]
+        revoking.excluded = [self.bob.pubkey]
+        # the PreviousHash fields are the hashes of the previous blocks
+        for previous, block in zip(self.blocks, self.blocks[1:]):
+            block.prev_hash = previous.blockUID.sha_hash
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_node(self, test):
+        node = StandinNode(self.blocks[:10])
+
+        async def go():
+            port = await node.start()
+            try:
+                async with aiohttp.ClientSession() as session:
+                    connection = next(BMAEndpoint("127.0.0.1", None, None, port).conn_handler(session))
+                    return await test(node, connection)
+            finally:
+                await node.stop()
+
+        self.loop.run_until_complete(go())
+
+    def test_sync(self):
+        async def test(node, connection):
+            members = MembersSet()
+            feed = []
+            members.add_listener(feed.append)
+            self.assertEqual(await members.sync(connection), [])
+            self.assertEqual(members.head, 10)
+            self.assertEqual(len(members), len(node.identities))
+            self.assertIn(self.alice.pubkey, members)
+            self.assertEqual(members.uid(self.bob.pubkey), self.bob.uid)
+            self.assertEqual(await members.sync(connection), [])
+            self.assertEqual(node.requests["/wot/members"], 1)
+
+            # the leaver stays a member until excluded
+            await node.push_block(self.blocks[10])
+            changes = await members.sync(connection)
+            kinds = [change.kind for change in changes]
+            self.assertEqual(kinds.count(members_module.JOINED), 2)
+            self.assertEqual(kinds.count(members_module.RENEWED), 5)
+            self.assertEqual(changes[-1], members_module.Change(members_module.LEAVING, self.alice.pubkey,
+                                                                self.alice.uid, 11))
+            self.assertIn(self.alice.pubkey, members)
+            self.assertEqual(members.leaving, {self.alice.pubkey})
+            self.assertIn(self.blocks[10].identities[0].pubkey, members)
+
+            # two blocks : the one before the current block is read
+            await node.push_block(self.blocks[11])
+            await node.push_block(self.blocks[12])
+            changes = await members.sync(connection)
+            self.assertEqual(node.requests["/blockchain/blocks/{count}/{start}"], 1)
+            self.assertIn(members_module.Change(members_module.EXCLUDED, self.alice.pubkey, self.alice.uid, 12),
+                          changes)
+            self.assertIn(members_module.Change(members_module.REVOKED, self.bob.pubkey, self.bob.uid, 13),
+                          changes)
+            self.assertNotIn(self.alice.pubkey, members)
+            self.assertNotIn(self.bob.pubkey, members)
+            self.assertEqual(members.leaving, set())
+            self.assertEqual(members.revoked, {self.bob.pubkey})
+            self.assertEqual(node.requests["/wot/members"], 1)
+            # the changes are sent to the listeners
+            self.assertEqual(feed[-len(changes):], changes)
+            self.assertEqual(len(feed), 8 + len(changes))
+
+            # beyond the maximum gap, the set is bootstrapped again and agrees with the node
+            await node.push_block(self.blocks[13])
+            changes = await members.sync(connection, max_gap=0)
+            self.assertEqual(node.requests["/wot/members"], 2)
+            # the members of the block are reported as joined
+            self.assertEqual(set(change.kind for change in changes), {members_module.JOINED})
+            self.assertTrue(set(change.pubkey for change in changes)
+                            <= set(m.issuer for m in self.blocks[13].joiners + self.blocks[13].actives))
+            self.assertEqual(members.head, 14)
+            self.assertEqual(set(members), set(pubkey for pubkey in node.identities if pubkey not in node.excluded))
+
+        self.run_node(test)
+
+    def test_apply_block(self):
+        members = MembersSet()
+        for block in self.blocks[:12]:
+            members.apply_block(block)
+        self.assertNotIn(self.alice.pubkey, members)
+        self.assertIn(self.bob.pubkey, members)
+        with self.assertRaises(ValueError):
+            members.apply_block(self.blocks[13])
+        fork = self.blocks[12]
+        fork.prev_hash = fixtures.block_hash("fork")
+        with self.assertRaises(ValueError):
+            members.apply_block(fork)
+        self.assertEqual(members.head, 12)
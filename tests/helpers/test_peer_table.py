@@ -0,0 +1,58 @@
+import unittest
+
+import aiohttp
+
+from duniterpy.documents import BMAEndpoint
+from duniterpy.helpers.peer_table import PeerTable
+from tests.api.webserver import WebFunctionalSetupMixin, web
+from tests.helpers.test_crawler import peer_json
+
+
+class TestPeerTable(WebFunctionalSetupMixin, unittest.TestCase):
+
+    def test_refresh(self):
+        leaves = {
+            "AAA": peer_json("HsLShAtzXTVxeUtQd7yi5Z5Zh4zNvbu8sTEZ53nfKcqY",
+                             "8-1922C324ABC4AF7EF7656734A31F5197888DDD52", 9001),
+            "BBB": peer_json("CYYjHsNyg3HMRMpTHqCJAN9McjH5BwFLmDKGV3PmCuKp",
+                             "10-1922C324ABC4AF7EF7656734A31F5197888DDD52", 9002),
+        }
+        requested = []
+
+        async def handler(request):
+            await request.read()
+            root = "".join(sorted(leaves))
+            if request.query.get("leaves") == "true":
+                return web.json_response({"depth": 2, "nodesCount": 3, "leavesCount": len(leaves),
+                                          "root": root, "leaves": sorted(leaves)})
+            leaf = request.query["leaf"]
+            requested.append(leaf)
+            return web.json_response({"depth": 2, "nodesCount": 3, "leavesCount": len(leaves), "root": root,
+                                      "leaves": [], "leaf": {"hash": leaf, "value": leaves[leaf]}})
+
+        async def go():
+            _, srv, port, url = await self.create_server('GET', '/network/peering/peers', handler)
+            async with aiohttp.ClientSession() as session:
+                connection = next(BMAEndpoint("127.0.0.1", None, None, port).conn_handler(session))
+                table = PeerTable()
+                added, removed = await table.refresh(connection)
+                self.assertEqual(len(added), 2)
+                self.assertEqual(len(removed), 0)
+                self.assertEqual(sorted(requested), ["AAA", "BBB"])
+
+                # unchanged root : no leaf is downloaded
+                added, removed = await table.refresh(connection)
+                self.assertEqual((added, removed), ([], []))
+                self.assertEqual(len(requested), 2)
+
+                # a peer document changed : only its new leaf is downloaded
+                del leaves["AAA"]
+                leaves["CCC"] = peer_json("HsLShAtzXTVxeUtQd7yi5Z5Zh4zNvbu8sTEZ53nfKcqY",
+                                          "12-1922C324ABC4AF7EF7656734A31F5197888DDD52", 9001)
+                added, removed = await table.refresh(connection)
+                self.assertEqual(requested[2:], ["CCC"])
+                self.assertEqual([p.blockUID.number for p in added], [12])
+                self.assertEqual([p.blockUID.number for p in removed], [8])
+                self.assertEqual(len(table.peers), 2)
+
+        self.loop.run_until_complete(go())
@@ -0,0 +1,66 @@
+import base64
+import concurrent.futures
+import unittest
+
+from duniterpy.documents import Block
+from duniterpy.helpers import pow
+from duniterpy.key import SigningKey, VerifyingKey
+from tests.documents.test_block import raw_block
+
+
+class TestPow(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.key = SigningKey("saltsalt", "passwordpassword")
+
+    def block(self):
+        block = Block.from_signed_raw(raw_block)
+        block.issuer = self.key.pubkey
+        return block
+
+    def test_meets_powmin(self):
+        pow_hash = "00000A84839226046082E2B1AD49664E382D98C845644945D133D4A90408813A"
+        self.assertEqual(pow.difficulty(80), (5, "F"))
+        self.assertEqual(pow.difficulty(86), (5, "9"))
+        self.assertTrue(pow.meets_powmin(pow_hash, 80))
+        self.assertTrue(pow.meets_powmin(pow_hash, 85))
+        self.assertFalse(pow.meets_powmin(pow_hash, 86))
+        self.assertFalse(pow.meets_powmin(pow_hash, 96))
+        self.assertTrue(pow.meets_powmin(pow_hash.lower(), 85))
+
+    def check(self, block, result, powmin):
+        self.assertTrue(result.found)
+        self.assertEqual(block.noonce, result.nonce)
+        self.assertEqual(block.inner_hash, block.computed_inner_hash())
+        self.assertEqual(block.proof_of_work(), result.hash)
+        self.assertTrue(pow.meets_powmin(result.hash, powmin))
+        signature = base64.b64decode(block.signatures[0])
+        VerifyingKey(self.key.pubkey).verify(signature + block.signed_part().encode("ascii"))
+        # the signed raw of the forged block is parsed back
+        self.assertEqual(Block.from_signed_raw(block.signed_raw()).proof_of_work(), result.hash)
+
+    def test_search_nonce(self):
+        block = self.block()
+        result = pow.search_nonce(block, self.key, powmin=20, chunk_size=10)
+        self.check(block, result, 20)
+        self.assertEqual(result.attempts, result.nonce + 1)
+        self.assertGreater(result.hash_rate_per_core, 0)
+
+    def test_search_nonce_processes(self):
+        block = self.block()
+        with concurrent.futures.ProcessPoolExecutor(2) as executor:
+            result = pow.search_nonce(block, self.key, powmin=24, start=1000, executor=executor, chunk_size=20)
+        self.check(block, result, 24)
+        self.assertGreaterEqual(result.nonce, 1000)
+
+    def test_not_found(self):
+        block = self.block()
+        nonce, signatures = block.noonce, block.signatures
+        result = pow.search_nonce(block, self.key, powmin=200, max_attempts=50, chunk_size=20)
+        self.assertFalse(result.found)
+        self.assertEqual(result.attempts, 50)
+        self.assertEqual((block.noonce, block.signatures), (nonce, signatures))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import asyncio
+import unittest
+
+import aiohttp
+
+from benchmarks import fixtures
+from benchmarks.standin import StandinNode
+from duniterpy.api import errors
+from duniterpy.api.errors import DuniterError
+from duniterpy.api.pool import NodePool
+from duniterpy.documents import BMAEndpoint
+from duniterpy.helpers import requirements
+
+
+class TestRequirements(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.blocks = fixtures.chain(10, members_count=50, joiners=3, transactions=0)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_nodes(self, test, count=1, **kwargs):
+        nodes = [StandinNode(self.blocks, **kwargs) for _ in range(count)]
+
+        async def go():
+            ports = [await node.start() for node in nodes]
+            try:
+                async with aiohttp.ClientSession() as session:
+                    connections = [next(BMAEndpoint("127.0.0.1", None, None, port).conn_handler(session))
+                                   for port in ports]
+                    return await test(nodes, connections)
+            finally:
+                for node in nodes:
+                    await node.stop()
+
+        self.loop.run_until_complete(go())
+
+    def test_fetch_requirements(self):
+        async def test(nodes, connections):
+            pubkeys = list(nodes[0].identities)
+            received = {}
+            for future in requirements.fetch_requirements(connections[0], pubkeys + ["unknown", pubkeys[0]],
+                                                          concurrency=5):
+                search, data, error = await future
+                received[search] = data, error
+            self.assertEqual(nodes[0].requests["/wot/requirements/{search}"], len(pubkeys) + 1)
+            self.assertEqual(len(received), len(pubkeys) + 1)
+            for pubkey in pubkeys:
+                data, error = received[pubkey]
+                self.assertIsNone(error)
+                self.assertEqual(data["identities"][0]["pubkey"], pubkey)
+            data, error = received["unknown"]
+            self.assertIsNone(data)
+            self.assertIsInstance(error, DuniterError)
+            self.assertEqual(error.ucode, errors.NO_MATCHING_IDENTITY)
+
+        self.run_nodes(test)
+
+    def test_requirements_of(self):
+        async def test(nodes, connections):
+            pubkeys = list(nodes[0].identities)
+            # spread over the nodes
+            answers, failed = await requirements.requirements_of(connections, pubkeys)
+            self.assertEqual(set(answers), set(pubkeys))
+            self.assertEqual(failed, {})
+            self.assertEqual([node.requests["/wot/requirements/{search}"] for node in nodes],
+                             [len(pubkeys[0::2]), len(pubkeys[1::2])])
+
+            # through a pool, the errors of a node are failed over
+            pool = NodePool(connections, hedge=False)
+            answers, failed = await requirements.requirements_of(pool, pubkeys + ["unknown"], concurrency=4)
+            self.assertEqual(set(answers), set(pubkeys))
+            self.assertEqual(list(failed), ["unknown"])
+
+        self.run_nodes(test, count=2)
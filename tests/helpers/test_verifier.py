@@ -0,0 +1,90 @@
+import concurrent.futures
+import unittest
+
+from duniterpy.documents import Block
+from duniterpy.helpers import pow, verifier
+from duniterpy.key import SigningKey, VerifyingKey
+from tests.documents.test_block import raw_block
+
+
+def forge_chain(keys, length):
+    """
+    A valid chain of blocks, signed in turn by the keys, with an easy proof of work
+    """
+    blocks = []
+    for index in range(length):
+        block = Block.from_signed_raw(raw_block)
+        key = keys[index % len(keys)]
+        block.number = 10 + index
+        block.powmin = 4
+        block.issuer = key.pubkey
+        if blocks:
+            block.prev_hash = blocks[-1].blockUID.sha_hash
+            block.prev_issuer = blocks[-1].issuer
+        pow.search_nonce(block, key)
+        blocks.append(block)
+    return blocks
+
+
+class TestVerifier(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.keys = [SigningKey("saltsalt", "passwordpassword"), SigningKey("othersalt", "otherpassword")]
+        cls.raws = [block.signed_raw() for block in forge_chain(cls.keys, 12)]
+
+    def chain(self):
+        return [Block.from_signed_raw(raw) for raw in self.raws]
+
+    def test_valid_chain(self):
+        blocks = self.chain()
+        self.assertEqual(verifier.check_block(blocks[3]), (blocks[3].blockUID.sha_hash, []))
+        self.assertTrue(VerifyingKey(blocks[3].issuer).verify_document(blocks[3]))
+        report = verifier.verify_blocks(iter(blocks), chunk_size=5)
+        self.assertTrue(report.ok)
+        self.assertEqual((report.checked, report.first, report.last), (12, 10, 21))
+        self.assertEqual(str(report), "12 blocks checked from #10 to #21, all valid")
+
+    def tampered(self):
+        blocks = self.chain()
+        # content changed after the inner hash
+        blocks[2].members_count += 1
+        # signed by another key
+        blocks[5].sign([self.keys[0] if blocks[5].issuer == self.keys[1].pubkey else self.keys[1]])
+        # a block is missing
+        del blocks[8]
+        return blocks
+
+    def check_tampered(self, report):
+        self.assertEqual(report.failed, [15, 16, 19])
+        self.assertEqual(report.failures[15][0], verifier.SIGNATURE)
+        self.assertEqual(report.failures[16], [verifier.PREVIOUS_HASH])
+        self.assertEqual(report.failures[19], [verifier.NUMBER, verifier.PREVIOUS_HASH, verifier.PREVIOUS_ISSUER])
+        self.assertIn("#19 (number previous_hash previous_issuer)", str(report))
+
+    def test_tampered_chain(self):
+        report = verifier.verify_blocks(self.tampered(), chunk_size=4)
+        self.assertEqual(report.failures.get(12), [verifier.INNER_HASH])
+        del report.failures[12]
+        self.check_tampered(report)
+
+    def test_executors(self):
+        for executor_class in (concurrent.futures.ThreadPoolExecutor, concurrent.futures.ProcessPoolExecutor):
+            with executor_class(2) as executor:
+                report = verifier.verify_blocks(self.tampered(), executor=executor, workers=2, chunk_size=3)
+            self.assertEqual(report.checked, 11)
+            self.assertEqual(report.failures.pop(12), [verifier.INNER_HASH])
+            self.check_tampered(report)
+
+    def test_previous(self):
+        blocks = self.chain()
+        self.assertTrue(verifier.verify_blocks(blocks[4:], previous=blocks[3]).ok)
+        self.assertEqual(verifier.verify_blocks(blocks[4:], previous=blocks[2]).failed, [14])
+
+    def test_pow(self):
+        block = self.chain()[0]
+        block.powmin = 200
+        self.assertEqual(verifier.check_block(block)[1], [verifier.INNER_HASH, verifier.POW])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import asyncio
+import unittest
+
+import aiohttp
+
+from benchmarks import fixtures, standin
+from duniterpy.api.errors import DuniterError
+from duniterpy.documents import BMAEndpoint, Certification
+from duniterpy.helpers import wot_cache
+from duniterpy.helpers.wot_cache import WotCache
+
+
+def certify(block, pubkey_to):
+    """
+    Replace the changes of the web of trust of a block by a certification of pubkey_to
+    """
+    certification = block.certifications[0]
+    block.certifications = [Certification(10, block.currency, certification.pubkey_from, pubkey_to,
+                                          certification.timestamp, certification.signatures[0])]
+    block.joiners, block.identities, block.actives = [], [], []
+
+
+class TestWotCache(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.blocks = fixtures.chain(13, members_count=50, joiners=2, transactions=0)
+        self.alice = self.blocks[0].identities[0]
+        self.bob = self.blocks[0].identities[1]
+        self.member = self.blocks[0].actives[0].issuer
+        # the blocks pushed by the tests
+        certify(self.blocks[10], self.bob.pubkey)
+        certify(self.blocks[11], self.alice.pubkey)
+        certify(self.blocks[12], self.member)
+        # the PreviousHash fields are the hashes of the previous blocks
+        for previous, block in zip(self.blocks, self.blocks[1:]):
+            block.prev_hash = previous.blockUID.sha_hash
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_node(self, test):
+        node = standin.StandinNode(self.blocks[:10])
+
+        async def go():
+            port = await node.start()
+            try:
+                async with aiohttp.ClientSession() as session:
+                    connection = next(BMAEndpoint("127.0.0.1", None, None, port).conn_handler(session))
+                    return await test(node, connection)
+            finally:
+                await node.stop()
+
+        self.loop.run_until_complete(go())
+
+    def test_touched(self):
+        block = standin.bma_block(self.blocks[0])
+        keys = wot_cache.touched(block)
+        self.assertIn(self.alice.pubkey, keys)
+        self.assertIn(self.alice.uid, keys)
+        self.assertIn(self.blocks[0].certifications[0].pubkey_from, keys)
+        self.assertIn(self.blocks[0].certifications[0].pubkey_to, keys)
+        self.assertIn(self.member, keys)
+
+    def test_selective(self):
+        async def test(node, connection):
+            cache = WotCache(connection)
+            self.assertEqual(await cache.refresh(), 0)
+            self.assertEqual(cache.head, 10)
+
+            for search in (self.alice.pubkey, self.bob.pubkey, self.bob.uid):
+                await cache.requirements(search)
+                await cache.requirements(search)
+            await cache.lookup(self.alice.uid)
+            await cache.certifiers_of(self.bob.pubkey)
+            await cache.certified_by(self.bob.pubkey)
+            self.assertEqual(node.requests["/wot/requirements/{search}"], 3)
+            self.assertEqual((cache.hits, cache.misses, len(cache)), (3, 6, 6))
+            self.assertEqual(cache.number(wot_cache.REQUIREMENTS, self.bob.uid), 10)
+
+            # the head did not move
+            self.assertEqual(await cache.refresh(), 0)
+            self.assertEqual(len(cache), 6)
+
+            # a block certifying bob drops his answers, by pubkey and by uid
+            await node.push_block(self.blocks[10])
+            self.assertEqual(await cache.refresh(), 4)
+            self.assertEqual(cache.head, 11)
+            self.assertEqual(len(cache), 2)
+            await cache.requirements(self.alice.pubkey)
+            await cache.requirements(self.bob.uid)
+            self.assertEqual(node.requests["/wot/requirements/{search}"], 4)
+            self.assertEqual(cache.number(wot_cache.REQUIREMENTS, self.alice.pubkey), 10)
+            self.assertEqual(cache.number(wot_cache.REQUIREMENTS, self.bob.uid), 11)
+
+            # two blocks : the one between the head and the current block is read
+            await node.push_block(self.blocks[11])
+            await node.push_block(self.blocks[12])
+            self.assertEqual(await cache.refresh(), 2)
+            self.assertEqual(node.requests["/blockchain/blocks/{count}/{start}"], 1)
+            self.assertEqual(cache.head, 13)
+
+            # a fork : the block at the head changed
+            fork = standin.bma_block(self.blocks[12])
+            fork["hash"] = fixtures.block_hash("fork")
+            await cache.requirements(self.bob.uid)
+            self.assertEqual(cache.apply_block(fork), 1)
+            self.assertEqual(len(cache), 0)
+
+        self.run_node(test)
+
+    def test_bulk(self):
+        async def test(node, connection):
+            cache = WotCache(connection, selective=False)
+            await cache.refresh()
+            await cache.requirements(self.alice.pubkey)
+            await cache.requirements(self.bob.pubkey)
+            await node.push_block(self.blocks[10])
+            self.assertEqual(await cache.refresh(), 2)
+            self.assertEqual(len(cache), 0)
+
+        self.run_node(test)
+
+    def test_concurrent_and_errors(self):
+        async def test(node, connection):
+            cache = WotCache(connection, max_entries=2, refresh_interval=60)
+            answers = await asyncio.gather(*[cache.requirements(self.alice.pubkey) for _ in range(5)])
+            self.assertEqual(node.requests["/wot/requirements/{search}"], 1)
+            self.assertEqual(node.requests["/blockchain/current"], 1)
+            self.assertEqual(answers[0]["identities"][0]["uid"], self.alice.uid)
+
+            # errors are not cached
+            for _ in range(2):
+                with self.assertRaises(DuniterError):
+                    await cache.requirements("unknown")
+            self.assertEqual(node.requests["/wot/requirements/{search}"], 3)
+
+            # the least recently used answer is dropped
+            await cache.lookup(self.alice.pubkey)
+            await cache.requirements(self.alice.pubkey)
+            await cache.lookup(self.bob.pubkey)
+            self.assertIsNone(cache.number(wot_cache.LOOKUP, self.alice.pubkey))
+            self.assertEqual(len(cache), 2)
+            self.assertEqual(node.requests["/blockchain/current"], 1)
+
+            # an answer fetched while a block is applied is not cached
+            node.latency = 0.05
+            request = asyncio.ensure_future(cache.certified_by(self.alice.pubkey))
+            while not node.requests["/wot/certified-by/{search}"]:
+                await asyncio.sleep(0.001)
+            cache.apply_block(standin.bma_block(self.blocks[10]))
+            await request
+            self.assertIsNone(cache.number(wot_cache.CERTIFIED_BY, self.alice.pubkey))
+
+        self.run_node(test)
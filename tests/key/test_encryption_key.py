@@ -1,6 +1,7 @@
 from duniterpy.key import SecretKey, PublicKey, SigningKey
 from duniterpy.documents import Peer
 from duniterpy.key.signing_key import _ensure_bytes
+import concurrent.futures
 import unittest
 
 
@@ -13,3 +14,30 @@ class TestEncryptionKey(unittest.TestCase):
         bob_to_alice = bob_secret_key.encrypt(alice_secret_key.public_key.base58(), noonce, text)
         alice_from_bob = alice_secret_key.decrypt(bob_secret_key.public_key.base58(), noonce, bob_to_alice)
         self.assertEqual(alice_from_bob, text)
+
+    def test_box_cache(self):
+        bob_secret_key = SecretKey("bobsalt", "bobpassword", box_cache_size=2)
+        pubkeys = [SecretKey("salt{0}".format(i), "password").public_key.base58() for i in range(3)]
+        box = bob_secret_key.box(pubkeys[0])
+        self.assertIs(bob_secret_key.box(pubkeys[0]), box)
+        bob_secret_key.box(pubkeys[1])
+        bob_secret_key.box(pubkeys[0])
+        bob_secret_key.box(pubkeys[2])
+        # the least recently used box is dropped
+        self.assertEqual(list(bob_secret_key._boxes), [pubkeys[0], pubkeys[2]])
+        bob_secret_key.clear_boxes()
+        self.assertIsNot(bob_secret_key.box(pubkeys[0]), box)
+
+    def test_encrypt_many(self):
+        bob_secret_key = SecretKey("bobsalt", "bobpassword")
+        alice_secret_key = SecretKey("alicesalt", "alicepassword")
+        bob, alice = bob_secret_key.public_key.base58(), alice_secret_key.public_key.base58()
+        noonce = "00005D6FC6E22FB308D8815A"
+        texts = ["Message {0}".format(i) for i in range(20)]
+        encrypted = bob_secret_key.encrypt_many((alice, noonce, text) for text in texts)
+        self.assertEqual(encrypted[3], bob_secret_key.encrypt(alice, noonce, texts[3]))
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            self.assertEqual(bob_secret_key.encrypt_many([(alice, noonce, t) for t in texts], executor, 3), encrypted)
+            decrypted = alice_secret_key.decrypt_many([(bob, noonce, e) for e in encrypted], executor, 3)
+        self.assertEqual(decrypted, texts)
+        self.assertEqual(alice_secret_key.decrypt_many([(bob, noonce, e) for e in encrypted]), texts)